@@ -1,15 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from pydantic import BaseModel
 from app.models.user import User, UserRole
-from app.models.patient import Patient
-from app.models.appointment import Appointment
+from app.models.patient import Patient, PatientSummary
+from app.models.appointment import Appointment, AppointmentStatus
 from app.models.doctor_profile import DoctorProfile
 from app.models.lab_assistant import LabAssistant
-from app.api.routes.auth import get_current_user
-import sys
+from app.api.routes.auth import get_current_user, get_read_only_user
+from app.core.pagination import PageParams, paginate
+from app.core.user_cache import invalidate_user
+from app.services.lookup import fetch_users, fetch_patients_with_users
+from app.services.report_storage import get_report_store
+from app.services.slot_index import slot_index
+from app.services.stats import increment_lab_stats
+import asyncio
+import logging
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 class RoleUpdateRequest(BaseModel):
@@ -20,7 +28,11 @@ class RoleUpdateRequest(BaseModel):
 
 
 @router.get("/admin/users")
-async def get_all_users(current_user: User = Depends(get_current_user)):
+async def get_all_users(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
     """Get all users (admin only)"""
 
     if current_user.role != UserRole.ADMIN:
@@ -30,8 +42,7 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        users = await User.find().to_list()
-        print(f"✅ Retrieved {len(users)} users", file=sys.stderr)
+        users = await paginate(User.find(), page, response)
 
         return [
             {
@@ -50,7 +61,7 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
             for user in users
         ]
     except Exception as e:
-        print(f"❌ Error: {e}", file=sys.stderr)
+        logger.exception("Failed to fetch users")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching users: {str(e)}",
@@ -60,7 +71,7 @@ async def get_all_users(current_user: User = Depends(get_current_user)):
 @router.get("/admin/users/{user_id}/profile")
 async def get_user_profile(
     user_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
 ):
     """
     Get full profile for any user (admin only).
@@ -103,7 +114,9 @@ async def get_user_profile(
 
     # Role-specific profiles
     if user.role == UserRole.PATIENT:
-        patient = await Patient.find_one(Patient.user_id == str(user.id))
+        patient = await Patient.find_one(
+            Patient.user_id == str(user.id), projection_model=PatientSummary
+        )
         if patient:
             profile["patient_profile"] = {
                 "id": str(patient.id),
@@ -223,6 +236,7 @@ async def update_user_role(
 
     user.role = payload.role
     await user.save()
+    invalidate_user(user.id)
 
     return {
         "id": str(user.id),
@@ -264,20 +278,38 @@ async def delete_user(
 
     # Optional cleanup: delete related patient record
     if user.role == UserRole.PATIENT:
-        patient = await Patient.find_one(Patient.user_id == user.id)
+        patient = await Patient.find_one(Patient.user_id == str(user.id))
         if patient:
-            await patient.delete()
+            await _delete_patient_record(patient)
 
     # Optional: also clean appointments etc. if you want
     await user.delete()
+    invalidate_user(user.id)
+    if user.role == UserRole.DOCTOR:
+        slot_index.remove_doctor(str(user.id))
     return
 
 
+async def _delete_patient_record(patient: Patient) -> None:
+    """Delete a patient document, update counters and drop its report files"""
+    reports = patient.diagnostic_reports or []
+    await patient.delete()
+    await increment_lab_stats(patients=-1, reports=-len(reports))
+
+    for report in reports:
+        if report.content_key:
+            await get_report_store().delete(report.content_key)
+
+
 # ---------- PATIENTS ----------
 
 
 @router.get("/admin/patients")
-async def get_all_patients(current_user: User = Depends(get_current_user)):
+async def get_all_patients(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
     """Get all patient profiles (admin only)"""
 
     if current_user.role != UserRole.ADMIN:
@@ -287,11 +319,14 @@ async def get_all_patients(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        patients = await Patient.find().to_list()
+        patients = await paginate(
+            Patient.find(projection_model=PatientSummary), page, response
+        )
+        users = await fetch_users(p.user_id for p in patients)
         result = []
 
         for patient in patients:
-            user = await User.get(patient.user_id)
+            user = users.get(patient.user_id)
             result.append(
                 {
                     "id": str(patient.id),
@@ -344,11 +379,17 @@ async def delete_patient(
     user = await User.get(patient.user_id)
     if user and user.role == UserRole.PATIENT:
         await user.delete()
+        invalidate_user(user.id)
 
-    # Optional: delete patient appointments
-    await Appointment.find(Appointment.patient_id == patient.id).delete()
+    # Optional: delete patient appointments, giving their slots back
+    held = await Appointment.get_motor_collection().find(
+        {"patient_id": str(patient.id), "holds_slot": True}, projection={"doctor_id": 1}
+    ).to_list(length=None)
+    await Appointment.find(Appointment.patient_id == str(patient.id)).delete()
+    for doc in held:
+        slot_index.apply(doc["doctor_id"], str(doc["_id"]), None)
 
-    await patient.delete()
+    await _delete_patient_record(patient)
     return
 
 
@@ -356,7 +397,11 @@ async def delete_patient(
 
 
 @router.get("/admin/doctors")
-async def get_all_doctors(current_user: User = Depends(get_current_user)):
+async def get_all_doctors(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
     """Get all doctors (admin only)"""
 
     if current_user.role != UserRole.ADMIN:
@@ -366,7 +411,9 @@ async def get_all_doctors(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        doctors = await User.find(User.role == UserRole.DOCTOR).to_list()
+        doctors = await paginate(
+            User.find(User.role == UserRole.DOCTOR), page, response
+        )
 
         return [
             {
@@ -410,9 +457,11 @@ async def delete_doctor(
         )
 
     # Optional: delete doctor appointments
-    await Appointment.find(Appointment.doctor_id == doctor.id).delete()
+    await Appointment.find(Appointment.doctor_id == str(doctor.id)).delete()
 
     await doctor.delete()
+    invalidate_user(doctor.id)
+    slot_index.remove_doctor(str(doctor.id))
     return
 
 
@@ -420,7 +469,11 @@ async def delete_doctor(
 
 
 @router.get("/admin/appointments")
-async def get_all_appointments(current_user: User = Depends(get_current_user)):
+async def get_all_appointments(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
     """Get all appointments (admin only)"""
 
     if current_user.role != UserRole.ADMIN:
@@ -430,13 +483,17 @@ async def get_all_appointments(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        appointments = await Appointment.find().to_list()
+        appointments = await paginate(Appointment.find(), page, response)
+        patients, patient_users = await fetch_patients_with_users(
+            apt.patient_id for apt in appointments
+        )
+        doctors = await fetch_users(apt.doctor_id for apt in appointments)
         result = []
 
         for apt in appointments:
-            patient = await Patient.get(apt.patient_id)
-            doctor = await User.get(apt.doctor_id)
-            patient_user = await User.get(patient.user_id) if patient else None
+            patient = patients.get(apt.patient_id)
+            doctor = doctors.get(apt.doctor_id)
+            patient_user = patient_users.get(patient.user_id) if patient else None
 
             result.append(
                 {
@@ -470,8 +527,16 @@ async def get_all_appointments(current_user: User = Depends(get_current_user)):
 # ---------- STATISTICS ----------
 
 
+async def _count_by(model, field: str) -> dict:
+    """Count documents of `model` grouped by `field` in one aggregation"""
+    rows = await model.aggregate(
+        [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+    ).to_list()
+    return {row["_id"]: row["count"] for row in rows}
+
+
 @router.get("/admin/statistics")
-async def get_statistics(current_user: User = Depends(get_current_user)):
+async def get_statistics(current_user: User = Depends(get_read_only_user)):
     """Get system statistics (admin only)"""
 
     if current_user.role != UserRole.ADMIN:
@@ -481,32 +546,23 @@ async def get_statistics(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        users = await User.find().to_list()
-        total_users = len(users)
-        total_patients = len(await Patient.find().to_list())
-        total_doctors = len(
-            await User.find(User.role == UserRole.DOCTOR).to_list()
+        # Three small aggregations run concurrently; nothing but the
+        # counts ever leaves the database
+        users_by_role, total_patients, appointments_by_status = await asyncio.gather(
+            _count_by(User, "role"),
+            Patient.find().count(),
+            _count_by(Appointment, "status"),
         )
-        total_lab_assistants = len(
-            [u for u in users if u.role == UserRole.LAB_ASSISTANT]
-        )
-        total_appointments = len(await Appointment.find().to_list())
-
-        appointments = await Appointment.find().to_list()
-        pending = len([a for a in appointments if a.status == "pending"])
-        confirmed = len([a for a in appointments if a.status == "confirmed"])
-        rejected = len([a for a in appointments if a.status == "rejected"])
 
         return {
-            "total_users": total_users,
+            "total_users": sum(users_by_role.values()),
             "total_patients": total_patients,
-            "total_doctors": total_doctors,
-            "total_lab_assistants": total_lab_assistants,
-            "total_appointments": total_appointments,
+            "total_doctors": users_by_role.get(UserRole.DOCTOR.value, 0),
+            "total_lab_assistants": users_by_role.get(UserRole.LAB_ASSISTANT.value, 0),
+            "total_appointments": sum(appointments_by_status.values()),
             "appointments_by_status": {
-                "pending": pending,
-                "confirmed": confirmed,
-                "rejected": rejected,
+                status_value.value: appointments_by_status.get(status_value.value, 0)
+                for status_value in AppointmentStatus
             },
         }
     except Exception as e:
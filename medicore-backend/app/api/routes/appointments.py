@@ -1,30 +1,79 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status, Depends, Query, Response
 from app.schemas.appointment import (
     AppointmentCreate, AppointmentUpdate, AppointmentStatusUpdate,
     AppointmentResponse, AppointmentWithDetails
 )
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.user import User, UserRole
-from app.models.patient import Patient
-from app.api.routes.auth import get_current_user
-from typing import List
+from app.models.patient import Patient, PatientRef
+from app.api.routes.auth import get_current_user, get_read_only_user
+from app.core.pagination import PageParams, paginate
+from app.services.lookup import fetch_users, fetch_patients_with_users, find_by_id
+from app.services.email import send_appointment_status_email
+from app.services.scheduling import (
+    SUGGESTED_SLOT_HEADER,
+    OutsideSchedule,
+    align_to_schedule,
+    suggest_next_slot,
+)
+from app.services.slot_index import slot_index
+from app.core.config import settings
+from pymongo.errors import DuplicateKeyError
+from typing import List, Optional
 from datetime import datetime
-import traceback
-import sys
+import logging
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+async def _aligned_slot(doctor_id: str, when: datetime) -> datetime:
+    """Snap a requested time to the doctor's slot start, 422 if outside their hours"""
+    try:
+        return await align_to_schedule(doctor_id, when)
+    except OutsideSchedule:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The doctor is not available at this time",
+        )
+
+
+async def _slot_taken_error(doctor_id: str, when: datetime) -> HTTPException:
+    """409 for a slot someone else holds, suggesting the doctor's next free one"""
+    suggestion = await suggest_next_slot(doctor_id, when)
+    if suggestion is None:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This time slot is already booked",
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=(
+            "This time slot is already booked. "
+            f"Next available: {suggestion.strftime('%Y-%m-%d %H:%M')}"
+        ),
+        headers={SUGGESTED_SLOT_HEADER: suggestion.isoformat()},
+    )
+
+
+def _update_slot_index(appointment: Appointment, held_before: bool, date_before: datetime):
+    """Tell the free-slot index what a saved change did to the slot it held"""
+    if held_before == appointment.holds_slot and date_before == appointment.appointment_date:
+        return
+    slot_index.apply(
+        appointment.doctor_id,
+        str(appointment.id),
+        appointment.appointment_date if appointment.holds_slot else None,
+    )
 
 
 @router.get("/doctors", response_model=List[dict])
 async def get_all_doctors():
     """Get list of all doctors"""
-    print(f"\n🔍 Fetching all doctors", file=sys.stderr)
-
     try:
         doctors = await User.find(User.role == UserRole.DOCTOR).to_list()
-        print(f"✅ Found {len(doctors)} doctors", file=sys.stderr)
-        sys.stderr.flush()
+        logger.debug("Fetched doctors", extra={"count": len(doctors)})
 
         result = []
         for doctor in doctors:
@@ -39,105 +88,99 @@ async def get_all_doctors():
         return result
 
     except Exception as e:
-        print(f"❌ Error fetching doctors: {e}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        sys.stderr.flush()
+        logger.exception("Failed to fetch doctors")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch doctors: {str(e)}",
         )
 
 
+@router.get("/next-available", response_model=List[dict])
+async def get_next_available(
+    specialization: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=settings.NEXT_SLOT_MAX_RESULTS),
+    current_user: User = Depends(get_current_user),
+):
+    """Earliest free slots with any doctor, optionally of one specialization"""
+    return slot_index.next_available(specialization, limit)
+
+
 @router.post("/", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_appointment(
     appointment_data: AppointmentCreate,
     current_user: User = Depends(get_current_user),
 ):
     """Create appointment (patients only)"""
-
-    print(f"\n{'=' * 100}", file=sys.stderr)
-    print(f"🔍 CREATING APPOINTMENT", file=sys.stderr)
-    print(f"{'=' * 100}", file=sys.stderr)
-    print(f"Patient User: {current_user.email}", file=sys.stderr)
-    print(f"Doctor ID: {appointment_data.doctor_id}", file=sys.stderr)
-    print(f"Appointment Date: {appointment_data.appointment_date}", file=sys.stderr)
-    print(f"Reason: {appointment_data.reason}", file=sys.stderr)
-    sys.stderr.flush()
+    logger.debug(
+        "Creating appointment",
+        extra={
+            "user_id": str(current_user.id),
+            "doctor_id": appointment_data.doctor_id,
+            "appointment_date": appointment_data.appointment_date,
+        },
+    )
 
     try:
         # Check if user is patient
         if current_user.role != UserRole.PATIENT:
-            print(f"❌ 1. User role check failed: {current_user.role}", file=sys.stderr)
-            sys.stderr.flush()
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only patients can book appointments",
             )
 
-        print(f"✅ 1. User role verified (PATIENT)", file=sys.stderr)
-        sys.stderr.flush()
-
         # Get patient profile
-        patient = await Patient.find_one(Patient.user_id == str(current_user.id))
+        patient = await Patient.find_one(
+            Patient.user_id == str(current_user.id), projection_model=PatientRef
+        )
         if not patient:
-            print(f"❌ 2. Patient profile not found", file=sys.stderr)
-            sys.stderr.flush()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Please create your patient profile first",
             )
 
-        print(f"✅ 2. Patient profile found: {patient.patient_id}", file=sys.stderr)
-        sys.stderr.flush()
-
         # Verify doctor exists
         doctor = await User.get(appointment_data.doctor_id)
         if not doctor:
-            print(
-                f"❌ 3. Doctor not found with ID: {appointment_data.doctor_id}",
-                file=sys.stderr,
-            )
-            sys.stderr.flush()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Doctor not found",
             )
 
         if doctor.role != UserRole.DOCTOR:
-            print(
-                f"❌ 3. User is not a doctor, role: {doctor.role}", file=sys.stderr
-            )
-            sys.stderr.flush()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Selected user is not a doctor",
             )
 
-        print(
-            f"✅ 3. Doctor verified: {doctor.full_name} ({doctor.specialization})",
-            file=sys.stderr,
-        )
-        sys.stderr.flush()
-
         # Create appointment
         appointment = Appointment(
             patient_id=str(patient.id),
             doctor_id=str(doctor.id),
-            appointment_date=appointment_data.appointment_date,
+            appointment_date=await _aligned_slot(
+                str(doctor.id), appointment_data.appointment_date
+            ),
             reason=appointment_data.reason,
             notes=appointment_data.notes or "",
         )
 
-        print(f"✅ 4. Appointment object created", file=sys.stderr)
-        sys.stderr.flush()
-
-        # Insert into database
-        await appointment.insert()
+        # Insert into database; the unique slot index rejects every
+        # concurrent booking of the same slot but one
+        try:
+            await appointment.insert()
+        except DuplicateKeyError:
+            raise await _slot_taken_error(appointment.doctor_id, appointment.appointment_date)
+        slot_index.apply(
+            appointment.doctor_id, str(appointment.id), appointment.appointment_date
+        )
 
-        print(f"✅✅✅ 5. APPOINTMENT CREATED SUCCESSFULLY", file=sys.stderr)
-        print(f"   Appointment ID: {appointment.id}", file=sys.stderr)
-        print(f"{'=' * 100}\n", file=sys.stderr)
-        sys.stderr.flush()
+        logger.info(
+            "Appointment created",
+            extra={
+                "appointment_id": str(appointment.id),
+                "patient_id": patient.patient_id,
+                "doctor_id": str(doctor.id),
+            },
+        )
 
         return AppointmentResponse(
             id=str(appointment.id),
@@ -157,10 +200,7 @@ async def create_appointment(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ UNEXPECTED ERROR: {e}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        print(f"{'=' * 100}\n", file=sys.stderr)
-        sys.stderr.flush()
+        logger.exception("Failed to create appointment")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create appointment: {str(e)}",
@@ -177,7 +217,9 @@ async def get_my_appointments(current_user: User = Depends(get_current_user)):
             detail="Only patients can view their appointments",
         )
 
-    patient = await Patient.find_one(Patient.user_id == str(current_user.id))
+    patient = await Patient.find_one(
+        Patient.user_id == str(current_user.id), projection_model=PatientRef
+    )
     if not patient:
         return []
 
@@ -187,9 +229,11 @@ async def get_my_appointments(current_user: User = Depends(get_current_user)):
         .to_list()
     )
 
+    doctors = await fetch_users(apt.doctor_id for apt in appointments)
+
     result = []
     for apt in appointments:
-        doctor = await User.get(apt.doctor_id)
+        doctor = doctors.get(apt.doctor_id)
         result.append(
             AppointmentWithDetails(
                 id=str(apt.id),
@@ -213,7 +257,11 @@ async def get_my_appointments(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/doctor-appointments", response_model=List[AppointmentWithDetails])
-async def get_doctor_appointments(current_user: User = Depends(get_current_user)):
+async def get_doctor_appointments(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
     """Get appointments for doctor"""
 
     if current_user.role != UserRole.DOCTOR:
@@ -222,16 +270,20 @@ async def get_doctor_appointments(current_user: User = Depends(get_current_user)
             detail="Only doctors can view their appointments",
         )
 
-    appointments = (
-        await Appointment.find(Appointment.doctor_id == str(current_user.id))
-        .sort(-Appointment.created_at)
-        .to_list()
+    appointments = await paginate(
+        Appointment.find(Appointment.doctor_id == str(current_user.id)),
+        page,
+        response,
+    )
+
+    patients, patient_users = await fetch_patients_with_users(
+        apt.patient_id for apt in appointments
     )
 
     result = []
     for apt in appointments:
-        patient = await Patient.get(apt.patient_id)
-        patient_user = await User.get(patient.user_id) if patient else None
+        patient = patients.get(apt.patient_id)
+        patient_user = patient_users.get(patient.user_id) if patient else None
         result.append(
             AppointmentWithDetails(
                 id=str(apt.id),
@@ -257,6 +309,7 @@ async def get_doctor_appointments(current_user: User = Depends(get_current_user)
 async def update_appointment_status(
     appointment_id: str,
     status_data: AppointmentStatusUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -286,6 +339,8 @@ async def update_appointment_status(
         )
 
     # Update status
+    held_before, date_before = appointment.holds_slot, appointment.appointment_date
+    status_changed = appointment.status != status_data.status
     appointment.status = status_data.status
     if status_data.doctor_notes:
         appointment.doctor_notes = status_data.doctor_notes
@@ -295,7 +350,15 @@ async def update_appointment_status(
         appointment.admin_notes = status_data.admin_notes
 
     appointment.updated_at = datetime.utcnow()
-    await appointment.save()
+    try:
+        await appointment.save()
+    except DuplicateKeyError:
+        # Re-activating an appointment whose slot was booked meanwhile
+        raise await _slot_taken_error(appointment.doctor_id, appointment.appointment_date)
+    _update_slot_index(appointment, held_before, date_before)
+
+    if status_changed:
+        background_tasks.add_task(send_appointment_status_email, appointment)
 
     return AppointmentResponse(
         id=str(appointment.id),
@@ -317,6 +380,7 @@ async def update_appointment_status(
 async def update_appointment(
     appointment_id: str,
     update_data: AppointmentUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
 ):
     """
@@ -334,7 +398,9 @@ async def update_appointment(
         )
 
     # Determine ownership / permissions
-    patient = await Patient.find_one(Patient.user_id == str(current_user.id))
+    patient = await Patient.find_one(
+        Patient.user_id == str(current_user.id), projection_model=PatientRef
+    )
     is_patient_owner = patient and str(patient.id) == appointment.patient_id
     is_admin = current_user.role == UserRole.ADMIN
 
@@ -345,13 +411,16 @@ async def update_appointment(
         )
 
     # Apply changes
+    held_before, date_before = appointment.holds_slot, appointment.appointment_date
     if update_data.appointment_date is not None:
         if not is_admin:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can reschedule appointment date/time",
             )
-        appointment.appointment_date = update_data.appointment_date
+        appointment.appointment_date = await _aligned_slot(
+            appointment.doctor_id, update_data.appointment_date
+        )
 
     if update_data.reason is not None:
         appointment.reason = update_data.reason
@@ -365,13 +434,20 @@ async def update_appointment(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Only admins can change appointment status in this endpoint",
             )
+        status_changed = appointment.status != update_data.status
         appointment.status = update_data.status
+        if status_changed:
+            background_tasks.add_task(send_appointment_status_email, appointment)
 
     if update_data.admin_notes is not None and is_admin:
         appointment.admin_notes = update_data.admin_notes
 
     appointment.updated_at = datetime.utcnow()
-    await appointment.save()
+    try:
+        await appointment.save()
+    except DuplicateKeyError:
+        raise await _slot_taken_error(appointment.doctor_id, appointment.appointment_date)
+    _update_slot_index(appointment, held_before, date_before)
 
     return AppointmentResponse(
         id=str(appointment.id),
@@ -404,7 +480,9 @@ async def get_appointment(
         )
 
     # Check authorization
-    patient = await Patient.find_one(Patient.user_id == str(current_user.id))
+    patient = await Patient.find_one(
+        Patient.user_id == str(current_user.id), projection_model=PatientRef
+    )
     is_patient = patient and str(patient.id) == appointment.patient_id
     is_doctor = (
         current_user.role == UserRole.DOCTOR
@@ -419,7 +497,7 @@ async def get_appointment(
 
     # Get related data
     doctor = await User.get(appointment.doctor_id)
-    patient_obj = await Patient.get(appointment.patient_id)
+    patient_obj = await find_by_id(Patient, appointment.patient_id, PatientRef)
     patient_user = await User.get(patient_obj.user_id) if patient_obj else None
 
     return AppointmentWithDetails(
@@ -465,4 +543,6 @@ async def admin_delete_appointment(
         )
 
     await appointment.delete()
+    if appointment.holds_slot:
+        slot_index.apply(appointment.doctor_id, str(appointment.id), None)
     return
@@ -1,25 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
 from app.schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
 from app.models.user import User, UserRole
 from app.models.doctor_profile import DoctorProfile
-from app.core.security import get_password_hash, verify_password, create_access_token, verify_token
+from app.core.security import (
+    PasswordHashPoolBusy,
+    get_password_hash_async,
+    verify_password_async,
+    create_access_token,
+    verify_token,
+)
+from app.core.user_cache import user_cache
+from app.core.rate_limit import enforce_login_rate_limit, failed_login_cache
 from datetime import timedelta
+from typing import Union
 from app.core.config import settings
+import logging
 
 router = APIRouter()
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
     """Register a new user"""
-    print(f"🔍 Received registration data: {user_data}")
-
     # Check if user already exists
     existing_user = await User.find_one({"email": user_data.email})
 
     if existing_user:
-        print(f"❌ Email already registered: {user_data.email}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -28,7 +37,6 @@ async def register(user_data: UserCreate):
     # Validate doctor registration
     if user_data.role == UserRole.DOCTOR:
         if not user_data.hospital_email:
-            print(f"❌ Hospital email missing for doctor")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Hospital email is required for doctor registration"
@@ -36,25 +44,25 @@ async def register(user_data: UserCreate):
 
         # Clean and validate hospital email domain
         hospital_email_clean = user_data.hospital_email.strip().lower()
-        print(f"🏥 Validating hospital email: {hospital_email_clean}")
 
         # Check if email domain is valid (use @ not .)
         valid_domains = ['@hospital.com', '@med.com', '@clinic.com']
         if not any(hospital_email_clean.endswith(domain) for domain in valid_domains):
-            print(f"❌ Invalid hospital email domain: {hospital_email_clean}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Please use a valid hospital email address"
             )
 
-        print(f"✅ Hospital email validated successfully")
-
     # Create user with hashed password
     try:
-        hashed_password = get_password_hash(user_data.password)
-        print(f"✅ Password hashed successfully")
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordHashPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry"
+        )
     except Exception as e:
-        print(f"❌ Password hashing error: {e}")
+        logger.exception("Password hashing failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Password hashing failed"
@@ -74,9 +82,12 @@ async def register(user_data: UserCreate):
 
     try:
         await user.insert()
-        print(f"✅ User created successfully: {user.email}")
+        logger.info(
+            "User registered",
+            extra={"user_id": str(user.id), "role": user.role},
+        )
     except Exception as e:
-        print(f"❌ Database error during user insertion: {e}")
+        logger.exception("Failed to insert user")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create user: {str(e)}"
@@ -96,9 +107,12 @@ async def register(user_data: UserCreate):
                 availability=[]
             )
             await doctor_profile.insert()
-            print(f"✅ Doctor profile auto-created for: {user.email}")
-        except Exception as e:
-            print(f"⚠️  Warning: Could not create doctor profile: {e}")
+        except Exception:
+            logger.warning(
+                "Could not create doctor profile",
+                extra={"user_id": str(user.id)},
+                exc_info=True,
+            )
             # Don't fail registration if profile creation fails
 
     # Create access token
@@ -122,12 +136,36 @@ async def register(user_data: UserCreate):
     return TokenResponse(access_token=access_token, user=user_response)
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, request: Request):
     """Login user"""
+    # Throttle before doing any database or bcrypt work
+    await enforce_login_rate_limit(request, credentials.email)
+
+    if failed_login_cache.contains(credentials.email, credentials.password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+
     # Find user
     user = await User.find_one({"email": credentials.email})
 
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    try:
+        password_ok = bool(user) and await verify_password_async(
+            credentials.password, user.hashed_password
+        )
+    except PasswordHashPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry"
+        )
+
+    if not password_ok:
+        # Only remember a wrong password for an existing account: caching
+        # an unknown email would reject it for the TTL even after it is
+        # registered with that very password
+        if user:
+            failed_login_cache.add(credentials.email, credentials.password)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -159,19 +197,20 @@ async def login(credentials: UserLogin):
 
     return TokenResponse(access_token=access_token, user=user_response)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current authenticated user"""
-    token = credentials.credentials
-    payload = verify_token(token)
-
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token"
-        )
+class TokenUser(BaseModel):
+    """Principal built from JWT claims alone, for read-only routes"""
+    id: str
+    email: str
+    role: UserRole
 
+async def _load_user(payload: dict) -> User:
     user_id = payload.get("user_id")
-    user = await User.get(user_id)
+
+    user = user_cache.get(user_id) if user_id else None
+    if user is None:
+        user = await User.get(user_id)
+        if user:
+            user_cache.set(user)
 
     if not user:
         raise HTTPException(
@@ -181,6 +220,41 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 
     return user
 
+def _decode_credentials(credentials: HTTPAuthorizationCredentials) -> dict:
+    payload = verify_token(credentials.credentials)
+
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
+
+    return payload
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    """Get current authenticated user"""
+    return await _load_user(_decode_credentials(credentials))
+
+async def get_read_only_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Union[User, TokenUser]:
+    """
+    Get the current user for read-only routes that only need id and role.
+
+    With TRUST_TOKEN_ROLE_CLAIMS enabled the JWT claims are used directly
+    and no user lookup happens at all.
+    """
+    payload = _decode_credentials(credentials)
+
+    if settings.TRUST_TOKEN_ROLE_CLAIMS and payload.get("user_id") and payload.get("role"):
+        return TokenUser(
+            id=payload["user_id"],
+            email=payload.get("sub", ""),
+            role=payload["role"],
+        )
+
+    return await _load_user(payload)
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user profile"""
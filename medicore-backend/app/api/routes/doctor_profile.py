@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Query
 from app.schemas.doctor_profile import (
     DoctorProfileCreate,
     DoctorProfileUpdate,
@@ -7,13 +7,26 @@ from app.schemas.doctor_profile import (
 )
 from app.models.doctor_profile import DoctorProfile
 from app.models.user import User, UserRole
-from app.models.appointment import Appointment
 from app.api.routes.auth import get_current_user
-from datetime import datetime
+from app.core.config import settings
+from app.services.report_storage import read_chunks
+from app.services.scheduling import (
+    availability_matrix,
+    held_slot_starts,
+    minute_of_day,
+    split_booked,
+)
+from app.services.slot_index import slot_index
+from app.models.doctor_profile import slot_label
+from datetime import date as date_type, datetime, timedelta
+from typing import List, Optional
 import base64
+import re
 
 router = APIRouter()
 
+PICTURE_CHUNK_SIZE = 3 * 64 * 1024
+
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_doctor_profile(
@@ -150,16 +163,23 @@ async def update_availability(
     availability_data: AvailabilityUpdate,
     current_user: User = Depends(get_current_user),
 ):
-    """Update availability schedule (max 3 days)"""
+    """Update availability schedule (max MAX_AVAILABILITY_DAYS days)"""
     if current_user.role != UserRole.DOCTOR:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Only doctors"
         )
 
-    if len(availability_data.availability) > 3:
+    if len(availability_data.availability) > settings.MAX_AVAILABILITY_DAYS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Maximum 3 days allowed",
+            detail=f"Maximum {settings.MAX_AVAILABILITY_DAYS} days allowed",
+        )
+
+    days = [schedule.day for schedule in availability_data.availability]
+    if len(set(days)) != len(days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each day can only be listed once",
         )
 
     profile = await DoctorProfile.find_one(
@@ -173,6 +193,7 @@ async def update_availability(
     profile.availability = availability_data.availability
     profile.updated_at = datetime.utcnow()
     await profile.save()
+    slot_index.set_schedule(str(current_user.id), profile)
 
     return {"message": "Availability updated"}
 
@@ -188,10 +209,6 @@ async def upload_profile_picture(
             status_code=status.HTTP_403_FORBIDDEN, detail="Only doctors"
         )
 
-    file_content = await file.read()
-    file_base64 = base64.b64encode(file_content).decode("utf-8")
-    file_url = f"data:{file.content_type};base64,{file_base64}"
-
     profile = await DoctorProfile.find_one(
         DoctorProfile.user_id == str(current_user.id)
     )
@@ -200,6 +217,22 @@ async def upload_profile_picture(
             status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
         )
 
+    # The picture stays embedded as a data URL, so read it in chunks under
+    # a hard size cap and base64-encode as we go. Chunk sizes are multiples
+    # of 3 so the encoded pieces concatenate into valid base64.
+    encoded_parts = []
+    size = 0
+    async for chunk in read_chunks(file, chunk_size=PICTURE_CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.MAX_PROFILE_PICTURE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Picture exceeds the {settings.MAX_PROFILE_PICTURE_SIZE} byte limit",
+            )
+        encoded_parts.append(base64.b64encode(chunk).decode("utf-8"))
+
+    file_url = f"data:{file.content_type};base64,{''.join(encoded_parts)}"
+
     profile.profile_picture = file_url
     profile.updated_at = datetime.utcnow()
     await profile.save()
@@ -207,6 +240,63 @@ async def upload_profile_picture(
     return {"message": "Picture uploaded"}
 
 
+@router.get("/available-slots")
+async def get_available_slots_for_range(
+    start_date: date_type,
+    end_date: date_type,
+    doctor_ids: Optional[List[str]] = Query(None),
+    specialization: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Free slots for several doctors over a date range (inclusive), as
+    {doctor_id: {YYYY-MM-DD: [slots]}}. Pick doctors by id, by
+    specialization, or both (doctors matching both).
+    """
+    if end_date < start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date",
+        )
+    if (end_date - start_date).days + 1 > settings.AVAILABILITY_QUERY_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.AVAILABILITY_QUERY_MAX_DAYS} days per query",
+        )
+    if not doctor_ids and not specialization:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give doctor_ids or a specialization",
+        )
+
+    ids = list(dict.fromkeys(doctor_ids or []))
+    if specialization:
+        # Case-insensitive, like /appointments/next-available
+        doctors = await User.find(
+            User.role == UserRole.DOCTOR,
+            {"specialization": {"$regex": f"^{re.escape(specialization)}$", "$options": "i"}},
+        ).to_list()
+        matching = [str(doctor.id) for doctor in doctors]
+        if doctor_ids:
+            matching_ids = set(matching)
+            ids = [i for i in ids if i in matching_ids]
+        else:
+            ids = matching
+
+    if len(ids) > settings.AVAILABILITY_QUERY_MAX_DOCTORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.AVAILABILITY_QUERY_MAX_DOCTORS} doctors per query",
+        )
+
+    matrix = await availability_matrix(ids, start_date, end_date) if ids else {}
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "doctors": matrix,
+    }
+
+
 @router.get("/{doctor_id}/available-slots")
 async def get_available_slots(
     doctor_id: str,
@@ -225,43 +315,20 @@ async def get_available_slots(
         target_date = datetime.strptime(date, "%Y-%m-%d")
         day_name = target_date.strftime("%A")
 
-        # Find day availability
-        day_availability = None
-        for avail in profile.availability:
-            if avail.get("day") == day_name:
-                day_availability = avail
-                break
-
-        if not day_availability:
+        schedule = profile.schedule_for(day_name)
+        if schedule is None:
             return {"available_slots": []}
 
-        # Get booked appointments
-        start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = target_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        booked_appointments = await Appointment.find(
-            Appointment.doctor_id == doctor_id,
-            Appointment.appointment_date >= start_of_day,
-            Appointment.appointment_date <= end_of_day,
-            Appointment.status != "rejected",
-        ).to_list()
-
-        # Extract booked slots
-        booked_slots: list[str] = []
-        for apt in booked_appointments:
-            time_str = apt.appointment_date.strftime("%H:%M")
-            for slot in day_availability.get("time_slots", []):
-                if slot.startswith(time_str):
-                    booked_slots.append(slot)
-
-        all_slots = day_availability.get("time_slots", [])
-        available_slots = [s for s in all_slots if s not in booked_slots]
+        held = await held_slot_starts(
+            doctor_id, target_date, target_date + timedelta(days=1)
+        )
+        free, booked = split_booked(schedule.slots, (minute_of_day(h) for h in held))
 
         return {
             "date": date,
             "day": day_name,
-            "available_slots": available_slots,
-            "booked_slots": booked_slots,
+            "available_slots": [slot_label(start, end) for start, end in free],
+            "booked_slots": [slot_label(start, end) for start, end in booked],
         }
     except HTTPException:
         raise
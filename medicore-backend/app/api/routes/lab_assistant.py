@@ -5,42 +5,69 @@ from fastapi import (
     Depends,
     UploadFile,
     File,
+    Header,
+    Response,
 )
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from beanie import PydanticObjectId
 from datetime import datetime
-import base64
+import logging
+import os
 import uuid
-import sys
-import traceback
-from io import BytesIO
+from typing import Optional
 
 from app.models.user import User, UserRole
-from app.models.patient import Patient, DiagnosticReport
+from app.models.patient import (
+    Patient,
+    DiagnosticReport,
+    PatientRef,
+    PatientSummary,
+    PatientWithReports,
+)
 from app.models.lab_assistant import LabAssistant
+from app.models.export_job import ExportJob, ExportJobStatus
 from app.schemas.lab_assistant import (
     LabAssistantCreate,
     LabAssistantUpdate,
     LabAssistantResponse,
 )
-from app.api.routes.auth import get_current_user
-
-# PDF generation (ReportLab)
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Table,
-    TableStyle,
+from app.schemas.export_job import ExportJobCreate, ExportJobResponse
+from app.api.routes.auth import get_current_user, get_read_only_user
+from app.core.pagination import (
+    PageParams,
+    finalize_page,
+    keyset_filter,
+    keyset_sort,
+    paginate,
+)
+from app.services.lookup import fetch_users, find_by_id
+from app.services.report_storage import (
+    ReportNotFound,
+    UploadTooLarge,
+    content_disposition,
+    get_report_store,
+    parse_data_url,
+    read_chunks,
+    report_download_path,
+)
+from app.services.stats import get_lab_stats, increment_lab_stats
+from app.services.patient_pdf import (
+    PdfRendererBusy,
+    patient_pdf_snapshot,
+    render_patient_pdf_async,
+)
+from app.services.pdf_cache import etag_matches, pdf_cache, snapshot_digest
+from app.services.pdf_export import (
+    export_download_path,
+    export_file_path,
+    purge_expired_exports,
+    start_export_job,
 )
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from app.core.config import settings
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 # ============================================================================
@@ -100,7 +127,7 @@ async def create_lab_assistant_profile(
         )
 
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Failed to create lab assistant profile")
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={"detail": f"Error: {str(e)}"},
@@ -184,7 +211,11 @@ async def update_my_lab_assistant_profile(
 
 
 @router.get("/patients")
-async def get_patients_list(current_user: User = Depends(get_current_user)):
+async def get_patients_list(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
     """Get list of all patients for lab work"""
 
     if current_user.role != UserRole.LAB_ASSISTANT:
@@ -194,11 +225,14 @@ async def get_patients_list(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        patients = await Patient.find().to_list()
+        patients = await paginate(
+            Patient.find(projection_model=PatientSummary), page, response
+        )
+        users = await fetch_users(p.user_id for p in patients)
         result = []
 
         for patient in patients:
-            user = await User.get(patient.user_id)
+            user = users.get(patient.user_id)
             result.append(
                 {
                     "id": str(patient.id),
@@ -236,37 +270,58 @@ async def upload_diagnostic_report(
 
     try:
         # Find patient
-        from bson import ObjectId
-
-        patient = await Patient.get(ObjectId(patient_id))
+        patient = await find_by_id(Patient, patient_id, PatientRef)
 
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
 
-        # Read file and convert to base64
-        file_content = await file.read()
-        file_base64 = base64.b64encode(file_content).decode("utf-8")
+        # Stream the file into the report store chunk by chunk
+        try:
+            stored = await get_report_store().put_stream(
+                read_chunks(file),
+                file.filename or "report",
+                file.content_type,
+                max_size=settings.MAX_REPORT_UPLOAD_SIZE,
+            )
+        except UploadTooLarge as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e),
+            )
 
         # Create report object
+        report_id = str(uuid.uuid4())
         report = DiagnosticReport(
-            report_id=str(uuid.uuid4()),
+            report_id=report_id,
             report_type=report_type,
             uploaded_by=current_user.full_name,
             uploaded_at=datetime.utcnow(),
-            file_url=f"data:{file.content_type};base64,{file_base64}",
+            file_url=report_download_path(report_id),
             notes=notes,
+            content_key=stored.key,
+            content_type=file.content_type,
+            file_name=file.filename,
+            file_size=stored.size,
+            sha256=stored.sha256,
         )
 
-        # Add to patient's reports
-        if not patient.diagnostic_reports:
-            patient.diagnostic_reports = []
-
-        patient.diagnostic_reports.append(report)
-        patient.updated_at = datetime.utcnow()
-        await patient.save()
-
-        print(
-            f"✅ Report uploaded for patient {patient.patient_id}", file=sys.stderr
+        # Append to the patient's reports without loading the document
+        await Patient.get_motor_collection().update_one(
+            {"_id": patient.id},
+            {
+                "$push": {"diagnostic_reports": report.model_dump()},
+                "$set": {"updated_at": datetime.utcnow()},
+            },
+        )
+        await increment_lab_stats(reports=1)
+
+        logger.info(
+            "Report uploaded",
+            extra={
+                "patient_id": patient.patient_id,
+                "report_id": report.report_id,
+                "file_size": stored.size,
+            },
         )
 
         return {
@@ -274,8 +329,10 @@ async def upload_diagnostic_report(
             "report_id": report.report_id,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error uploading report: {str(e)}", file=sys.stderr)
+        logger.exception("Failed to upload report")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading report: {str(e)}",
@@ -283,8 +340,12 @@ async def upload_diagnostic_report(
 
 
 @router.get("/reports")
-async def get_all_reports(current_user: User = Depends(get_current_user)):
-    """Return all diagnostic reports for the hospital."""
+async def get_all_reports(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user),
+):
+    """Return diagnostic reports for the hospital, newest first."""
 
     if current_user.role != UserRole.LAB_ASSISTANT:
         raise HTTPException(
@@ -292,29 +353,57 @@ async def get_all_reports(current_user: User = Depends(get_current_user)):
             detail="Only lab assistants can access this",
         )
 
-    patients = await Patient.find().to_list()
-    reports = []
-    for p in patients:
-        for r in (p.diagnostic_reports or []):
-            reports.append(
-                {
-                    "patient_id": p.patient_id,
-                    "patient_name": (await User.get(p.user_id)).full_name
-                    if p.user_id
-                    else "N/A",
-                    "report_id": r.report_id,
-                    "report_type": r.report_type,
-                    "file_url": r.file_url,
-                    "created_at": r.uploaded_at,
+    # Reports are embedded in patients, so page over the unwound reports
+    # keyed by (uploaded_at, report_id). The first match runs on the
+    # uploaded_at multikey index and only keeps patients holding a report
+    # at or before the cursor; $sort + $limit then keeps just the top rows.
+    uploaded = {"$lte": page.after[0]} if page.after else {"$exists": True}
+    rows = await Patient.aggregate(
+        [
+            {"$match": {"diagnostic_reports.uploaded_at": uploaded}},
+            {"$project": {"diagnostic_reports.file_url": 0}},
+            {"$unwind": "$diagnostic_reports"},
+            {
+                "$project": {
+                    "patient_id": 1,
+                    "user_id": 1,
+                    "report": "$diagnostic_reports",
                 }
-            )
+            },
+            {"$match": keyset_filter(page, "report.uploaded_at", "report.report_id")},
+            {"$sort": dict(keyset_sort("report.uploaded_at", "report.report_id"))},
+            {"$limit": page.limit + 1},
+        ]
+    ).to_list()
+    rows = finalize_page(
+        rows,
+        page,
+        response,
+        lambda row: (row["report"]["uploaded_at"], row["report"]["report_id"]),
+    )
+
+    users = await fetch_users(row.get("user_id") for row in rows)
+    reports = []
+    for row in rows:
+        user = users.get(row.get("user_id"))
+        r = row["report"]
+        reports.append(
+            {
+                "patient_id": row["patient_id"],
+                "patient_name": user.full_name if user else "N/A",
+                "report_id": r["report_id"],
+                "report_type": r["report_type"],
+                "file_url": report_download_path(r["report_id"]),
+                "created_at": r["uploaded_at"],
+            }
+        )
     return reports
 
 
 @router.get("/reports/{patient_id}")
 async def get_patient_reports(
     patient_id: PydanticObjectId,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
 ):
     if current_user.role != UserRole.LAB_ASSISTANT:
         raise HTTPException(
@@ -322,11 +411,14 @@ async def get_patient_reports(
             detail="Only lab assistants can access this",
         )
 
-    patient = await Patient.get(patient_id)
+    patient = await find_by_id(Patient, patient_id, PatientWithReports)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    return patient.diagnostic_reports or []
+    reports = patient.diagnostic_reports or []
+    for r in reports:
+        r.file_url = report_download_path(r.report_id)
+    return reports
 
 
 @router.delete("/reports/{patient_id}/{report_id}")
@@ -341,20 +433,17 @@ async def delete_report_for_patient(
             detail="Only lab assistants can access this",
         )
 
-    patient = await Patient.get(patient_id)
+    patient = await find_by_id(Patient, patient_id, PatientWithReports)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    # keep all reports except the one to delete
-    original_len = len(patient.diagnostic_reports or [])
-    patient.diagnostic_reports = [
-        r for r in (patient.diagnostic_reports or []) if str(r.id) != report_id
+    removed = [
+        r for r in (patient.diagnostic_reports or []) if r.report_id == report_id
     ]
-
-    if len(patient.diagnostic_reports) == original_len:
+    if not removed:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    await patient.save()
+    await _remove_report(patient.id, report_id, removed)
     return {"message": "Report deleted"}
 
 
@@ -369,30 +458,97 @@ async def delete_report(
             detail="Only lab assistants can access this",
         )
 
-    patients = await Patient.find().to_list()
-    found = False
+    p = await Patient.find_one(
+        {"diagnostic_reports.report_id": report_id},
+        projection_model=PatientWithReports,
+    )
+    if not p:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    removed = [r for r in p.diagnostic_reports if r.report_id == report_id]
+    await _remove_report(p.id, report_id, removed)
+    return {"message": "Report deleted"}
+
+
+async def _remove_report(
+    patient_oid: PydanticObjectId,
+    report_id: str,
+    removed: list,
+) -> None:
+    """Pull a report out of a patient, update counters and drop its file"""
+    await Patient.get_motor_collection().update_one(
+        {"_id": patient_oid},
+        {
+            "$pull": {"diagnostic_reports": {"report_id": report_id}},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+    )
+    await increment_lab_stats(reports=-len(removed))
 
-    for p in patients:
-        if not p.diagnostic_reports:
-            continue
+    for r in removed:
+        if r.content_key:
+            await get_report_store().delete(r.content_key)
 
-        new_reports = [r for r in p.diagnostic_reports if r.report_id != report_id]
 
-        if len(new_reports) != len(p.diagnostic_reports):
-            p.diagnostic_reports = new_reports
-            p.updated_at = datetime.utcnow()
-            await p.save()
-            found = True
-            break
+@router.get("/reports/{report_id}/download")
+async def download_report(
+    report_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream a diagnostic report file.
 
-    if not found:
+    Available to lab assistants, doctors and the patient who owns the report.
+    """
+    patient = await Patient.find_one({"diagnostic_reports.report_id": report_id})
+    if not patient:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    return {"message": "Report deleted"}
+    is_owner = (
+        current_user.role == UserRole.PATIENT
+        and patient.user_id == str(current_user.id)
+    )
+    if not (
+        is_owner
+        or current_user.role in (UserRole.LAB_ASSISTANT, UserRole.DOCTOR)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to download this report",
+        )
+
+    report = next(r for r in patient.diagnostic_reports if r.report_id == report_id)
+    filename = report.file_name or f"{report.report_type}_{report.report_id}"
+    headers = {"Content-Disposition": content_disposition("inline", filename)}
+
+    # Reports uploaded before the report store existed are still embedded
+    if not report.content_key:
+        if not report.file_url or not report.file_url.startswith("data:"):
+            raise HTTPException(status_code=404, detail="Report file not found")
+        content_type, data = parse_data_url(report.file_url)
+        return Response(
+            content=data,
+            media_type=content_type or "application/octet-stream",
+            headers=headers,
+        )
+
+    try:
+        chunks = await get_report_store().open(report.content_key)
+    except ReportNotFound:
+        raise HTTPException(status_code=404, detail="Report file not found")
+
+    if report.file_size is not None:
+        headers["Content-Length"] = str(report.file_size)
+
+    return StreamingResponse(
+        chunks,
+        media_type=report.content_type or "application/octet-stream",
+        headers=headers,
+    )
 
 
 @router.get("/statistics")
-async def get_lab_statistics(current_user: User = Depends(get_current_user)):
+async def get_lab_statistics(current_user: User = Depends(get_read_only_user)):
     """Get lab assistant statistics"""
 
     if current_user.role != UserRole.LAB_ASSISTANT:
@@ -402,16 +558,10 @@ async def get_lab_statistics(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        total_patients = len(await Patient.find().to_list())
-
-        # Count total reports uploaded
-        patients = await Patient.find().to_list()
-        total_reports = sum(len(p.diagnostic_reports or []) for p in patients)
-
-        print(
-            f"📊 Statistics: {total_patients} patients, {total_reports} reports",
-            file=sys.stderr,
-        )
+        # Counters are maintained on write, so this is a single-document read
+        stats = await get_lab_stats()
+        total_patients = stats["total_patients"]
+        total_reports = stats["reports_uploaded"]
 
         return {
             "total_patients": total_patients,
@@ -433,7 +583,7 @@ async def get_lab_statistics(current_user: User = Depends(get_current_user)):
 @router.get("/patients/{patient_id}/details")
 async def get_patient_details_for_lab(
     patient_id: PydanticObjectId,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_read_only_user),
 ):
     """
     Return full patient info + diagnostic history for lab assistant.
@@ -444,7 +594,7 @@ async def get_patient_details_for_lab(
             detail="Only lab assistants can access this",
         )
 
-    patient = await Patient.get(patient_id)
+    patient = await find_by_id(Patient, patient_id, PatientWithReports)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -472,7 +622,7 @@ async def get_patient_details_for_lab(
                 "report_type": r.report_type,
                 "uploaded_by": r.uploaded_by,
                 "uploaded_at": r.uploaded_at,
-                "file_url": r.file_url,
+                "file_url": report_download_path(r.report_id),
                 "notes": r.notes,
             }
         )
@@ -488,10 +638,12 @@ async def get_patient_details_for_lab(
 @router.get("/patients/{patient_id}/download-pdf")
 async def download_patient_pdf_for_lab(
     patient_id: PydanticObjectId,
-    current_user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_read_only_user),
 ):
     """
     Generate a styled PDF of patient info + diagnostic history for download.
+    Rendered PDFs are cached by content, and the ETag lets clients revalidate.
     """
     if current_user.role != UserRole.LAB_ASSISTANT:
         raise HTTPException(
@@ -499,7 +651,7 @@ async def download_patient_pdf_for_lab(
             detail="Only lab assistants can access this",
         )
 
-    patient = await Patient.get(patient_id)
+    patient = await find_by_id(Patient, patient_id, PatientWithReports)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -507,130 +659,146 @@ async def download_patient_pdf_for_lab(
         )
 
     user = await User.get(patient.user_id) if patient.user_id else None
-    reports = patient.diagnostic_reports or []
+    snapshot = patient_pdf_snapshot(patient, user)
+    key = snapshot_digest(snapshot)
+    cache_headers = {
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, no-cache",
+    }
 
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=0.5 * inch,
-        leftMargin=0.5 * inch,
-        topMargin=0.5 * inch,
-        bottomMargin=0.5 * inch,
-    )
+    if etag_matches(if_none_match, cache_headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
 
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "Title",
-        parent=styles["Heading1"],
-        fontSize=20,
-        textColor=colors.HexColor("#11998e"),
-        alignment=TA_CENTER,
-        spaceAfter=8,
-    )
-    heading_style = ParagraphStyle(
-        "Heading",
-        parent=styles["Heading2"],
-        fontSize=14,
-        textColor=colors.HexColor("#11998e"),
-        spaceBefore=12,
-        spaceAfter=8,
+    try:
+        pdf = await pdf_cache.get_or_render(
+            key, lambda: render_patient_pdf_async(snapshot)
+        )
+    except PdfRendererBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF export is busy, please try again shortly",
+            headers={"Retry-After": str(settings.PDF_QUEUE_TIMEOUT_SECONDS)},
+        )
+
+    # Named after the date printed in the PDF, so a cached copy keeps its name
+    updated_at = snapshot["updated_at"]
+    filename = f"patient_{patient.patient_id}_{updated_at.strftime('%Y%m%d_%H%M')}.pdf"
+
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={
+            **cache_headers,
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
     )
-    normal_style = ParagraphStyle(
-        "NormalCustom",
-        parent=styles["Normal"],
-        fontSize=10,
-        alignment=TA_LEFT,
-        spaceAfter=4,
+
+
+# ============================================================================
+# BULK PDF EXPORT JOBS
+# ============================================================================
+
+
+def _export_job_response(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=str(job.id),
+        status=job.status,
+        filters=job.filters,
+        total=job.total,
+        processed=job.processed,
+        failed=job.failed,
+        error=job.error,
+        file_size=job.file_size,
+        download_url=(
+            export_download_path(str(job.id))
+            if job.status == ExportJobStatus.COMPLETED
+            else None
+        ),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
     )
 
-    story = []
 
-    story.append(Paragraph("PATIENT MEDICAL RECORD", title_style))
-    story.append(
-        Paragraph(
-            f"Generated: {datetime.utcnow().strftime('%d %B %Y, %H:%M UTC')}",
-            normal_style,
+async def _get_own_export_job(job_id: PydanticObjectId, current_user) -> ExportJob:
+    if current_user.role != UserRole.LAB_ASSISTANT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only lab assistants can access this",
         )
-    )
-    story.append(Spacer(1, 0.3 * inch))
 
-    # Patient info
-    story.append(Paragraph("PATIENT INFORMATION", heading_style))
+    job = await ExportJob.get(job_id)
+    if not job or job.requested_by != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found",
+        )
+    return job
 
-    patient_rows = [
-        ["Full Name", user.full_name if user else "N/A"],
-        ["Email", user.email if user else "N/A"],
-        ["Patient ID", patient.patient_id],
-        ["Gender", patient.gender or "N/A"],
-        ["Blood Group", patient.blood_group or "N/A"],
-    ]
 
-    patient_table = Table(patient_rows, colWidths=[2 * inch, 4 * inch])
-    patient_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#E8F7F6")),
-                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#CCCCCC")),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                ("TOPPADDING", (0, 0), (-1, -1), 4),
-            ]
+@router.post(
+    "/exports",
+    response_model=ExportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_export_job(
+    filters: ExportJobCreate,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Queue a bulk PDF export of every patient matching the filters.
+    Poll GET /exports/{job_id} and download the ZIP once it is completed.
+    """
+    if current_user.role != UserRole.LAB_ASSISTANT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only lab assistants can export patient records",
         )
-    )
-    story.append(patient_table)
-    story.append(Spacer(1, 0.2 * inch))
 
-    # Diagnostic history
-    story.append(
-        Paragraph(f"DIAGNOSTIC HISTORY ({len(reports)} reports)", heading_style)
+    await purge_expired_exports()
+
+    job = ExportJob(
+        requested_by=str(current_user.id),
+        filters=filters.model_dump(mode="json", exclude_none=True),
     )
+    await job.insert()
+    start_export_job(job)
 
-    if reports:
-        for idx, r in enumerate(reports, 1):
-            story.append(
-                Paragraph(
-                    f"<b>Report {idx}: {r.report_type}</b> "
-                    f"({r.uploaded_at.strftime('%d %B %Y, %H:%M UTC')})",
-                    normal_style,
-                )
-            )
-            rows = [
-                ["Uploaded By", r.uploaded_by or "N/A"],
-            ]
-            if r.notes:
-                rows.append(["Notes", r.notes])
-
-            report_table = Table(rows, colWidths=[2 * inch, 4 * inch])
-            report_table.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#FFFFFF")),
-                        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, -1), 9),
-                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#DDDDDD")),
-                        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
-                        ("TOPPADDING", (0, 0), (-1, -1), 4),
-                    ]
-                )
-            )
-            story.append(report_table)
-            story.append(Spacer(1, 0.15 * inch))
-    else:
-        story.append(Paragraph("No diagnostic reports found.", normal_style))
+    return _export_job_response(job)
 
-    doc.build(story)
-    buffer.seek(0)
 
-    filename = f"patient_{patient.patient_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M')}.pdf"
+@router.get("/exports/{job_id}", response_model=ExportJobResponse)
+async def get_export_job(
+    job_id: PydanticObjectId,
+    current_user: User = Depends(get_read_only_user),
+):
+    """Status and progress of a bulk export job"""
+    job = await _get_own_export_job(job_id, current_user)
+    return _export_job_response(job)
 
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+
+@router.get("/exports/{job_id}/download")
+async def download_export_job(
+    job_id: PydanticObjectId,
+    current_user: User = Depends(get_read_only_user),
+):
+    """Stream the finished export ZIP from disk"""
+    job = await _get_own_export_job(job_id, current_user)
+    if job.status != ExportJobStatus.COMPLETED or not job.file_name:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status.value}",
+        )
+
+    path = export_file_path(job.file_name)
+    if not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export file has expired",
+        )
+
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=f"patient_export_{job.created_at.strftime('%Y%m%d_%H%M')}.zip",
     )
@@ -1,16 +1,21 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
 from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse
-from app.models.patient import Patient
+from app.models.patient import Patient, PatientRef, PatientSummary, PatientWithReports
 from app.models.user import User, UserRole
 from app.api.routes.auth import get_current_user
-from datetime import datetime
-from typing import List, Optional
+from app.services.lookup import fetch_users, find_by_id
+from app.services.report_storage import report_download_path
+from app.services.stats import increment_lab_stats
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
 import random
+import re
+import logging
 import string
-import traceback
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 def generate_patient_id() -> str:
@@ -20,6 +25,94 @@ def generate_patient_id() -> str:
     return f"MED{year}{random_num}"
 
 
+def build_patient_search_pipeline(
+    query: str = "",
+    blood_group: Optional[str] = None,
+    condition: Optional[str] = None,
+    min_age: Optional[int] = None,
+    max_age: Optional[int] = None,
+    name_matches: Sequence[str] = (),
+) -> List[dict]:
+    """
+    Build the aggregation pipeline behind /search.
+
+    Every filter, including the name / patient ID query, is applied to
+    patients before the join: `name_matches` are the ids of the patient
+    users whose name matched `query` (see find_patient_users_by_name), so
+    only the patients being returned are joined to their user document.
+    """
+    match: dict = {}
+
+    if query:
+        match["$or"] = [
+            {"user_id": {"$in": list(name_matches)}},
+            {"patient_id": {"$regex": re.escape(query), "$options": "i"}},
+        ]
+
+    if blood_group:
+        match["blood_group"] = blood_group
+
+    if condition:
+        # Case-insensitive exact match against any listed condition
+        match["chronic_conditions"] = {
+            "$regex": f"^{re.escape(condition)}$",
+            "$options": "i",
+        }
+
+    # age = (now - date_of_birth).days // 365, so turn age bounds into
+    # date_of_birth bounds instead of computing an age per document
+    now = datetime.now()
+    dob_range = {}
+    if min_age:
+        dob_range["$lte"] = now - timedelta(days=min_age * 365)
+    if max_age:
+        dob_range["$gt"] = now - timedelta(days=(max_age + 1) * 365)
+    if dob_range:
+        match["date_of_birth"] = dob_range
+
+    pipeline: List[dict] = [
+        {"$match": match},
+        {
+            "$lookup": {
+                "from": "users",
+                "let": {
+                    "user_oid": {
+                        "$convert": {
+                            "input": "$user_id",
+                            "to": "objectId",
+                            "onError": None,
+                            "onNull": None,
+                        }
+                    }
+                },
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user_oid"]}}},
+                    {"$project": {"full_name": 1, "email": 1}},
+                ],
+                "as": "user",
+            }
+        },
+        # Patients without a user account are skipped, as before
+        {"$unwind": "$user"},
+        # Report payloads are served by the download endpoint, never here
+        {"$project": {"diagnostic_reports.file_url": 0}},
+    ]
+
+    return pipeline
+
+
+async def find_patient_users_by_name(query: str) -> List[str]:
+    """Ids of patient users whose full name contains `query` (any case)"""
+    users = await User.get_motor_collection().find(
+        {
+            "role": UserRole.PATIENT.value,
+            "full_name": {"$regex": re.escape(query), "$options": "i"},
+        },
+        projection={"_id": 1},
+    ).to_list(length=None)
+    return [str(u["_id"]) for u in users]
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_patient_profile(
     patient_data: PatientCreate,
@@ -28,46 +121,27 @@ async def create_patient_profile(
     """Create patient profile (patients only)"""
 
     try:
-        print(f"\n{'='*100}")
-        print("🔍 CREATING PATIENT PROFILE")
-        print(f"{'='*100}")
-        print(f"User: {current_user.email}")
-        print(f"User ID: {current_user.id}")
-        print(f"Role: {current_user.role}")
-
         # 1. Validate role
         if current_user.role != UserRole.PATIENT:
-            print("❌ REJECTED: Not a patient")
             return JSONResponse(
                 status_code=403,
                 content={"detail": "Only patients can create profiles"},
             )
 
-        print("✅ 1. Role validated")
-
         # 2. Check existing profile
-        existing = await Patient.find_one(Patient.user_id == str(current_user.id))
+        existing = await Patient.find_one(
+            Patient.user_id == str(current_user.id), projection_model=PatientRef
+        )
         if existing:
-            print("❌ REJECTED: Profile already exists")
             return JSONResponse(
                 status_code=400,
                 content={"detail": "Patient profile already exists"},
             )
 
-        print("✅ 2. No existing profile")
-
         # 3. Generate patient ID
         patient_id = generate_patient_id()
-        print(f"✅ 3. Generated patient ID: {patient_id}")
 
         # 4. Create patient object
-        print("📋 Data being saved:")
-        print(f"   DOB: {patient_data.date_of_birth} (type: {type(patient_data.date_of_birth)})")
-        print(f"   Gender: {patient_data.gender}")
-        print(f"   Allergies: {patient_data.allergies}")
-        print(f"   Conditions: {patient_data.chronic_conditions}")
-        print(f"   Medications: {patient_data.current_medications}")
-
         patient = Patient(
             patient_id=patient_id,
             user_id=str(current_user.id),
@@ -86,12 +160,13 @@ async def create_patient_profile(
             updated_at=datetime.utcnow(),
         )
 
-        print("✅ 4. Patient object created")
-
         # 5. Insert to database
         await patient.insert()
-        print(f"✅✅✅ 5. SAVED TO DATABASE: {patient.id}")
-        print(f"{'='*100}\n")
+        await increment_lab_stats(patients=1)
+        logger.info(
+            "Patient profile created",
+            extra={"patient_id": patient.patient_id, "user_id": patient.user_id},
+        )
 
         # Return response
         return JSONResponse(
@@ -116,9 +191,7 @@ async def create_patient_profile(
         )
 
     except Exception as e:
-        print(f"❌ ERROR: {e}")
-        traceback.print_exc()
-        print(f"{'='*100}\n")
+        logger.exception("Failed to create patient profile")
         return JSONResponse(
             status_code=500,
             content={"detail": f"Error: {str(e)}"},
@@ -129,7 +202,9 @@ async def create_patient_profile(
 async def get_my_profile(current_user: User = Depends(get_current_user)):
     """Get my patient profile"""
 
-    patient = await Patient.find_one(Patient.user_id == str(current_user.id))
+    patient = await Patient.find_one(
+        Patient.user_id == str(current_user.id), projection_model=PatientSummary
+    )
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -166,7 +241,10 @@ async def get_my_reports(current_user: User = Depends(get_current_user)):
         )
 
     try:
-        patient = await Patient.find_one(Patient.user_id == str(current_user.id))
+        patient = await Patient.find_one(
+            Patient.user_id == str(current_user.id),
+            projection_model=PatientWithReports,
+        )
 
         if not patient:
             raise HTTPException(status_code=404, detail="Patient profile not found")
@@ -179,7 +257,7 @@ async def get_my_reports(current_user: User = Depends(get_current_user)):
                 "report_type": r.report_type,
                 "uploaded_by": r.uploaded_by,
                 "uploaded_at": r.uploaded_at.isoformat(),
-                "file_url": r.file_url,
+                "file_url": report_download_path(r.report_id),
                 "notes": r.notes,
             }
             for r in reports
@@ -265,100 +343,80 @@ async def search_patients(
         )
 
     try:
-        print(f"\n{'='*80}")
-        print("🔍 PATIENT SEARCH REQUEST")
-        print(f"{'='*80}")
-        print(f"Doctor: {current_user.full_name}")
-        print(f"Query: '{query}'")
-        print(f"Blood Group Filter: {blood_group}")
-        print(f"Condition Filter: {condition}")
-        print(f"Age Range: {min_age}-{max_age}")
-
-        patients = await Patient.find().to_list()
+        name_matches = await find_patient_users_by_name(query) if query else []
+        pipeline = build_patient_search_pipeline(
+            query=query,
+            blood_group=blood_group,
+            condition=condition,
+            min_age=min_age,
+            max_age=max_age,
+            name_matches=name_matches,
+        )
+        patients = await Patient.aggregate(pipeline).to_list()
         result = []
 
         for patient in patients:
-            user = await User.get(patient.user_id)
-            if not user:
-                continue
-
-            # Apply search query filter
-            if query:
-                query_lower = query.lower()
-                if (
-                    query_lower not in user.full_name.lower()
-                    and query_lower not in patient.patient_id.lower()
-                ):
-                    continue
-
-            # Apply blood group filter
-            if blood_group and patient.blood_group != blood_group:
-                continue
-
-            # Apply condition filter
-            if condition:
-                if condition.lower() not in [
-                    c.lower() for c in (patient.chronic_conditions or [])
-                ]:
-                    continue
-
-            # Calculate age and apply age filters
-            age = None
-            if patient.date_of_birth:
-                age = (datetime.now() - patient.date_of_birth).days // 365
+            user = patient["user"]
+            date_of_birth = patient.get("date_of_birth")
 
-                if min_age and age < min_age:
-                    continue
-                if max_age and age > max_age:
-                    continue
+            age = None
+            if date_of_birth:
+                age = (datetime.now() - date_of_birth).days // 365
 
             # Format diagnostic reports
             reports = []
-            for report in (patient.diagnostic_reports or []):
+            for report in (patient.get("diagnostic_reports") or []):
                 reports.append(
                     {
-                        "report_id": report.report_id,
-                        "report_type": report.report_type,
-                        "uploaded_by": report.uploaded_by,
-                        "uploaded_at": report.uploaded_at.isoformat(),
-                        "file_url": report.file_url,
-                        "notes": report.notes,
+                        "report_id": report.get("report_id"),
+                        "report_type": report.get("report_type"),
+                        "uploaded_by": report.get("uploaded_by"),
+                        "uploaded_at": report["uploaded_at"].isoformat(),
+                        "file_url": report_download_path(report["report_id"]),
+                        "notes": report.get("notes"),
                     }
                 )
 
             result.append(
                 {
-                    "id": str(patient.id),
-                    "patient_id": patient.patient_id,
-                    "name": user.full_name,
-                    "email": user.email,
+                    "id": str(patient["_id"]),
+                    "patient_id": patient["patient_id"],
+                    "name": user.get("full_name"),
+                    "email": user.get("email"),
                     "age": age,
-                    "date_of_birth": patient.date_of_birth.isoformat()
-                    if patient.date_of_birth
+                    "date_of_birth": date_of_birth.isoformat()
+                    if date_of_birth
                     else None,
-                    "gender": patient.gender,
-                    "blood_group": patient.blood_group,
-                    "address": patient.address,
-                    "emergency_contact": patient.emergency_contact,
-                    "emergency_contact_name": patient.emergency_contact_name,
-                    "allergies": patient.allergies,
-                    "chronic_conditions": patient.chronic_conditions,
-                    "current_medications": patient.current_medications,
-                    "past_operations": patient.past_operations,
+                    "gender": patient.get("gender"),
+                    "blood_group": patient.get("blood_group"),
+                    "address": patient.get("address"),
+                    "emergency_contact": patient.get("emergency_contact"),
+                    "emergency_contact_name": patient.get("emergency_contact_name"),
+                    "allergies": patient.get("allergies", []),
+                    "chronic_conditions": patient.get("chronic_conditions", []),
+                    "current_medications": patient.get("current_medications", []),
+                    "past_operations": patient.get("past_operations", []),
                     "diagnostic_reports": reports,
-                    "created_at": patient.created_at.isoformat(),
-                    "updated_at": patient.updated_at.isoformat(),
+                    "created_at": patient["created_at"].isoformat(),
+                    "updated_at": patient["updated_at"].isoformat(),
                 }
             )
 
-        print(f"✅ Found {len(result)} matching patients")
-        print(f"{'='*80}\n")
+        logger.debug(
+            "Patient search",
+            extra={
+                "doctor_id": str(current_user.id),
+                "has_query": bool(query),
+                "blood_group": blood_group,
+                "min_age": min_age,
+                "max_age": max_age,
+                "count": len(result),
+            },
+        )
         return result
 
     except Exception as e:
-        print(f"❌ Error searching patients: {str(e)}")
-        traceback.print_exc()
-        print(f"{'='*80}\n")
+        logger.exception("Failed to search patients")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error searching patients: {str(e)}",
@@ -386,15 +444,7 @@ async def get_patient_details(
         )
 
     try:
-        print(f"\n{'='*80}")
-        print("📋 PATIENT DETAILS REQUEST")
-        print(f"{'='*80}")
-        print(f"Doctor: {current_user.full_name}")
-        print(f"Patient ID: {patient_id}")
-
-        from bson import ObjectId
-
-        patient = await Patient.get(ObjectId(patient_id))
+        patient = await find_by_id(Patient, patient_id, PatientWithReports)
 
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
@@ -409,9 +459,11 @@ async def get_patient_details(
                 Prescription.patient_id == patient_id
             ).sort(-Prescription.created_at).to_list()
 
+            presc_doctors = await fetch_users(p.doctor_id for p in prescriptions)
+
             prescription_list = []
             for presc in prescriptions:
-                presc_doctor = await User.get(presc.doctor_id)
+                presc_doctor = presc_doctors.get(presc.doctor_id)
                 prescription_list.append(
                     {
                         "id": str(presc.id),
@@ -425,7 +477,10 @@ async def get_patient_details(
                     }
                 )
         except Exception as presc_error:
-            print(f"⚠️ Could not fetch prescriptions: {presc_error}")
+            logger.warning(
+                "Could not fetch prescriptions for patient details",
+                exc_info=presc_error,
+            )
             prescription_list = []
 
         # Get appointment history
@@ -436,9 +491,11 @@ async def get_patient_details(
                 Appointment.patient_id == patient_id
             ).sort(-Appointment.created_at).to_list()
 
+            apt_doctors = await fetch_users(a.doctor_id for a in appointments)
+
             appointment_list = []
             for apt in appointments:
-                apt_doctor = await User.get(apt.doctor_id)
+                apt_doctor = apt_doctors.get(apt.doctor_id)
                 appointment_list.append(
                     {
                         "id": str(apt.id),
@@ -452,7 +509,10 @@ async def get_patient_details(
                     }
                 )
         except Exception as apt_error:
-            print(f"⚠️ Could not fetch appointments: {apt_error}")
+            logger.warning(
+                "Could not fetch appointments for patient details",
+                exc_info=apt_error,
+            )
             appointment_list = []
 
         # Format diagnostic reports
@@ -464,7 +524,7 @@ async def get_patient_details(
                     "report_type": report.report_type,
                     "uploaded_by": report.uploaded_by,
                     "uploaded_at": report.uploaded_at.isoformat(),
-                    "file_url": report.file_url,
+                    "file_url": report_download_path(report.report_id),
                     "notes": report.notes,
                 }
             )
@@ -500,20 +560,12 @@ async def get_patient_details(
             "updated_at": patient.updated_at.isoformat(),
         }
 
-        print("✅ Patient details retrieved")
-        print(f"   Reports: {len(reports)}")
-        print(f"   Prescriptions: {len(prescription_list)}")
-        print(f"   Appointments: {len(appointment_list)}")
-        print(f"{'='*80}\n")
-
         return result
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error fetching patient details: {str(e)}")
-        traceback.print_exc()
-        print(f"{'='*80}\n")
+        logger.exception("Failed to fetch patient details")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching patient details: {str(e)}",
@@ -534,11 +586,10 @@ async def get_patient_prescriptions(
         )
 
     try:
-        from bson import ObjectId
         from app.models.prescription import Prescription
 
         # Verify patient exists
-        patient = await Patient.get(ObjectId(patient_id))
+        patient = await find_by_id(Patient, patient_id, PatientRef)
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
 
@@ -546,9 +597,11 @@ async def get_patient_prescriptions(
             Prescription.patient_id == patient_id
         ).sort(-Prescription.created_at).to_list()
 
+        doctors = await fetch_users(p.doctor_id for p in prescriptions)
+
         result = []
         for presc in prescriptions:
-            doctor = await User.get(presc.doctor_id)
+            doctor = doctors.get(presc.doctor_id)
             result.append(
                 {
                     "id": str(presc.id),
@@ -571,8 +624,7 @@ async def get_patient_prescriptions(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error fetching prescriptions: {e}")
-        traceback.print_exc()
+        logger.exception("Failed to fetch prescriptions")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error: {str(e)}",
@@ -593,11 +645,10 @@ async def get_patient_appointments(
         )
 
     try:
-        from bson import ObjectId
         from app.models.appointment import Appointment
 
         # Verify patient exists
-        patient = await Patient.get(ObjectId(patient_id))
+        patient = await find_by_id(Patient, patient_id, PatientRef)
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
 
@@ -605,9 +656,11 @@ async def get_patient_appointments(
             Appointment.patient_id == patient_id
         ).sort(-Appointment.created_at).to_list()
 
+        doctors = await fetch_users(a.doctor_id for a in appointments)
+
         result = []
         for apt in appointments:
-            doctor = await User.get(apt.doctor_id)
+            doctor = doctors.get(apt.doctor_id)
             result.append(
                 {
                     "id": str(apt.id),
@@ -629,8 +682,7 @@ async def get_patient_appointments(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error fetching appointments: {e}")
-        traceback.print_exc()
+        logger.exception("Failed to fetch appointments")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error: {str(e)}",
@@ -1,18 +1,21 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from app.schemas.prescription import PrescriptionCreate, PrescriptionResponse
 from app.models.prescription import Prescription, Medicine
 from app.models.user import User, UserRole
-from app.models.patient import Patient
+from app.models.patient import Patient, PatientRef
 from app.models.doctor_profile import DoctorProfile
-from app.api.routes.auth import get_current_user
+from app.api.routes.auth import get_current_user, get_read_only_user
 from app.core.database import get_database
+from app.core.pagination import PageParams, finalize_page, keyset_filter, keyset_sort
+from app.services.lookup import fetch_users, fetch_patients_with_users, find_by_id
 from datetime import datetime
 from typing import List
 from bson import ObjectId
 import uuid
-import traceback
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_prescription(
@@ -24,7 +27,7 @@ async def create_prescription(
         raise HTTPException(status_code=403, detail="Only doctors")
     
     try:
-        patient = await Patient.get(ObjectId(prescription_data.patient_id))
+        patient = await find_by_id(Patient, prescription_data.patient_id, PatientRef)
         if not patient:
             raise HTTPException(status_code=404, detail="Patient not found")
         
@@ -61,8 +64,7 @@ async def create_prescription(
         }
         
     except Exception as e:
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Failed to create prescription")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/patient/{patient_id}", response_model=List[dict])
@@ -77,7 +79,8 @@ async def get_patient_prescriptions(
     try:
         # Find patient by patient_id
         patient = await Patient.find_one(
-            Patient.patient_id == patient_id
+            Patient.patient_id == patient_id,
+            projection_model=PatientRef
         )
         
         if not patient:
@@ -91,10 +94,12 @@ async def get_patient_prescriptions(
             {"patient_id": str(patient.id)}
         ).sort("created_at", -1).to_list(None)
         
+        doctors = await fetch_users(p.get("doctor_id") for p in prescriptions_data)
+
         result = []
         for presc_data in prescriptions_data:
             try:
-                doctor = await User.get(ObjectId(presc_data.get("doctor_id")))
+                doctor = doctors.get(presc_data.get("doctor_id"))
                 result.append({
                     "id": str(presc_data.get("_id")),
                     "prescription_id": presc_data.get("prescription_id"),
@@ -107,14 +112,13 @@ async def get_patient_prescriptions(
                     "created_at": presc_data.get("created_at").isoformat() if presc_data.get("created_at") else None
                 })
             except Exception as e:
-                print(f"Error processing prescription: {str(e)}")
+                logger.warning("Skipping malformed prescription", exc_info=True)
                 continue
         
         return result
         
     except Exception as e:
-        print(f"Error fetching prescriptions: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Failed to fetch patient prescriptions")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/{prescription_id}")
@@ -129,7 +133,7 @@ async def get_prescription_details(
             raise HTTPException(status_code=404, detail="Not found")
         
         doctor = await User.get(ObjectId(prescription.doctor_id))
-        patient = await Patient.get(ObjectId(prescription.patient_id))
+        patient = await find_by_id(Patient, prescription.patient_id, PatientRef)
         patient_user = await User.get(patient.user_id) if patient else None
         
         return {
@@ -148,13 +152,14 @@ async def get_prescription_details(
         }
         
     except Exception as e:
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Failed to fetch prescription details")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 @router.get("/my/all", response_model=List[dict])
 async def get_my_prescriptions(
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_read_only_user)
 ):
     """Get all prescriptions written by current doctor"""
     if current_user.role != UserRole.DOCTOR:
@@ -165,14 +170,22 @@ async def get_my_prescriptions(
         prescriptions_collection = db["prescriptions"]
         
         prescriptions_data = await prescriptions_collection.find(
-            {"doctor_id": str(current_user.id)}
-        ).sort("created_at", -1).to_list(None)
+            {"doctor_id": str(current_user.id), **keyset_filter(page)}
+        ).sort(keyset_sort()).limit(page.limit + 1).to_list(None)
+        prescriptions_data = finalize_page(
+            prescriptions_data, page, response,
+            lambda d: (d["created_at"], d["_id"])
+        )
         
+        patients, patient_users = await fetch_patients_with_users(
+            p.get("patient_id") for p in prescriptions_data
+        )
+
         result = []
         for presc_data in prescriptions_data:
             try:
-                patient = await Patient.get(ObjectId(presc_data.get("patient_id")))
-                patient_user = await User.get(patient.user_id) if patient else None
+                patient = patients.get(presc_data.get("patient_id"))
+                patient_user = patient_users.get(patient.user_id) if patient else None
                 result.append({
                     "id": str(presc_data.get("_id")),
                     "prescription_id": presc_data.get("prescription_id"),
@@ -182,12 +195,11 @@ async def get_my_prescriptions(
                     "created_at": presc_data.get("created_at").isoformat() if presc_data.get("created_at") else None
                 })
             except Exception as e:
-                print(f"Error processing prescription: {str(e)}")
+                logger.warning("Skipping malformed prescription", exc_info=True)
                 continue
         
         return result
         
     except Exception as e:
-        print(f"Error: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Failed to fetch prescriptions")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
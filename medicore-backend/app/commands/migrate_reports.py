@@ -0,0 +1,102 @@
+"""
+Move diagnostic report files embedded as base64 data URLs in `patients`
+into the configured report store.
+
+Usage:
+    python -m app.commands.migrate_reports [--dry-run]
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from app.core.database import connect_to_mongo, close_mongo_connection
+from app.models.patient import Patient
+from app.services.report_storage import (
+    get_report_store,
+    parse_data_url,
+    report_download_path,
+)
+
+
+async def migrate_reports(dry_run: bool = False) -> int:
+    """Migrate every embedded report; returns the number of reports moved"""
+    store = get_report_store()
+    moved = 0
+
+    # Iterate with a cursor so only one patient is held in memory at a time
+    legacy = Patient.find(
+        {
+            "diagnostic_reports": {
+                "$elemMatch": {
+                    "content_key": None,
+                    "file_url": {"$regex": "^data:"},
+                }
+            }
+        }
+    )
+    collection = Patient.get_motor_collection()
+    async for patient in legacy:
+        for report in patient.diagnostic_reports:
+            if report.content_key or not (report.file_url or "").startswith("data:"):
+                continue
+
+            content_type, data = parse_data_url(report.file_url)
+            print(
+                f"📦 {patient.patient_id}: report {report.report_id} "
+                f"({len(data)} bytes)"
+            )
+            moved += 1
+            if dry_run:
+                continue
+
+            stored = await store.put(
+                data, report.file_name or report.report_id, content_type
+            )
+            # Update just this report in place: saving the whole patient
+            # would drop reports uploaded while the migration was running
+            result = await collection.update_one(
+                {"_id": patient.id},
+                {
+                    "$set": {
+                        "diagnostic_reports.$[r].content_key": stored.key,
+                        "diagnostic_reports.$[r].content_type": content_type,
+                        "diagnostic_reports.$[r].file_size": stored.size,
+                        "diagnostic_reports.$[r].sha256": stored.sha256,
+                        "diagnostic_reports.$[r].file_url": report_download_path(
+                            report.report_id
+                        ),
+                        "updated_at": datetime.utcnow(),
+                    }
+                },
+                array_filters=[
+                    {"r.report_id": report.report_id, "r.content_key": None}
+                ],
+            )
+            if not result.modified_count:
+                # Deleted or migrated by someone else meanwhile
+                print(f"   ⚠️  report {report.report_id} changed, skipped")
+                await store.delete(stored.key)
+                moved -= 1
+
+    return moved
+
+
+async def main(dry_run: bool) -> None:
+    await connect_to_mongo()
+    try:
+        moved = await migrate_reports(dry_run=dry_run)
+        action = "Would migrate" if dry_run else "Migrated"
+        print(f"✅ {action} {moved} embedded reports")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report what would be migrated",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
@@ -0,0 +1,27 @@
+"""
+Rebuild the maintained dashboard counters in the `stats` collection from
+the source collections. Safe to run at any time, e.g. from cron.
+
+Usage:
+    python -m app.commands.reconcile_stats
+"""
+import asyncio
+
+from app.core.database import connect_to_mongo, close_mongo_connection
+from app.services.stats import reconcile_lab_stats
+
+
+async def main() -> None:
+    await connect_to_mongo()
+    try:
+        stats = await reconcile_lab_stats()
+        print(
+            f"✅ Lab stats reconciled: {stats['total_patients']} patients, "
+            f"{stats['reports_uploaded']} reports"
+        )
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
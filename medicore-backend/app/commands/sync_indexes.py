@@ -0,0 +1,175 @@
+"""
+Compare the indexes declared on the Beanie models with the ones that
+exist in MongoDB, and optionally build the missing ones.
+
+The app creates missing indexes itself when it starts, which blocks
+startup for as long as the build takes on a large collection. Run this
+before deploying a release that declares new indexes, so the build
+happens ahead of time and startup finds them in place.
+
+Usage:
+    python -m app.commands.sync_indexes            # report only
+    python -m app.commands.sync_indexes --apply    # build missing indexes
+    python -m app.commands.sync_indexes --apply --drop  # ...and drop undeclared ones
+"""
+import argparse
+import asyncio
+import json
+from typing import Dict, List, Tuple
+
+from beanie.odm.fields import IndexModelField
+from beanie.odm.utils.pydantic import get_model_fields
+from beanie.odm.utils.typing import get_index_attributes
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
+
+from app.core.config import settings
+from app.core.database import DOCUMENT_MODELS
+
+# Index options that change what an index does; anything else (v, ns,
+# background) is ignored when comparing
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+IndexSpec = Tuple[tuple, tuple]
+
+
+def declared_indexes(model) -> List[IndexModel]:
+    """
+    Indexes Beanie would create for `model`: Indexed() fields merged with
+    Settings.indexes, the latter winning on the same fields.
+    """
+    from_fields = []
+    for name, field in get_model_fields(model).items():
+        attrs = get_index_attributes(field)
+        if attrs is not None:
+            from_fields.append(
+                IndexModelField(IndexModel([(field.alias or name, attrs[0])], **attrs[1]))
+            )
+
+    from_settings = [
+        IndexModelField(index if isinstance(index, IndexModel) else IndexModel(index))
+        for index in getattr(model.Settings, "indexes", [])
+    ]
+    merged = IndexModelField.merge_indexes(from_fields, from_settings)
+    return [index.index for index in merged]
+
+
+def _spec(key, options: dict) -> IndexSpec:
+    """Hashable (key, options) form of an index, comparable across sources"""
+    return (
+        tuple(
+            (field, int(direction) if isinstance(direction, (int, float)) else direction)
+            for field, direction in key
+        ),
+        tuple(
+            (name, json.dumps(options[name], sort_keys=True, default=str))
+            for name in COMPARED_OPTIONS
+            if options.get(name)
+        ),
+    )
+
+
+def _describe(spec: IndexSpec) -> str:
+    key, options = spec
+    fields = ", ".join(f"{field} {direction}" for field, direction in key)
+    extra = "".join(f" {name}={value}" for name, value in options)
+    return f"({fields}){extra}"
+
+
+async def sync_collection(db, model, apply: bool, drop: bool) -> Tuple[int, int]:
+    """Diff and optionally fix one collection; returns (missing, undeclared)"""
+    collection = db[model.Settings.name]
+    live: Dict[str, IndexSpec] = {
+        name: _spec(info["key"], info)
+        for name, info in (await collection.index_information()).items()
+        if name != "_id_"
+    }
+    declared = {
+        index.document["name"]: (index, _spec(index.document["key"].items(), index.document))
+        for index in declared_indexes(model)
+    }
+
+    live_specs = set(live.values())
+    declared_specs = {spec for _, spec in declared.values()}
+    missing = [
+        (name, index, spec)
+        for name, (index, spec) in declared.items()
+        if spec not in live_specs
+    ]
+    undeclared = [(name, spec) for name, spec in live.items() if spec not in declared_specs]
+
+    print(f"📂 {model.Settings.name}")
+    for name, _, spec in missing:
+        print(f"   + {name} {_describe(spec)}")
+    for name, spec in undeclared:
+        print(f"   - {name} {_describe(spec)} (not declared)")
+    if not missing and not undeclared:
+        print("   ✓ up to date")
+
+    if apply and drop:
+        # Drop first: a changed index keeps its name and cannot be rebuilt
+        # until the old definition is gone
+        for name, _ in undeclared:
+            await collection.drop_index(name)
+            print(f"   🗑️  dropped {name}")
+            live.pop(name)
+
+    if apply and missing:
+        to_build = []
+        for name, index, _ in missing:
+            if name in live:
+                print(f"   ⚠️  {name} exists with a different definition; rerun with --drop")
+                continue
+            options = {
+                k: v for k, v in index.document.items() if k not in ("key", "background")
+            }
+            # Ignored by MongoDB 4.2+, which never holds the lock for the
+            # whole build; older servers otherwise block the collection
+            to_build.append(
+                IndexModel(list(index.document["key"].items()), background=True, **options)
+            )
+        if to_build:
+            built = await collection.create_indexes(to_build)
+            print(f"   🔨 built {', '.join(built)}")
+
+    return len(missing), len(undeclared)
+
+
+async def sync_indexes(apply: bool = False, drop: bool = False) -> Tuple[int, int]:
+    """Diff every model's collection; returns total (missing, undeclared)"""
+    # Plain Motor rather than connect_to_mongo: init_beanie would build
+    # every missing index in the foreground before we could report them
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    try:
+        db = client[settings.DATABASE_NAME]
+        totals = [0, 0]
+        for model in DOCUMENT_MODELS:
+            missing, undeclared = await sync_collection(db, model, apply, drop)
+            totals[0] += missing
+            totals[1] += undeclared
+        return totals[0], totals[1]
+    finally:
+        client.close()
+
+
+async def main(apply: bool, drop: bool) -> None:
+    missing, undeclared = await sync_indexes(apply=apply, drop=drop)
+    print(f"✅ {missing} indexes missing, {undeclared} not declared by any model")
+    if not apply and (missing or undeclared):
+        print("   Run with --apply to build them (and --drop to remove the others)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Build missing indexes in the background",
+    )
+    parser.add_argument(
+        "--drop",
+        action="store_true",
+        help="With --apply, also drop live indexes that no model declares",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.apply, args.drop))
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # MongoDB
@@ -10,9 +10,121 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Password hashing (bcrypt runs on a dedicated thread pool)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+
+    # Login rate limiting (token buckets per client IP and per email)
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_IP_BURST: int = 50
+    LOGIN_IP_PER_MINUTE: int = 60
+    LOGIN_EMAIL_BURST: int = 10
+    LOGIN_EMAIL_PER_MINUTE: int = 10
+    # Identical failed credentials are rejected without a lookup for this long
+    LOGIN_FAILURE_CACHE_SECONDS: int = 60
+    # Comma-separated proxy IPs/CIDRs (e.g. "10.0.0.0/8,127.0.0.1") whose
+    # X-Forwarded-For is believed; empty keys buckets on the socket peer
+    TRUSTED_PROXIES: str = ""
+
+    # Authenticated-user cache
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Let read-only routes trust the role claim in the JWT instead of
+    # loading the user (role changes then apply on the next login)
+    TRUST_TOKEN_ROLE_CLAIMS: bool = False
     
     # CORS
     ALLOWED_ORIGINS: str
+
+    # Diagnostic report file storage: "gridfs" or "local"
+    REPORT_STORAGE_BACKEND: str = "gridfs"
+    REPORT_STORAGE_PATH: str = "storage/reports"
+
+    # Upload size limits (bytes)
+    MAX_REPORT_UPLOAD_SIZE: int = 50 * 1024 * 1024
+    MAX_PROFILE_PICTURE_SIZE: int = 2 * 1024 * 1024
+
+    # PDF export (ReportLab renders in a worker process pool)
+    PDF_WORKERS: int = 2
+    PDF_MAX_CONCURRENT_RENDERS: int = 4
+    PDF_QUEUE_TIMEOUT_SECONDS: int = 10
+    # Rendered PDFs are cached on disk by content hash (LRU, size-capped)
+    PDF_CACHE_PATH: str = "storage/pdf-cache"
+    PDF_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Bulk export jobs write their ZIPs here and keep them this long
+    EXPORT_JOB_PATH: str = "storage/exports"
+    EXPORT_JOB_RETENTION_HOURS: int = 24
+    EXPORT_JOB_BATCH_SIZE: int = 20
+    # Render slots all jobs together may hold, leaving the rest of
+    # PDF_MAX_CONCURRENT_RENDERS to interactive downloads
+    EXPORT_JOB_CONCURRENCY: int = 2
+
+    # Follow-up reminders (in-process scheduler)
+    REMINDERS_ENABLED: bool = True
+    REMINDER_POLL_SECONDS: int = 60
+    REMINDER_BATCH_SIZE: int = 100
+    # Reminders go out this long before the follow-up date
+    REMINDER_LEAD_HOURS: int = 24
+    # A claimed reminder that was not confirmed sent is retried after this
+    REMINDER_CLAIM_SECONDS: int = 300
+    # "log" appends reminders to NOTIFICATION_LOG_PATH, "email" mails them
+    REMINDER_NOTIFIER: str = "log"
+    NOTIFICATION_LOG_PATH: str = "storage/notifications.log"
+
+    # Outgoing email (queued; sent in batches over pooled SMTP connections)
+    EMAIL_ENABLED: bool = False
+    EMAIL_FROM: str = "Medicore <no-reply@medicore.local>"
+    EMAIL_SMTP_HOST: str = "localhost"
+    EMAIL_SMTP_PORT: int = 25
+    EMAIL_SMTP_USERNAME: Optional[str] = None
+    EMAIL_SMTP_PASSWORD: Optional[str] = None
+    EMAIL_SMTP_STARTTLS: bool = False
+    EMAIL_SMTP_TIMEOUT_SECONDS: int = 10
+    EMAIL_CONNECTION_IDLE_SECONDS: int = 60
+    EMAIL_POOL_SIZE: int = 2
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_QUEUE_MAX: int = 10000
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: int = 2
+    EMAIL_DEAD_LETTER_PATH: str = "storage/email-dead-letter.jsonl"
+
+    # Logging: JSON lines written from a background thread. LOG_LEVELS
+    # overrides per logger, e.g. "app.api.routes.patients=DEBUG,pymongo=WARNING"
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_JSON: bool = True
+
+    # Mongo instrumentation: log commands slower than this, and requests
+    # issuing more than this many commands
+    DB_SLOW_QUERY_MS: int = 100
+    DB_QUERY_WARN_THRESHOLD: int = 20
+
+    # Health probes: /health/ready fails on a slow ping, a saturated Mongo
+    # pool with waiters, or event-loop lag above the limit
+    HEALTH_PING_TIMEOUT_MS: int = 1000
+    HEALTH_MAX_POOL_SATURATION: float = 0.9
+    HEALTH_MAX_LOOP_LAG_MS: int = 500
+    HEALTH_LOOP_LAG_INTERVAL_MS: int = 250
+    HEALTH_LOOP_LAG_WINDOW_SECONDS: int = 10
+
+    # Appointments: how far ahead to look for a free slot to suggest when
+    # a booking loses its slot
+    SLOT_SUGGESTION_DAYS: int = 14
+    # Weekdays a doctor may list in their availability
+    MAX_AVAILABILITY_DAYS: int = 3
+    # In-memory index behind /api/appointments/next-available
+    NEXT_SLOT_HORIZON_DAYS: int = 30
+    NEXT_SLOT_REFRESH_SECONDS: int = 300
+    NEXT_SLOT_MAX_RESULTS: int = 50
+    # Bounds for one multi-doctor availability query
+    AVAILABILITY_QUERY_MAX_DAYS: int = 31
+    AVAILABILITY_QUERY_MAX_DOCTORS: int = 50
+
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = 100
+    MAX_PAGE_SIZE: int = 500
     
     # Application
     APP_NAME: str = "Medicore"
@@ -25,4 +137,8 @@ class Settings(BaseSettings):
     def allowed_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def trusted_proxies_list(self) -> List[str]:
+        return [proxy.strip() for proxy in self.TRUSTED_PROXIES.split(",") if proxy.strip()]
+
 settings = Settings()
\ No newline at end of file
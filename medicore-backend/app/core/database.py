@@ -1,13 +1,29 @@
+import logging
+
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.core.config import settings
+from app.core.db_monitor import DbCommandListener, pool_stats
 from app.models.user import User
 from app.models.patient import Patient
 from app.models.appointment import Appointment
 from app.models.prescription import Prescription
 from app.models.doctor_profile import DoctorProfile
 from app.models.lab_assistant import LabAssistant
+from app.models.export_job import ExportJob
+
+
+logger = logging.getLogger(__name__)
 
+DOCUMENT_MODELS = [
+    User,
+    Patient,
+    Appointment,
+    Prescription,
+    DoctorProfile,
+    LabAssistant,
+    ExportJob,
+]
 
 client: AsyncIOMotorClient = None
 db = None
@@ -15,24 +31,28 @@ db = None
 async def connect_to_mongo():
     """Connect to MongoDB"""
     global client, db
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        event_listeners=[DbCommandListener(), pool_stats],
+    )
     db = client[settings.DATABASE_NAME]
     
     # Initialize beanie with all document models
-    await init_beanie(
-        database=db,
-        document_models=[User, Patient, Appointment, Prescription, DoctorProfile, LabAssistant]
-    )
+    await init_beanie(database=db, document_models=DOCUMENT_MODELS)
     
-    print("✅ Connected to MongoDB")
+    logger.info("Connected to MongoDB", extra={"database": settings.DATABASE_NAME})
 
 async def close_mongo_connection():
     """Close MongoDB connection"""
     global client
     if client:
         client.close()
-    print("❌ Closed MongoDB connection")
+    logger.info("Closed MongoDB connection")
 
 def get_database():
     """Get database instance"""
     return db
+
+def get_client():
+    """Get the Motor client (None before connect_to_mongo)"""
+    return client
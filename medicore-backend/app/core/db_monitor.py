@@ -0,0 +1,200 @@
+import logging
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+
+logger = logging.getLogger(__name__)
+
+
+class RequestDbStats:
+    """Mongo commands issued while serving one request"""
+
+    __slots__ = ("queries", "duration", "documents")
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+        self.documents = 0
+
+
+# Set per request by DbMonitorMiddleware. Motor runs pymongo on its
+# executor with a copy of the caller's context, so listener callbacks see
+# the stats object of the request that issued the command.
+db_stats_var: ContextVar[Optional[RequestDbStats]] = ContextVar("db_stats", default=None)
+
+
+def _documents_returned(command: str, reply) -> int:
+    """Best-effort count of documents in a command reply"""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    if "value" in reply:
+        return 1 if reply["value"] is not None else 0
+    if command == "count":
+        return int(reply.get("n", 0))
+    return 0
+
+
+class DbCommandListener(monitoring.CommandListener):
+    """
+    Attributes every Mongo command to the current request, if any, and
+    logs commands slower than DB_SLOW_QUERY_MS.
+    """
+
+    def __init__(self):
+        # (connection, request id) -> (command, collection) for in-flight commands
+        self._pending: Dict[Tuple[object, int], Tuple[str, Optional[str]]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        collection = event.command.get(event.command_name)
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.command_name,
+            collection if isinstance(collection, str) else None,
+        )
+        stats = db_stats_var.get()
+        if stats is not None:
+            stats.queries += 1
+
+    def _finished(self, event, reply=None) -> None:
+        command, collection = self._pending.pop(
+            (event.connection_id, event.request_id), (event.command_name, None)
+        )
+        documents = _documents_returned(command, reply) if reply else 0
+        duration = event.duration_micros / 1_000_000
+
+        stats = db_stats_var.get()
+        if stats is not None:
+            stats.duration += duration
+            stats.documents += documents
+
+        if duration * 1000 >= settings.DB_SLOW_QUERY_MS:
+            logger.warning(
+                "Slow Mongo command",
+                extra={
+                    "command": command,
+                    "collection": collection,
+                    "duration_ms": round(duration * 1000, 1),
+                    "documents": documents,
+                },
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finished(event, event.reply)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finished(event)
+
+
+class DbMonitorMiddleware:
+    """
+    Collects per-request Mongo stats, logs requests issuing more than
+    DB_QUERY_WARN_THRESHOLD commands and, in DEBUG, reports the count in
+    an X-DB-Queries response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = list(message.get("headers", []))
+                headers.append((DB_QUERIES_HEADER.lower().encode(), str(stats.queries).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = db_stats_var.set(stats)
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            db_stats_var.reset(token)
+            if stats.queries > settings.DB_QUERY_WARN_THRESHOLD:
+                route = scope.get("route")
+                logger.warning(
+                    "Request issued many Mongo commands",
+                    extra={
+                        "method": scope["method"],
+                        "route": getattr(route, "path", scope["path"]),
+                        "queries": stats.queries,
+                        "db_time_ms": round(stats.duration * 1000, 1),
+                        "documents": stats.documents,
+                    },
+                )
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool usage per server from CMAP events; pymongo has
+    no public API for checked-out or waiting counts.
+    """
+
+    def __init__(self):
+        self.in_use: Dict[Tuple[str, int], int] = {}
+        self.waiting: Dict[Tuple[str, int], int] = {}
+        self.open: Dict[Tuple[str, int], int] = {}
+
+    def _add(self, counts: Dict[Tuple[str, int], int], address, delta: int) -> None:
+        counts[address] = max(0, counts.get(address, 0) + delta)
+
+    def snapshot(self, max_pool_size: int) -> dict:
+        """Busiest server pool: connections in use, open and waiting, and saturation"""
+        addresses = set(self.in_use) | set(self.waiting) | set(self.open)
+        busiest = max(addresses, key=lambda a: self.in_use.get(a, 0), default=None)
+        in_use = self.in_use.get(busiest, 0)
+        return {
+            "max_pool_size": max_pool_size,
+            "in_use": in_use,
+            "open": self.open.get(busiest, 0),
+            "waiting": sum(self.waiting.values()),
+            "saturation": round(in_use / max_pool_size, 3) if max_pool_size else 0.0,
+        }
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        for counts in (self.in_use, self.waiting, self.open):
+            counts.pop(event.address, None)
+
+    def connection_created(self, event) -> None:
+        self._add(self.open, event.address, 1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._add(self.open, event.address, -1)
+
+    def connection_check_out_started(self, event) -> None:
+        self._add(self.waiting, event.address, 1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._add(self.waiting, event.address, -1)
+
+    def connection_checked_out(self, event) -> None:
+        self._add(self.waiting, event.address, -1)
+        self._add(self.in_use, event.address, 1)
+
+    def connection_checked_in(self, event) -> None:
+        self._add(self.in_use, event.address, -1)
+
+
+pool_stats = PoolStatsListener()
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import get_client
+from app.core.db_monitor import pool_stats
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag by sleeping for a fixed interval and recording
+    how late the wake-up was. A loop blocked by CPU work (PDF rendering,
+    bcrypt on the loop) shows up here even though /health/ready itself can
+    only run once the loop is free again.
+    """
+
+    def __init__(self, interval: float, window: float):
+        self.interval = interval
+        self.window = window
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self._samples.append((now, max(0.0, now - started - self.interval)))
+            while self._samples and self._samples[0][0] < now - self.window:
+                self._samples.popleft()
+
+    def stats(self) -> dict:
+        """Latest and worst lag (ms) over the window"""
+        if not self._samples:
+            return {"current_ms": 0.0, "max_ms": 0.0}
+        return {
+            "current_ms": round(self._samples[-1][1] * 1000, 1),
+            "max_ms": round(max(lag for _, lag in self._samples) * 1000, 1),
+        }
+
+
+loop_lag_monitor = LoopLagMonitor(
+    interval=settings.HEALTH_LOOP_LAG_INTERVAL_MS / 1000,
+    window=settings.HEALTH_LOOP_LAG_WINDOW_SECONDS,
+)
+
+
+async def ping_database() -> dict:
+    """Timed `ping` against the Motor client"""
+    client = get_client()
+    if client is None:
+        return {"ok": False, "error": "not connected"}
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            client.admin.command("ping"),
+            timeout=settings.HEALTH_PING_TIMEOUT_MS / 1000,
+        )
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": "timeout"}
+    except Exception as e:
+        return {"ok": False, "error": type(e).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+async def check_readiness() -> Tuple[bool, dict]:
+    """
+    Ready when Mongo answers a ping in time, the pool is not saturated
+    with callers queueing for connections, and the loop is not lagging.
+    """
+    database = await ping_database()
+
+    client = get_client()
+    max_pool_size = client.options.pool_options.max_pool_size if client else 0
+    pool = pool_stats.snapshot(max_pool_size)
+    pool["ok"] = not (
+        pool["saturation"] >= settings.HEALTH_MAX_POOL_SATURATION and pool["waiting"] > 0
+    )
+
+    loop_lag = loop_lag_monitor.stats()
+    loop_lag["ok"] = loop_lag["max_ms"] <= settings.HEALTH_MAX_LOOP_LAG_MS
+
+    ready = database["ok"] and pool["ok"] and loop_lag["ok"]
+    return ready, {"database": database, "pool": pool, "event_loop": loop_lag}
@@ -0,0 +1,172 @@
+import bisect
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from app.core.db_monitor import db_stats_var
+from app.core.security import password_pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+DB_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = ([0] * (len(self.buckets) + 1), [0.0])
+            self._series[labels] = series
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = _format_labels(labels, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{_format_labels(labels, [("le", "+Inf")])} {cumulative}')
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, labels: Labels, amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels, value: float) -> None:
+        self._values[labels] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+# Per-process metrics; each worker exposes its own and Prometheus sums them
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status")
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size by route", SIZE_BUCKETS
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Mongo commands issued per HTTP request", DB_QUERY_BUCKETS
+)
+PASSWORD_HASHES = Gauge(
+    "password_hash_calls", "bcrypt hash/verify calls on the password pool by state"
+)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    # Sampled at scrape time; a sustained queue means logins are waiting on bcrypt
+    pool = password_pool_stats()
+    PASSWORD_HASHES.set((("state", "in_flight"),), pool["in_flight"])
+    PASSWORD_HASHES.set((("state", "queued"),), pool["queued"])
+
+    lines: List[str] = []
+    for metric in (
+        REQUESTS, IN_FLIGHT, LATENCY, RESPONSE_SIZE, DB_QUERIES, PASSWORD_HASHES
+    ):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _route_label(scope) -> str:
+    # FastAPI stores the matched APIRoute in the scope; using its template
+    # (not the raw path) keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records latency, response size, status and Mongo command count for
+    every HTTP request, labelled by method and route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        body_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        # Set by the enclosing DbMonitorMiddleware
+        stats = db_stats_var.get()
+        IN_FLIGHT.inc(())
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec(())
+
+            labels = (("method", method), ("route", _route_label(scope)))
+            REQUESTS.inc(labels + (("status", str(status_code)),))
+            LATENCY.observe(labels, elapsed)
+            RESPONSE_SIZE.observe(labels, body_size)
+            DB_QUERIES.observe(labels, stats.queries if stats else 0)
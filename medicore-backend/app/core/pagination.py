@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException, Query, Response, status
+from pymongo import DESCENDING
+
+from app.core.config import settings
+
+# List endpoints return the page as the body and the opaque cursor for the
+# next page in this header (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Query parameters shared by every paginated list endpoint.
+
+    The cursor is decoded here, in the dependency, so a malformed cursor is
+    rejected with 400 before the endpoint body runs.
+    """
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor"),
+        limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.after: Optional[Tuple[datetime, str]] = (
+            decode_cursor(cursor) if cursor else None
+        )
+
+
+def encode_cursor(sort_value: datetime, tie_value: Any) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    raw = json.dumps({"v": sort_value.isoformat(), "id": str(tie_value)})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(raw["v"]), str(raw["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_filter(
+    page: PageParams,
+    field: str = "created_at",
+    tie_field: str = "_id",
+) -> dict:
+    """
+    Mongo filter selecting rows strictly after the page cursor in
+    (field DESC, tie_field DESC) order. Empty for the first page.
+    """
+    if page.after is None:
+        return {}
+
+    sort_value, tie_value = page.after
+    if tie_field == "_id" and ObjectId.is_valid(tie_value):
+        tie_value = ObjectId(tie_value)
+
+    return {
+        "$or": [
+            {field: {"$lt": sort_value}},
+            {field: sort_value, tie_field: {"$lt": tie_value}},
+        ]
+    }
+
+
+def keyset_sort(field: str = "created_at", tie_field: str = "_id") -> List[tuple]:
+    """Sort order matching keyset_filter"""
+    return [(field, DESCENDING), (tie_field, DESCENDING)]
+
+
+def finalize_page(
+    rows: List[Any],
+    page: PageParams,
+    response: Response,
+    key: Callable[[Any], Tuple[datetime, Any]],
+) -> List[Any]:
+    """
+    Trim a `limit + 1` fetch down to the page and, when more rows exist,
+    set the next-page cursor header from the last row's sort key.
+    """
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
+
+
+async def paginate(
+    query,
+    page: PageParams,
+    response: Response,
+    field: str = "created_at",
+) -> List[Any]:
+    """Fetch one keyset page of a Beanie find query ordered by `field` DESC"""
+    rows = (
+        await query.find(keyset_filter(page, field))
+        .sort(keyset_sort(field))
+        .limit(page.limit + 1)
+        .to_list()
+    )
+    return finalize_page(rows, page, response, lambda row: (getattr(row, field), row.id))
@@ -0,0 +1,166 @@
+import hashlib
+import hmac
+import ipaddress
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+
+class RateLimitBackend(ABC):
+    """
+    Token-bucket storage. The in-process backend is the default; a shared
+    backend (e.g. Redis) only has to implement `take` so that all workers
+    see the same buckets.
+    """
+
+    @abstractmethod
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """
+        Try to take one token from bucket `key`.
+        Returns 0 when allowed, otherwise seconds until a token is available.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets, bounded to `max_keys` (oldest evicted)"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+
+        tokens = min(float(capacity), tokens + (now - updated_at) * refill_per_second)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+class FailedLoginCache:
+    """
+    Short-lived memory of (email, password) pairs that just failed, so an
+    identical retry is rejected without a user lookup or bcrypt verify.
+    Entries are keyed by an HMAC, never by the raw password.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 50_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def _key(self, email: str, password: str) -> str:
+        message = f"{email.lower()}\0{password}".encode("utf-8")
+        return hmac.new(settings.SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+    def contains(self, email: str, password: str) -> bool:
+        key = self._key(email, password)
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False
+        return True
+
+    def add(self, email: str, password: str) -> None:
+        if self.ttl <= 0:
+            return
+        key = self._key(email, password)
+        self._entries[key] = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+rate_limit_backend: RateLimitBackend = InMemoryRateLimitBackend()
+failed_login_cache = FailedLoginCache(ttl=settings.LOGIN_FAILURE_CACHE_SECONDS)
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(
+    proxies: Tuple[str, ...],
+) -> Tuple[Union[ipaddress.IPv4Network, ipaddress.IPv6Network], ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    networks = _trusted_networks(tuple(settings.trusted_proxies_list))
+    if not networks:
+        return False
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(request: Request) -> str:
+    """
+    Address to key per-IP buckets on. X-Forwarded-For is only read when the
+    connection comes from a trusted proxy, and then the nearest hop that is
+    not itself a trusted proxy wins, so clients cannot pick their own key.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = request.headers.get("x-forwarded-for", "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    # Every hop is one of our proxies: the leftmost is the closest to a client
+    return hops[0] if hops else peer
+
+
+async def enforce_login_rate_limit(request: Request, email: str) -> None:
+    """
+    Apply the per-IP and per-email login buckets. Raises 429 before any
+    database or bcrypt work is done for the attempt.
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+
+    checks = [
+        (
+            f"login:ip:{client_ip(request)}",
+            settings.LOGIN_IP_BURST,
+            settings.LOGIN_IP_PER_MINUTE / 60,
+        ),
+        (
+            f"login:email:{email.lower()}",
+            settings.LOGIN_EMAIL_BURST,
+            settings.LOGIN_EMAIL_PER_MINUTE / 60,
+        ),
+    ]
+
+    retry_after: Optional[float] = None
+    for key, capacity, refill in checks:
+        wait = await rate_limit_backend.take(key, capacity, refill)
+        if wait > 0:
+            retry_after = max(retry_after or 0, wait)
+
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
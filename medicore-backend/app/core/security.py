@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,8 +10,22 @@ from app.core.config import settings
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
 )
 
+# bcrypt is CPU-bound and takes hundreds of ms per call, so it runs on its
+# own small pool instead of the event loop (or the shared default executor)
+_password_pool = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_pool_lock = threading.Lock()
+_pool_pending = 0
+
+
+class PasswordHashPoolBusy(Exception):
+    """Raised when too many hash/verify calls are already queued"""
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -21,6 +38,40 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password_bytes.decode('utf-8'))
 
 
+async def _run_in_password_pool(func, *args):
+    global _pool_pending
+    with _pool_lock:
+        if _pool_pending >= settings.PASSWORD_HASH_MAX_QUEUE:
+            raise PasswordHashPoolBusy()
+        _pool_pending += 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, func, *args)
+    finally:
+        with _pool_lock:
+            _pool_pending -= 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password-hash pool"""
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password-hash pool"""
+    return await _run_in_password_pool(get_password_hash, password)
+
+
+def password_pool_stats() -> dict:
+    """Hash/verify calls running on the password-hash pool and waiting for it"""
+    pending = _pool_pending
+    return {
+        "in_flight": min(pending, settings.PASSWORD_HASH_WORKERS),
+        "queued": max(pending - settings.PASSWORD_HASH_WORKERS, 0),
+    }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
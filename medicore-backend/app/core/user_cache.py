@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of authenticated user snapshots, keyed by
+    user id. Keeps the per-request `User.get` out of the auth hot path.
+
+    Entries expire after `ttl` seconds; anything that changes a user's
+    role, active flag or existence must call `invalidate`.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[User]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        # Hand out a copy so a handler mutating current_user can't
+        # corrupt the cached snapshot
+        return user.model_copy()
+
+    def set(self, user: User) -> None:
+        if self.max_size <= 0:
+            return
+
+        user_id = str(user.id)
+        self._entries[user_id] = (time.monotonic() + self.ttl, user.model_copy())
+        self._entries.move_to_end(user_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user_id: str) -> None:
+    """Drop a user from the auth cache after changing or deleting them"""
+    user_cache.invalidate(user_id)
@@ -1,7 +1,26 @@
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.config import settings
 from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.db_monitor import DB_QUERIES_HEADER, DbMonitorMiddleware
+from app.core.health import check_readiness, loop_lag_monitor, ping_database
+from app.core.logging import (
+    REQUEST_ID_HEADER,
+    RequestIdMiddleware,
+    setup_logging,
+)
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.patient_pdf import shutdown_pdf_pool
+from app.services.pdf_export import fail_interrupted_exports
+from app.services.email import email_service
+from app.services.scheduling import SUGGESTED_SLOT_HEADER, backfill_slot_holds
+from app.services.slot_index import slot_index
+from app.services.reminders import start_reminder_scheduler, stop_reminder_scheduler
 from app.api.routes import (
     auth,
     patients,
@@ -12,6 +31,9 @@ from app.api.routes import (
     prescriptions,
 )
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Medicore API",
     description="Hospital Management System API",
@@ -25,21 +47,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER,
+        REQUEST_ID_HEADER,
+        DB_QUERIES_HEADER,
+        SUGGESTED_SLOT_HEADER,
+    ],
 )
+# Last added runs first: request id -> Mongo stats -> metrics -> CORS
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(DbMonitorMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 # Startup and Shutdown Events
 @app.on_event("startup")
 async def startup():
     await connect_to_mongo()
-    print("✅ MongoDB Connected")
-    print("🚀 Medicore API Started")
-    print("📚 API Docs: http://localhost:8000/docs")
+    loop_lag_monitor.start()
+    await fail_interrupted_exports()
+    await backfill_slot_holds()
+    slot_index.start(settings.NEXT_SLOT_REFRESH_SECONDS)
+    email_service.start()
+    start_reminder_scheduler()
+    logger.info("Medicore API started", extra={"docs": "/docs"})
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    await stop_reminder_scheduler()
+    await slot_index.stop()
+    await email_service.stop()
+    shutdown_pdf_pool()
+    await loop_lag_monitor.stop()
     await close_mongo_connection()
-    print("👋 MongoDB Connection Closed")
 
 
 # Include Routes
@@ -81,8 +121,37 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    database = await ping_database()
     return {
-        "status": "healthy",
+        "status": "healthy" if database["ok"] else "degraded",
         "api": "running",
-        "database": "connected",
+        "database": "connected" if database["ok"] else "unavailable",
     }
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe: 503 while Mongo is unreachable or slow, the connection
+    pool is saturated, or the event loop is lagging
+    """
+    ready, checks = await check_readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request metrics for this worker in Prometheus text format"""
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,5 +1,6 @@
-from beanie import Document
+from beanie import Document, Insert, Replace, Save, SaveChanges, before_event
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -13,6 +14,10 @@ class AppointmentStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses that give the doctor's time slot back
+SLOT_RELEASING_STATUSES = (AppointmentStatus.REJECTED, AppointmentStatus.CANCELLED)
+
+
 class Appointment(Document):
     # References
     patient_id: str  # Reference to Patient
@@ -33,17 +38,44 @@ class Appointment(Document):
     # Admin management fields (optional but useful)
     admin_notes: Optional[str] = None  # Why admin changed status/time
 
+    # Whether this appointment occupies its slot; derived from status on
+    # every write and backing the unique slot index below
+    holds_slot: bool = True
+
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def sync_holds_slot(self):
+        self.holds_slot = self.status not in SLOT_RELEASING_STATUSES
+
     class Settings:
         name = "appointments"
         indexes = [
-            "patient_id",
-            "doctor_id",
             "appointment_date",
             "status",
+            # A patient's appointments, newest first
+            IndexModel(
+                [("patient_id", ASCENDING), ("created_at", DESCENDING)],
+                name="patient_recent",
+            ),
+            # A doctor's appointments in keyset page order
+            IndexModel(
+                [("doctor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="doctor_recent",
+            ),
+            # One active appointment per doctor and start time. Keyed on a
+            # boolean rather than `status $nin` because partial indexes
+            # cannot express negation. Also serves every (doctor_id,
+            # appointment_date) range query, as those all ask for
+            # holds_slot: True.
+            IndexModel(
+                [("doctor_id", ASCENDING), ("appointment_date", ASCENDING)],
+                name="doctor_slot_unique",
+                unique=True,
+                partialFilterExpression={"holds_slot": True},
+            ),
         ]
 
     class Config:
@@ -1,7 +1,8 @@
 from beanie import Document
-from pydantic import Field, BaseModel
-from typing import Optional, List
+from pydantic import Field, BaseModel, PrivateAttr, field_validator, model_validator
+from typing import Optional, List, Tuple
 from datetime import datetime
+from enum import Enum
 
 
 class Degree(BaseModel):
@@ -20,7 +21,146 @@ class ClinicInfo(BaseModel):
     contact_number: Optional[str] = None
 
 
-class DoctorProfile(Document):
+class Weekday(str, Enum):
+    MONDAY = "Monday"
+    TUESDAY = "Tuesday"
+    WEDNESDAY = "Wednesday"
+    THURSDAY = "Thursday"
+    FRIDAY = "Friday"
+    SATURDAY = "Saturday"
+    SUNDAY = "Sunday"
+
+
+def parse_hhmm(value: str) -> int:
+    """ "09:30" -> 570 minutes after midnight ("24:00" is allowed as an end) """
+    hours, sep, minutes = value.strip().partition(":")
+    if not sep or not hours.isdigit() or not minutes.isdigit() or len(minutes) != 2:
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    total = int(hours) * 60 + int(minutes)
+    if int(minutes) >= 60 or total > 24 * 60:
+        raise ValueError(f"Invalid time {value!r}, expected HH:MM")
+    return total
+
+
+def format_hhmm(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def slot_label(start: int, end: int) -> str:
+    return f"{format_hhmm(start)}-{format_hhmm(end)}"
+
+
+class TimeRange(BaseModel):
+    """A span of working time within one day, "HH:MM" to "HH:MM" """
+    start: str = Field(..., description="Start time, e.g. 09:00")
+    end: str = Field(..., description="End time, e.g. 13:00")
+
+    @model_validator(mode="after")
+    def check_order(self):
+        start, end = parse_hhmm(self.start), parse_hhmm(self.end)
+        if start >= end:
+            raise ValueError(f"Time range {self.start}-{self.end} ends before it starts")
+        # Store in canonical form so labels and comparisons are stable
+        self.start, self.end = format_hhmm(start), format_hhmm(end)
+        return self
+
+    @classmethod
+    def from_label(cls, label: str) -> "TimeRange":
+        start, sep, end = label.partition("-")
+        if not sep:
+            raise ValueError(f"Invalid time slot {label!r}, expected HH:MM-HH:MM")
+        return cls(start=start, end=end)
+
+
+class DaySchedule(BaseModel):
+    """
+    A doctor's bookable time on one weekday: working-hour ranges cut into
+    `slot_minutes`-long slots, or one slot per range when `slot_minutes`
+    is unset. `time_slots` lists the resulting slots as "HH:MM-HH:MM"
+    labels; clients that only send `time_slots` (the original format)
+    get one working-hour range per slot.
+    """
+    day: Weekday
+    working_hours: List[TimeRange] = Field(default_factory=list)
+    slot_minutes: Optional[int] = Field(None, ge=5, le=24 * 60)
+    time_slots: List[str] = Field(default_factory=list)
+
+    # Slots as sorted (start, end) minute offsets, computed once on validation
+    _slots: List[Tuple[int, int]] = PrivateAttr(default_factory=list)
+
+    @field_validator("time_slots")
+    @classmethod
+    def check_time_slots(cls, value: List[str]) -> List[str]:
+        for label in value:
+            TimeRange.from_label(label)
+        return value
+
+    def _build_slots(self) -> List[Tuple[int, int]]:
+        slots = []
+        for hours in self.working_hours:
+            start, end = parse_hhmm(hours.start), parse_hhmm(hours.end)
+            step = self.slot_minutes or end - start
+            while start + step <= end:
+                slots.append((start, start + step))
+                start += step
+        return sorted(set(slots))
+
+    @model_validator(mode="after")
+    def build_slots(self):
+        slots = self._build_slots()
+        labels = [slot_label(start, end) for start, end in slots]
+        if self.time_slots and sorted(self.time_slots) != sorted(labels):
+            # Slots were edited directly (or this is the original format):
+            # they take precedence over the ranges they no longer match
+            self.working_hours = [TimeRange.from_label(label) for label in self.time_slots]
+            self.slot_minutes = None
+            slots = self._build_slots()
+            labels = [slot_label(start, end) for start, end in slots]
+        self.time_slots = labels
+        self._slots = slots
+        return self
+
+    @property
+    def slots(self) -> List[Tuple[int, int]]:
+        return self._slots
+
+
+class WeeklyAvailability(BaseModel):
+    """A doctor's weekly availability (at most MAX_AVAILABILITY_DAYS days)"""
+    availability: List[DaySchedule] = Field(default_factory=list)
+
+    @field_validator("availability", mode="before")
+    @classmethod
+    def drop_unreadable_schedule(cls, value):
+        # Schedules saved before they were validated may hold free-text
+        # slots; skip what cannot be parsed instead of failing to load
+        if not isinstance(value, list):
+            return value
+        readable = []
+        for entry in value:
+            if not isinstance(entry, dict):
+                readable.append(entry)
+                continue
+            if entry.get("day") not in Weekday._value2member_map_:
+                continue
+            labels = []
+            for label in entry.get("time_slots") or []:
+                try:
+                    TimeRange.from_label(label)
+                except ValueError:
+                    continue
+                labels.append(label)
+            readable.append({**entry, "time_slots": labels})
+        return readable
+
+    def schedule_for(self, day: str) -> Optional[DaySchedule]:
+        for schedule in self.availability:
+            if schedule.day.value == day:
+                return schedule
+        return None
+
+
+class DoctorProfile(Document, WeeklyAvailability):
     user_id: str  # Reference to User
 
     # Basic profile
@@ -37,9 +177,7 @@ class DoctorProfile(Document):
     # Clinic / practice details
     clinic_info: Optional[ClinicInfo] = None
 
-    # Availability (max 3 days)
-    # Format: [{"day": "Monday", "time_slots": ["09:00-10:00", "10:00-11:00"]}]
-    availability: List[dict] = Field(default_factory=list)
+    # Weekly availability: see WeeklyAvailability
 
     # Statistics
     total_consultations: int = 0
@@ -50,3 +188,9 @@ class DoctorProfile(Document):
 
     class Settings:
         name = "doctor_profiles"
+        indexes = ["user_id"]
+
+
+class DoctorScheduleRef(WeeklyAvailability):
+    """Just a doctor's availability, without the rest of the profile"""
+    user_id: str
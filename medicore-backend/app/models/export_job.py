@@ -0,0 +1,49 @@
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+from pydantic import Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class ExportJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportJob(Document):
+    """
+    Bulk patient PDF export. The job renders one PDF per matching patient
+    into a ZIP under EXPORT_JOB_PATH; only the file name is kept here.
+    """
+
+    requested_by: str  # Reference to User (lab assistant)
+    status: ExportJobStatus = ExportJobStatus.QUEUED
+    filters: dict = Field(default_factory=dict)
+
+    # Progress
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+
+    # Result
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "export_jobs"
+        indexes = [
+            "requested_by",
+            # Finished jobs past retention are purged by this range scan
+            IndexModel(
+                [("status", ASCENDING), ("finished_at", ASCENDING)],
+                name="status_finished",
+            ),
+        ]
@@ -1,4 +1,5 @@
-from beanie import Document, Indexed
+from beanie import Document, Indexed, PydanticObjectId
+from pymongo import DESCENDING, IndexModel
 from pydantic import Field, BaseModel
 from typing import Optional, List
 from datetime import datetime
@@ -28,9 +29,17 @@ class DiagnosticReport(BaseModel):
     report_type: str
     uploaded_by: str  # Lab assistant name
     uploaded_at: datetime
-    file_url: str  # Base64 encoded file data
+    # Download path for stored files; legacy reports hold a base64 data URL
+    file_url: Optional[str] = None
     notes: Optional[str] = None
 
+    # File metadata - the bytes live in the report store under content_key
+    content_key: Optional[str] = None
+    content_type: Optional[str] = None
+    file_name: Optional[str] = None
+    file_size: Optional[int] = None
+    sha256: Optional[str] = None
+
 
 class Patient(Document):
     patient_id: Indexed(str, unique=True)
@@ -59,4 +68,60 @@ class Patient(Document):
     
     class Settings:
         name = "patients"
-        indexes = ["patient_id", "user_id"]
+        indexes = [
+            "patient_id",
+            "user_id",
+            "blood_group",
+            "chronic_conditions",
+            "date_of_birth",
+            "diagnostic_reports.report_id",
+            # Multikey: lets the lab report feed skip patients with no
+            # report on the requested page
+            "diagnostic_reports.uploaded_at",
+            # Patient lists in keyset page order
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="recent"),
+        ]
+
+
+# ---------- Projections ----------
+# Read-only views of a patient document. None of them load the legacy
+# base64 `diagnostic_reports.file_url` payloads; only the report download
+# endpoint reads those.
+
+
+class PatientRef(BaseModel):
+    """Just enough of a patient to resolve ownership and references"""
+    id: PydanticObjectId = Field(alias="_id")
+    patient_id: str
+    user_id: str
+
+
+class PatientSummary(PatientRef):
+    """Patient profile without diagnostic reports"""
+    date_of_birth: datetime
+    gender: Gender
+    blood_group: Optional[BloodGroup] = None
+    address: Optional[str] = None
+    emergency_contact: Optional[str] = None
+    emergency_contact_name: Optional[str] = None
+    allergies: List[str] = Field(default_factory=list)
+    chronic_conditions: List[str] = Field(default_factory=list)
+    past_operations: List[dict] = Field(default_factory=list)
+    current_medications: List[str] = Field(default_factory=list)
+    created_at: datetime
+    updated_at: datetime
+
+
+class PatientWithReports(PatientSummary):
+    """Patient profile plus report metadata (no file payloads)"""
+    diagnostic_reports: List[DiagnosticReport] = Field(default_factory=list)
+
+    class Settings:
+        projection = {
+            **{name: 1 for name in PatientSummary.model_fields if name != "id"},
+            **{
+                f"diagnostic_reports.{name}": 1
+                for name in DiagnosticReport.model_fields
+                if name != "file_url"
+            },
+        }
@@ -1,4 +1,5 @@
 from beanie import Document
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
@@ -29,9 +30,32 @@ class Prescription(Document):
     advice: Optional[str] = None
     follow_up_date: Optional[datetime] = None
     follow_up_reminder_sent: bool = False
+    # Set while a scheduler holds the reminder; an expired claim is retried
+    follow_up_reminder_claimed_until: Optional[datetime] = None
+    follow_up_reminder_sent_at: Optional[datetime] = None
     
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "prescriptions"
+        indexes = [
+            # A patient's prescriptions, newest first
+            IndexModel(
+                [("patient_id", ASCENDING), ("created_at", DESCENDING)],
+                name="patient_recent",
+            ),
+            # A doctor's prescriptions in keyset page order
+            IndexModel(
+                [("doctor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="doctor_recent",
+            ),
+            # Due follow-up reminders are found by a range scan on this
+            IndexModel(
+                [
+                    ("follow_up_reminder_sent", ASCENDING),
+                    ("follow_up_date", ASCENDING),
+                ],
+                name="follow_up_reminder_due",
+            ),
+        ]
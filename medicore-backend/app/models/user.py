@@ -1,4 +1,5 @@
 from beanie import Document, Indexed
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pydantic import EmailStr, Field
 from typing import Optional
 from datetime import datetime
@@ -30,7 +31,20 @@ class User(Document):
     
     class Settings:
         name = "users"
-        indexes = ["email"]
+        indexes = [
+            "email",
+            # Users by role (doctor lists) in keyset page order
+            IndexModel(
+                [("role", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="role_recent",
+            ),
+            IndexModel(
+                [("role", ASCENDING), ("specialization", ASCENDING)],
+                name="role_specialization",
+            ),
+            # All users in keyset page order (admin)
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="recent"),
+        ]
     
     class Config:
         json_schema_extra = {
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+from app.models.doctor_profile import DaySchedule
 
 
 class Degree(BaseModel):
@@ -40,7 +41,7 @@ class DoctorProfileUpdate(BaseModel):
 
 
 class AvailabilityUpdate(BaseModel):
-    availability: List[dict]
+    availability: List[DaySchedule]
 
 
 class DoctorProfileResponse(BaseModel):
@@ -54,7 +55,7 @@ class DoctorProfileResponse(BaseModel):
     languages: List[str]
     about: Optional[str]
     clinic_info: Optional[ClinicInfo]
-    availability: List[dict]
+    availability: List[DaySchedule]
     total_consultations: int
     average_rating: float
     created_at: datetime
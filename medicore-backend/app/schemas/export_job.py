@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
+from datetime import datetime
+from app.models.export_job import ExportJobStatus
+from app.models.patient import BloodGroup
+
+
+class ExportJobCreate(BaseModel):
+    """
+    Which patients to export. All given filters must match; report_type and
+    the upload range apply to the same report.
+    """
+    patient_ids: Optional[List[str]] = Field(default=None, max_length=10000)
+    blood_group: Optional[BloodGroup] = None
+    condition: Optional[str] = None
+    report_type: Optional[str] = None
+    uploaded_from: Optional[datetime] = None
+    uploaded_to: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if (
+            self.uploaded_from
+            and self.uploaded_to
+            and self.uploaded_from > self.uploaded_to
+        ):
+            raise ValueError("uploaded_from must be before uploaded_to")
+        return self
+
+
+class ExportJobResponse(BaseModel):
+    id: str
+    status: ExportJobStatus
+    filters: dict
+    total: int
+    processed: int
+    failed: int
+    error: Optional[str] = None
+    file_size: Optional[int] = None
+    download_url: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+import os
+import smtplib
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Set
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.user import User
+from app.services.lookup import fetch_patients_with_users, find_by_id
+
+
+logger = logging.getLogger(__name__)
+
+
+class OutgoingEmail(BaseModel):
+    """A queued plain-text email and its delivery attempts so far"""
+    to: str
+    subject: str
+    body: str
+    attempts: int = 0
+
+    def to_message(self) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = settings.EMAIL_FROM
+        message["To"] = self.to
+        message["Subject"] = self.subject
+        message.set_content(self.body)
+        return message
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies and refused recipients will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+class _SmtpConnection:
+    """
+    One persistent SMTP session, reused across batches and reopened when
+    it drops or has been idle too long. Only ever used from one thread at
+    a time (its worker's `to_thread` call).
+    """
+
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(
+            settings.EMAIL_SMTP_HOST,
+            settings.EMAIL_SMTP_PORT,
+            timeout=settings.EMAIL_SMTP_TIMEOUT_SECONDS,
+        )
+        if settings.EMAIL_SMTP_STARTTLS:
+            smtp.starttls()
+        if settings.EMAIL_SMTP_USERNAME:
+            smtp.login(settings.EMAIL_SMTP_USERNAME, settings.EMAIL_SMTP_PASSWORD or "")
+        return smtp
+
+    def send_batch(self, messages: List[EmailMessage]) -> List[Optional[Exception]]:
+        """Send each message over this session; returns one error (or None) per message"""
+        if (
+            self._smtp is not None
+            and time.monotonic() - self._last_used > settings.EMAIL_CONNECTION_IDLE_SECONDS
+        ):
+            self.close()
+
+        results: List[Optional[Exception]] = []
+        for message in messages:
+            try:
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                self._smtp.send_message(message)
+                results.append(None)
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                # Connection-level failure: reconnect for the next message
+                self.close()
+                results.append(e)
+            except smtplib.SMTPException as e:
+                results.append(e)
+
+        self._last_used = time.monotonic()
+        return results
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+
+class EmailService:
+    """
+    Queue-backed email delivery. Handlers call `enqueue`, which never
+    blocks on SMTP. EMAIL_POOL_SIZE workers each hold one SMTP connection
+    and send up to EMAIL_BATCH_SIZE queued messages per round trip to the
+    thread pool. Failures are retried with exponential backoff; messages
+    that run out of attempts (or are refused outright) go to the
+    dead-letter file as JSON lines.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: Dict[asyncio.TimerHandle, OutgoingEmail] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self.running or not settings.EMAIL_ENABLED:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.EMAIL_QUEUE_MAX)
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(settings.EMAIL_POOL_SIZE)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers; anything still queued or waiting to retry is dead-lettered"""
+        if not self.running:
+            return
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for handle in self._retries:
+            handle.cancel()
+        pending = list(self._retries.values())
+        self._retries.clear()
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for email in pending:
+            await self._dead_letter(email, "Undelivered at shutdown")
+
+    def enqueue(self, to: str, subject: str, body: str) -> bool:
+        """Queue a message for delivery; returns False if it was not queued"""
+        if not self.running:
+            return False
+        return self._put(OutgoingEmail(to=to, subject=subject, body=body))
+
+    def _put(self, email: OutgoingEmail) -> bool:
+        try:
+            self._queue.put_nowait(email)
+            return True
+        except asyncio.QueueFull:
+            self._spawn(self._dead_letter(email, "Email queue full"))
+            return False
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _worker(self) -> None:
+        connection = _SmtpConnection()
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                while len(batch) < settings.EMAIL_BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+
+                try:
+                    results = await asyncio.to_thread(
+                        connection.send_batch, [email.to_message() for email in batch]
+                    )
+                except Exception as e:
+                    results = [e] * len(batch)
+
+                for email, error in zip(batch, results):
+                    if error is not None:
+                        await self._retry_or_dead_letter(email, error)
+        finally:
+            await asyncio.to_thread(connection.close)
+
+    async def _retry_or_dead_letter(self, email: OutgoingEmail, error: Exception) -> None:
+        email.attempts += 1
+        if _is_permanent(error) or email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            await self._dead_letter(email, repr(error))
+            return
+
+        delay = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+        loop = asyncio.get_running_loop()
+
+        def _requeue():
+            self._retries.pop(handle, None)
+            self._put(email)
+
+        handle = loop.call_later(delay, _requeue)
+        self._retries[handle] = email
+
+    async def _dead_letter(self, email: OutgoingEmail, error: str) -> None:
+        line = json.dumps(
+            {
+                **email.model_dump(),
+                "error": error,
+                "failed_at": datetime.utcnow().isoformat(),
+            }
+        )
+        logger.error(
+            "Email dead-lettered",
+            extra={"attempts": email.attempts, "error": error},
+        )
+        await asyncio.to_thread(_append_line, settings.EMAIL_DEAD_LETTER_PATH, line)
+
+
+def _append_line(path: str, line: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(line + "\n")
+
+
+email_service = EmailService()
+
+
+async def send_appointment_status_email(appointment: Appointment) -> None:
+    """
+    Tell the patient their appointment was confirmed or rejected.
+    Meant to run as a BackgroundTask after the response has been sent.
+    """
+    if appointment.status not in (AppointmentStatus.CONFIRMED, AppointmentStatus.REJECTED):
+        return
+
+    patients, users = await fetch_patients_with_users([appointment.patient_id])
+    patient = patients.get(appointment.patient_id)
+    user = users.get(patient.user_id) if patient else None
+    if not user:
+        return
+
+    doctor = await find_by_id(User, appointment.doctor_id)
+    doctor_name = doctor.full_name if doctor else "your doctor"
+    when = appointment.appointment_date.strftime("%d %B %Y, %H:%M")
+
+    if appointment.status == AppointmentStatus.CONFIRMED:
+        subject = "Your appointment is confirmed"
+        body = (
+            f"Hello {user.full_name},\n\n"
+            f"Your appointment with {doctor_name} on {when} has been confirmed.\n"
+        )
+    else:
+        subject = "Your appointment request was declined"
+        body = (
+            f"Hello {user.full_name},\n\n"
+            f"Your appointment with {doctor_name} on {when} could not be accepted."
+        )
+        if appointment.rejection_reason:
+            body += f"\nReason: {appointment.rejection_reason}"
+        body += "\n"
+
+    email_service.enqueue(user.email, subject, body + f"\n{settings.APP_NAME}\n")
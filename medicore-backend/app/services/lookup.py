@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, Optional, Type, TypeVar
+from beanie import Document
+from beanie.operators import In
+from bson import ObjectId
+from pydantic import BaseModel
+
+from app.models.user import User
+from app.models.patient import Patient, PatientRef
+
+DocumentT = TypeVar("DocumentT", bound=Document)
+
+
+async def fetch_by_ids(
+    model: Type[DocumentT],
+    ids: Iterable[Optional[str]],
+    projection_model: Optional[Type[BaseModel]] = None,
+) -> Dict[str, DocumentT]:
+    """
+    Fetch every document of `model` whose _id is in `ids` with a single
+    `$in` query. Returns a dict keyed by the string id; unknown or
+    malformed ids are simply missing from the result.
+
+    Pass `projection_model` to load only the fields it declares.
+    """
+    object_ids = list({ObjectId(i) for i in ids if i and ObjectId.is_valid(str(i))})
+    if not object_ids:
+        return {}
+
+    documents = await model.find(
+        In(model.id, object_ids), projection_model=projection_model
+    ).to_list()
+    return {str(doc.id): doc for doc in documents}
+
+
+async def find_by_id(
+    model: Type[DocumentT],
+    document_id: Optional[str],
+    projection_model: Optional[Type[BaseModel]] = None,
+):
+    """
+    Load one document by id, optionally through a projection model.
+    Returns None for unknown or malformed ids.
+    """
+    if not document_id or not ObjectId.is_valid(str(document_id)):
+        return None
+    return await model.find_one(
+        model.id == ObjectId(str(document_id)), projection_model=projection_model
+    )
+
+
+async def fetch_users(ids: Iterable[Optional[str]]) -> Dict[str, User]:
+    """Batch-load users by id"""
+    return await fetch_by_ids(User, ids)
+
+
+async def fetch_patients(ids: Iterable[Optional[str]]) -> Dict[str, PatientRef]:
+    """Batch-load patient references (id, patient_id, user_id) by id"""
+    return await fetch_by_ids(Patient, ids, projection_model=PatientRef)
+
+
+async def fetch_patients_with_users(
+    ids: Iterable[Optional[str]],
+) -> tuple[Dict[str, PatientRef], Dict[str, User]]:
+    """
+    Batch-load patient profiles by id together with their owning users.
+    Costs exactly two queries regardless of how many ids are given.
+    """
+    patients = await fetch_patients(ids)
+    users = await fetch_users(p.user_id for p in patients.values())
+    return patients, users
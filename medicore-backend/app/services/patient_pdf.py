@@ -0,0 +1,249 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import (
+    SimpleDocTemplate,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+from app.core.config import settings
+
+
+class PdfRendererBusy(Exception):
+    """Raised when no render slot frees up within PDF_QUEUE_TIMEOUT_SECONDS"""
+
+
+def _plain(value) -> Optional[str]:
+    """Enum members become their value so the snapshot holds plain strings"""
+    if value is None:
+        return None
+    return getattr(value, "value", value)
+
+
+def patient_pdf_snapshot(patient, user=None) -> dict:
+    """
+    Copy what the PDF needs out of a patient (and its user) into plain
+    dicts, lists, strings and datetimes that can be pickled to a worker.
+    The PDF is dated by the record's last update rather than the render
+    time, so identical snapshots always render identical files.
+    """
+    return {
+        "updated_at": patient.updated_at,
+        "full_name": user.full_name if user else None,
+        "email": user.email if user else None,
+        "patient_id": patient.patient_id,
+        "gender": _plain(patient.gender),
+        "blood_group": _plain(patient.blood_group),
+        "reports": [
+            {
+                "report_type": r.report_type,
+                "uploaded_at": r.uploaded_at,
+                "uploaded_by": r.uploaded_by,
+                "notes": r.notes,
+            }
+            for r in patient.diagnostic_reports or []
+        ],
+    }
+
+
+def render_patient_pdf(snapshot: dict) -> bytes:
+    """
+    Build the styled patient record PDF from a snapshot.
+    Runs in a worker process, so it must not touch the database or settings.
+    """
+    reports = snapshot["reports"]
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=0.5 * inch,
+        leftMargin=0.5 * inch,
+        topMargin=0.5 * inch,
+        bottomMargin=0.5 * inch,
+    )
+
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "Title",
+        parent=styles["Heading1"],
+        fontSize=20,
+        textColor=colors.HexColor("#11998e"),
+        alignment=TA_CENTER,
+        spaceAfter=8,
+    )
+    heading_style = ParagraphStyle(
+        "Heading",
+        parent=styles["Heading2"],
+        fontSize=14,
+        textColor=colors.HexColor("#11998e"),
+        spaceBefore=12,
+        spaceAfter=8,
+    )
+    normal_style = ParagraphStyle(
+        "NormalCustom",
+        parent=styles["Normal"],
+        fontSize=10,
+        alignment=TA_LEFT,
+        spaceAfter=4,
+    )
+
+    story = []
+
+    story.append(Paragraph("PATIENT MEDICAL RECORD", title_style))
+    story.append(
+        Paragraph(
+            f"Last updated: {snapshot['updated_at'].strftime('%d %B %Y, %H:%M UTC')}",
+            normal_style,
+        )
+    )
+    story.append(Spacer(1, 0.3 * inch))
+
+    # Patient info
+    story.append(Paragraph("PATIENT INFORMATION", heading_style))
+
+    patient_rows = [
+        ["Full Name", snapshot["full_name"] or "N/A"],
+        ["Email", snapshot["email"] or "N/A"],
+        ["Patient ID", snapshot["patient_id"]],
+        ["Gender", snapshot["gender"] or "N/A"],
+        ["Blood Group", snapshot["blood_group"] or "N/A"],
+    ]
+
+    patient_table = Table(patient_rows, colWidths=[2 * inch, 4 * inch])
+    patient_table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#E8F7F6")),
+                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, -1), 9),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#CCCCCC")),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+                ("TOPPADDING", (0, 0), (-1, -1), 4),
+            ]
+        )
+    )
+    story.append(patient_table)
+    story.append(Spacer(1, 0.2 * inch))
+
+    # Diagnostic history
+    story.append(
+        Paragraph(f"DIAGNOSTIC HISTORY ({len(reports)} reports)", heading_style)
+    )
+
+    if reports:
+        for idx, r in enumerate(reports, 1):
+            story.append(
+                Paragraph(
+                    f"<b>Report {idx}: {r['report_type']}</b> "
+                    f"({r['uploaded_at'].strftime('%d %B %Y, %H:%M UTC')})",
+                    normal_style,
+                )
+            )
+            rows = [
+                ["Uploaded By", r["uploaded_by"] or "N/A"],
+            ]
+            if r["notes"]:
+                rows.append(["Notes", r["notes"]])
+
+            report_table = Table(rows, colWidths=[2 * inch, 4 * inch])
+            report_table.setStyle(
+                TableStyle(
+                    [
+                        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#FFFFFF")),
+                        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+                        ("FONTSIZE", (0, 0), (-1, -1), 9),
+                        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#DDDDDD")),
+                        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+                        ("TOPPADDING", (0, 0), (-1, -1), 4),
+                    ]
+                )
+            )
+            story.append(report_table)
+            story.append(Spacer(1, 0.15 * inch))
+    else:
+        story.append(Paragraph("No diagnostic reports found.", normal_style))
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# Rendering is CPU-bound, so it runs in worker processes rather than on the
+# event loop. At most PDF_MAX_CONCURRENT_RENDERS snapshots are in flight;
+# further callers wait up to PDF_QUEUE_TIMEOUT_SECONDS for a slot.
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, not fork: the API process has Motor and executor threads
+        # running, which must not be copied into the workers mid-state
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.PDF_MAX_CONCURRENT_RENDERS)
+    return _slots
+
+
+async def run_in_pdf_pool(func, *args, queue_timeout: Optional[float] = None):
+    """
+    Run a picklable render function in the PDF worker pool under the
+    concurrency cap. Waits at most `queue_timeout` seconds for a slot
+    (None: no limit), then raises PdfRendererBusy.
+    """
+    global _pool
+    slots = _get_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=queue_timeout)
+    except asyncio.TimeoutError:
+        raise PdfRendererBusy()
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_pdf_pool(), func, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); start a fresh pool for the next caller
+        _pool = None
+        raise
+    finally:
+        slots.release()
+
+
+async def render_patient_pdf_async(snapshot: dict) -> bytes:
+    return await run_in_pdf_pool(
+        render_patient_pdf,
+        snapshot,
+        queue_timeout=settings.PDF_QUEUE_TIMEOUT_SECONDS,
+    )
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
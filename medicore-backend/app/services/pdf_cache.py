@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def snapshot_digest(snapshot: dict) -> str:
+    """
+    Content address of a PDF snapshot. Everything that is printed goes into
+    the hash, so any profile, user or report change produces a new key and
+    stale entries simply age out of the LRU.
+    """
+    encoded = json.dumps(snapshot, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison is what If-None-Match calls for
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class PdfCache:
+    """
+    On-disk LRU cache of rendered PDFs, keyed by snapshot digest and capped
+    at `max_bytes` in total. The index lives in memory and is rebuilt from
+    the directory (oldest mtime first) when the process starts.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{os.path.basename(key)}.pdf")
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        """(key, size) of every cached file, oldest mtime first"""
+        if not os.path.isdir(self.root):
+            return []
+        files = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".pdf"):
+                continue
+            stat = os.stat(os.path.join(self.root, name))
+            files.append((stat.st_mtime, name[: -len(".pdf")], stat.st_size))
+        return [(key, size) for _, key, size in sorted(files)]
+
+    async def _ensure_loaded(self) -> None:
+        # The index is only touched on the event loop; threads do file I/O
+        # and hand results back, so the lock just stops a second request
+        # from scanning (and counting) the directory again
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for key, size in await asyncio.to_thread(self._scan):
+                self._entries[key] = size
+                self._size += size
+            self._loaded = True
+        await self._evict()
+
+    async def _evict(self) -> None:
+        victims = []
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            victims.append(key)
+        if victims:
+            await asyncio.to_thread(self._remove, victims)
+
+    def _remove(self, keys: List[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key: str) -> Optional[bytes]:
+        await self._ensure_loaded()
+        if key not in self._entries:
+            return None
+        try:
+            data = await asyncio.to_thread(self._read, key)
+        except FileNotFoundError:
+            # Removed behind our back; treat as a miss
+            self._size -= self._entries.pop(key, 0)
+            return None
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        return data
+
+    def _read(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as fh:
+            return fh.read()
+
+    def _write(self, key: str, data: bytes) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        partial = f"{path}.part"
+        with open(partial, "wb") as fh:
+            fh.write(data)
+        os.replace(partial, path)
+
+    async def put(self, key: str, data: bytes) -> None:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        await self._ensure_loaded()
+        await asyncio.to_thread(self._write, key, data)
+
+        self._size += len(data) - self._entries.get(key, 0)
+        self._entries[key] = len(data)
+        self._entries.move_to_end(key)
+        await self._evict()
+
+    async def get_or_render(
+        self, key: str, render: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        Return the cached PDF for `key`, rendering and storing it on a miss.
+        Concurrent misses for the same key share a single render.
+        """
+        data = await self.get(key)
+        if data is not None:
+            return data
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            data = await render()
+            await self.put(key, data)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure doesn't warn
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+
+pdf_cache = PdfCache(
+    root=settings.PDF_CACHE_PATH,
+    max_bytes=settings.PDF_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,196 @@
+import asyncio
+import os
+import re
+import zipfile
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from beanie import PydanticObjectId
+
+from app.core.config import settings
+from app.models.export_job import ExportJob, ExportJobStatus
+from app.models.patient import Patient, PatientWithReports
+from app.schemas.export_job import ExportJobCreate
+from app.services.lookup import fetch_users
+from app.services.pdf_cache import pdf_cache, snapshot_digest
+from app.services.patient_pdf import (
+    patient_pdf_snapshot,
+    render_patient_pdf,
+    run_in_pdf_pool,
+)
+
+# Keep references to running jobs so the tasks aren't garbage collected
+_running: Set[asyncio.Task] = set()
+_export_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_export_slots() -> asyncio.Semaphore:
+    global _export_slots
+    if _export_slots is None:
+        _export_slots = asyncio.Semaphore(settings.EXPORT_JOB_CONCURRENCY)
+    return _export_slots
+
+
+def export_download_path(job_id: str) -> str:
+    return f"/api/lab/exports/{job_id}/download"
+
+
+def export_file_path(file_name: str) -> str:
+    return os.path.join(settings.EXPORT_JOB_PATH, os.path.basename(file_name))
+
+
+def build_export_query(filters: ExportJobCreate) -> dict:
+    """Translate export filters into a Mongo filter on `patients`"""
+    query = {}
+    if filters.patient_ids:
+        query["patient_id"] = {"$in": filters.patient_ids}
+    if filters.blood_group:
+        query["blood_group"] = filters.blood_group.value
+    if filters.condition:
+        query["chronic_conditions"] = {
+            "$regex": f"^{re.escape(filters.condition)}$",
+            "$options": "i",
+        }
+
+    report_match = {}
+    if filters.report_type:
+        report_match["report_type"] = {
+            "$regex": f"^{re.escape(filters.report_type)}$",
+            "$options": "i",
+        }
+    uploaded = {}
+    if filters.uploaded_from:
+        uploaded["$gte"] = filters.uploaded_from
+    if filters.uploaded_to:
+        uploaded["$lte"] = filters.uploaded_to
+    if uploaded:
+        report_match["uploaded_at"] = uploaded
+    if report_match:
+        query["diagnostic_reports"] = {"$elemMatch": report_match}
+
+    return query
+
+
+async def _render(patient: PatientWithReports, user) -> bytes:
+    snapshot = patient_pdf_snapshot(patient, user)
+    async with _get_export_slots():
+        # Jobs wait for render slots instead of timing out like downloads
+        return await pdf_cache.get_or_render(
+            snapshot_digest(snapshot),
+            lambda: run_in_pdf_pool(render_patient_pdf, snapshot),
+        )
+
+
+async def _export_batch(
+    job: ExportJob, zf: zipfile.ZipFile, batch: List[PatientWithReports]
+) -> None:
+    users = await fetch_users([p.user_id for p in batch])
+    results = await asyncio.gather(
+        *[_render(p, users.get(p.user_id)) for p in batch],
+        return_exceptions=True,
+    )
+
+    for patient, result in zip(batch, results):
+        if isinstance(result, BaseException):
+            job.failed += 1
+            continue
+        # Written one at a time, so only the current batch is held in memory
+        await asyncio.to_thread(
+            zf.writestr, f"patient_{patient.patient_id}.pdf", result
+        )
+
+    job.processed += len(batch)
+    await job.save()
+
+
+async def run_export_job(job_id: PydanticObjectId) -> None:
+    """Render every matching patient into the job's ZIP, batch by batch"""
+    job = await ExportJob.get(job_id)
+    if not job:
+        return
+
+    file_name = f"{job.id}.zip"
+    path = export_file_path(file_name)
+    try:
+        query = build_export_query(ExportJobCreate(**job.filters))
+        job.status = ExportJobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+        job.total = await Patient.find(query).count()
+        await job.save()
+
+        await asyncio.to_thread(os.makedirs, settings.EXPORT_JOB_PATH, exist_ok=True)
+        # PDFs are already compressed, so entries are stored as-is
+        zf = await asyncio.to_thread(zipfile.ZipFile, path, "w", zipfile.ZIP_STORED)
+        try:
+            batch: List[PatientWithReports] = []
+            cursor = Patient.find(query, projection_model=PatientWithReports).sort(
+                "patient_id"
+            )
+            async for patient in cursor:
+                batch.append(patient)
+                if len(batch) >= settings.EXPORT_JOB_BATCH_SIZE:
+                    await _export_batch(job, zf, batch)
+                    batch = []
+            if batch:
+                await _export_batch(job, zf, batch)
+        finally:
+            await asyncio.to_thread(zf.close)
+
+        job.status = ExportJobStatus.COMPLETED
+        job.file_name = file_name
+        job.file_size = os.path.getsize(path)
+    except Exception as e:
+        job.status = ExportJobStatus.FAILED
+        job.error = str(e)
+        if os.path.exists(path):
+            os.remove(path)
+
+    job.finished_at = datetime.utcnow()
+    await job.save()
+
+
+def start_export_job(job: ExportJob) -> None:
+    """Run a saved job in the background of this process"""
+    task = asyncio.create_task(run_export_job(job.id))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+
+async def purge_expired_exports() -> int:
+    """Delete finished jobs (and their ZIPs) older than the retention window"""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.EXPORT_JOB_RETENTION_HOURS)
+    expired = await ExportJob.find(
+        {
+            "status": {
+                "$in": [ExportJobStatus.COMPLETED.value, ExportJobStatus.FAILED.value]
+            },
+            "finished_at": {"$lt": cutoff},
+        }
+    ).to_list()
+
+    for job in expired:
+        if job.file_name:
+            try:
+                await asyncio.to_thread(os.remove, export_file_path(job.file_name))
+            except FileNotFoundError:
+                pass
+        await job.delete()
+    return len(expired)
+
+
+async def fail_interrupted_exports() -> None:
+    """Jobs run in-process, so any left unfinished by a restart are dead"""
+    await ExportJob.get_motor_collection().update_many(
+        {
+            "status": {
+                "$in": [ExportJobStatus.QUEUED.value, ExportJobStatus.RUNNING.value]
+            }
+        },
+        {
+            "$set": {
+                "status": ExportJobStatus.FAILED.value,
+                "error": "Interrupted by a server restart",
+                "finished_at": datetime.utcnow(),
+            }
+        },
+    )
@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, ReturnDocument
+
+from app.core.config import settings
+from app.models.prescription import Prescription
+from app.services.email import email_service
+from app.services.lookup import fetch_patients_with_users, fetch_users
+
+
+logger = logging.getLogger(__name__)
+
+
+class FollowUpReminder(BaseModel):
+    """Everything a notifier needs to tell a patient about a follow-up"""
+    prescription_id: str
+    follow_up_date: datetime
+    diagnosis: str
+    patient_name: str
+    patient_email: str
+    doctor_name: Optional[str] = None
+
+
+class Notifier(ABC):
+    """
+    Delivers follow-up reminders. Raising from `send_follow_up` leaves the
+    reminder unsent; it is claimed again once its claim expires.
+    """
+
+    @abstractmethod
+    async def send_follow_up(self, reminder: FollowUpReminder) -> None:
+        """Deliver one reminder, raising if it could not be sent"""
+
+
+class LogNotifier(Notifier):
+    """Appends reminders as JSON lines to a local file (development/tests)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _append(self, line: str) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+
+    async def send_follow_up(self, reminder: FollowUpReminder) -> None:
+        line = json.dumps(
+            {"type": "follow_up_reminder", **reminder.model_dump(mode="json")}
+        )
+        await asyncio.to_thread(self._append, line)
+
+
+class EmailNotifier(Notifier):
+    """Queues reminders on the email service, which owns retries"""
+
+    async def send_follow_up(self, reminder: FollowUpReminder) -> None:
+        doctor = f" with {reminder.doctor_name}" if reminder.doctor_name else ""
+        when = reminder.follow_up_date.strftime("%d %B %Y")
+        body = (
+            f"Hello {reminder.patient_name},\n\n"
+            f"This is a reminder of your follow-up visit{doctor} on {when} "
+            f"(prescription {reminder.prescription_id}: {reminder.diagnosis}).\n"
+            f"\n{settings.APP_NAME}\n"
+        )
+        if not email_service.enqueue(reminder.patient_email, "Follow-up reminder", body):
+            raise RuntimeError("Email service is not accepting messages")
+
+
+_notifier: Optional[Notifier] = None
+
+
+def get_notifier() -> Notifier:
+    """Return the configured notifier (REMINDER_NOTIFIER)"""
+    global _notifier
+    if _notifier is None:
+        if settings.REMINDER_NOTIFIER == "log":
+            _notifier = LogNotifier(settings.NOTIFICATION_LOG_PATH)
+        elif settings.REMINDER_NOTIFIER == "email":
+            _notifier = EmailNotifier()
+        else:
+            raise ValueError(f"Unknown REMINDER_NOTIFIER: {settings.REMINDER_NOTIFIER}")
+    return _notifier
+
+
+async def claim_due_reminders(now: datetime, limit: int) -> List[dict]:
+    """
+    Atomically claim up to `limit` unsent reminders whose follow-up falls
+    within the next REMINDER_LEAD_HOURS. Each claim is a find_one_and_update
+    over the (follow_up_reminder_sent, follow_up_date) index, so concurrent
+    schedulers never pick the same prescription.
+    """
+    collection = Prescription.get_motor_collection()
+    claimed = []
+    for _ in range(limit):
+        doc = await collection.find_one_and_update(
+            {
+                "follow_up_reminder_sent": False,
+                "follow_up_date": {
+                    "$gte": now,
+                    "$lte": now + timedelta(hours=settings.REMINDER_LEAD_HOURS),
+                },
+                "$or": [
+                    {"follow_up_reminder_claimed_until": None},
+                    {"follow_up_reminder_claimed_until": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "follow_up_reminder_claimed_until": now
+                    + timedelta(seconds=settings.REMINDER_CLAIM_SECONDS)
+                }
+            },
+            sort=[("follow_up_date", ASCENDING)],
+            projection={
+                "prescription_id": 1,
+                "patient_id": 1,
+                "doctor_id": 1,
+                "diagnosis": 1,
+                "follow_up_date": 1,
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            break
+        claimed.append(doc)
+    return claimed
+
+
+async def run_reminder_batch(notifier: Notifier) -> int:
+    """Claim one batch of due reminders and dispatch it; returns the batch size"""
+    claimed = await claim_due_reminders(datetime.utcnow(), settings.REMINDER_BATCH_SIZE)
+    if not claimed:
+        return 0
+
+    patients, users = await fetch_patients_with_users(d["patient_id"] for d in claimed)
+    doctors = await fetch_users(d["doctor_id"] for d in claimed)
+
+    done = []
+    sends = []
+    for doc in claimed:
+        patient = patients.get(doc["patient_id"])
+        user = users.get(patient.user_id) if patient else None
+        if not user:
+            # Nobody to notify; don't keep reclaiming it
+            done.append(doc["_id"])
+            continue
+
+        doctor = doctors.get(doc["doctor_id"])
+        reminder = FollowUpReminder(
+            prescription_id=doc["prescription_id"],
+            follow_up_date=doc["follow_up_date"],
+            diagnosis=doc["diagnosis"],
+            patient_name=user.full_name,
+            patient_email=user.email,
+            doctor_name=doctor.full_name if doctor else None,
+        )
+        sends.append((doc["_id"], notifier.send_follow_up(reminder)))
+
+    results = await asyncio.gather(*[send for _, send in sends], return_exceptions=True)
+    for (doc_id, _), result in zip(sends, results):
+        if isinstance(result, Exception):
+            logger.warning(
+                "Follow-up reminder failed",
+                extra={"prescription": str(doc_id)},
+                exc_info=result,
+            )
+        else:
+            done.append(doc_id)
+
+    if done:
+        await Prescription.get_motor_collection().update_many(
+            {"_id": {"$in": done}},
+            {
+                "$set": {
+                    "follow_up_reminder_sent": True,
+                    "follow_up_reminder_sent_at": datetime.utcnow(),
+                },
+                "$unset": {"follow_up_reminder_claimed_until": ""},
+            },
+        )
+    return len(claimed)
+
+
+class ReminderScheduler:
+    """
+    In-process background loop: every REMINDER_POLL_SECONDS it drains due
+    reminders batch by batch, then sleeps.
+    """
+
+    def __init__(self, notifier: Notifier, interval: float):
+        self.notifier = notifier
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                while await run_reminder_batch(self.notifier) >= settings.REMINDER_BATCH_SIZE:
+                    pass
+            except Exception:
+                logger.exception("Follow-up reminder run failed")
+            await asyncio.sleep(self.interval)
+
+
+reminder_scheduler: Optional[ReminderScheduler] = None
+
+
+def start_reminder_scheduler() -> None:
+    global reminder_scheduler
+    if not settings.REMINDERS_ENABLED:
+        return
+    reminder_scheduler = ReminderScheduler(get_notifier(), settings.REMINDER_POLL_SECONDS)
+    reminder_scheduler.start()
+
+
+async def stop_reminder_scheduler() -> None:
+    if reminder_scheduler is not None:
+        await reminder_scheduler.stop()
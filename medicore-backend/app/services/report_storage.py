@@ -0,0 +1,283 @@
+import asyncio
+import base64
+import hashlib
+import os
+import re
+import unicodedata
+import uuid
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+
+from bson import ObjectId
+from fastapi import UploadFile
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.database import get_database
+
+CHUNK_SIZE = 256 * 1024
+
+
+class ReportNotFound(Exception):
+    """Raised when a content key does not exist in the store"""
+
+
+class UploadTooLarge(Exception):
+    """Raised when a streamed upload exceeds its size limit"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"File exceeds the {max_size} byte limit")
+        self.max_size = max_size
+
+
+class StoredFile(BaseModel):
+    """Result of writing a file to the report store"""
+    key: str
+    size: int
+    sha256: str
+
+
+class _UploadMeter:
+    """Tracks size and SHA-256 of a stream as it is written"""
+
+    def __init__(self, max_size: Optional[int]):
+        self.max_size = max_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise UploadTooLarge(self.max_size)
+        self._hash.update(chunk)
+
+    def result(self, key: str) -> StoredFile:
+        return StoredFile(key=key, size=self.size, sha256=self._hash.hexdigest())
+
+
+async def read_chunks(file: UploadFile, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield an uploaded file in fixed-size chunks instead of reading it whole"""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+class ReportStore(ABC):
+    """
+    Storage backend for diagnostic report files.
+
+    Only the opaque content key returned by `put_stream` is kept on the
+    DiagnosticReport; the bytes live in the backend. Writes are streamed
+    chunk by chunk so memory per upload stays bounded by the chunk size.
+    """
+
+    @abstractmethod
+    async def put_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: Optional[str],
+        max_size: Optional[int] = None,
+    ) -> StoredFile:
+        """
+        Write `chunks` to the store, hashing as it goes. Raises
+        UploadTooLarge (leaving nothing behind) once `max_size` is exceeded.
+        """
+
+    async def put(self, data: bytes, filename: str, content_type: Optional[str]) -> StoredFile:
+        """Write an in-memory file (used by the migration command)"""
+        return await self.put_stream(_single_chunk(data), filename, content_type)
+
+    @abstractmethod
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        """
+        Open a stored file and return an iterator over its chunks.
+        Raises ReportNotFound up front, before any bytes are streamed.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a stored file; a missing key is not an error"""
+
+
+class GridFSReportStore(ReportStore):
+    """Stores report files in a GridFS bucket next to the application data"""
+
+    def __init__(self, bucket_name: str = "reports"):
+        self.bucket_name = bucket_name
+
+    @property
+    def bucket(self) -> AsyncIOMotorGridFSBucket:
+        return AsyncIOMotorGridFSBucket(get_database(), bucket_name=self.bucket_name)
+
+    async def put_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: Optional[str],
+        max_size: Optional[int] = None,
+    ) -> StoredFile:
+        meter = _UploadMeter(max_size)
+        grid_in = self.bucket.open_upload_stream(
+            filename,
+            chunk_size_bytes=CHUNK_SIZE,
+            metadata={"content_type": content_type},
+        )
+        try:
+            async for chunk in chunks:
+                meter.feed(chunk)
+                await grid_in.write(chunk)
+        except BaseException:
+            await grid_in.abort()
+            raise
+
+        await grid_in.close()
+        return meter.result(str(grid_in._id))
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        if not ObjectId.is_valid(key):
+            raise ReportNotFound(key)
+        try:
+            stream = await self.bucket.open_download_stream(ObjectId(key))
+        except NoFile:
+            raise ReportNotFound(key)
+
+        async def _chunks():
+            while True:
+                chunk = await stream.readchunk()
+                if not chunk:
+                    break
+                yield chunk
+
+        return _chunks()
+
+    async def delete(self, key: str) -> None:
+        if not ObjectId.is_valid(key):
+            return
+        try:
+            await self.bucket.delete(ObjectId(key))
+        except NoFile:
+            # Already gone; deleting a report must not fail on a missing blob
+            pass
+
+
+class LocalReportStore(ReportStore):
+    """Stores report files on the local filesystem under `root`"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        # Keys are generated by us, but never let one escape the root
+        safe_key = os.path.basename(key)
+        return os.path.join(self.root, safe_key[:2], safe_key)
+
+    async def put_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        content_type: Optional[str],
+        max_size: Optional[int] = None,
+    ) -> StoredFile:
+        meter = _UploadMeter(max_size)
+        key = uuid.uuid4().hex
+        path = self._path(key)
+        partial = f"{path}.part"
+
+        await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+        fh = await asyncio.to_thread(open, partial, "wb")
+        try:
+            async for chunk in chunks:
+                meter.feed(chunk)
+                await asyncio.to_thread(fh.write, chunk)
+            await asyncio.to_thread(fh.close)
+            await asyncio.to_thread(os.replace, partial, path)
+        except BaseException:
+            fh.close()
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+        return meter.result(key)
+
+    async def open(self, key: str) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            raise ReportNotFound(key)
+
+        fh = await asyncio.to_thread(open, path, "rb")
+
+        async def _chunks():
+            try:
+                while True:
+                    chunk = await asyncio.to_thread(fh.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                fh.close()
+
+        return _chunks()
+
+    async def delete(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            await asyncio.to_thread(os.remove, path)
+        except FileNotFoundError:
+            pass
+
+
+_store: Optional[ReportStore] = None
+
+
+def get_report_store() -> ReportStore:
+    """Return the configured report store (REPORT_STORAGE_BACKEND)"""
+    global _store
+    if _store is None:
+        if settings.REPORT_STORAGE_BACKEND == "local":
+            _store = LocalReportStore(settings.REPORT_STORAGE_PATH)
+        elif settings.REPORT_STORAGE_BACKEND == "gridfs":
+            _store = GridFSReportStore()
+        else:
+            raise ValueError(
+                f"Unknown REPORT_STORAGE_BACKEND: {settings.REPORT_STORAGE_BACKEND}"
+            )
+    return _store
+
+
+def report_download_path(report_id: str) -> str:
+    """API path that streams a stored report back to the client"""
+    return f"/api/lab/reports/{report_id}/download"
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """
+    Content-Disposition header for a user-supplied file name: a plain
+    ASCII `filename=` for old clients plus the exact name as RFC 5987
+    `filename*=`, so quotes, semicolons and non-latin-1 names are safe.
+    """
+    fallback = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode()
+    fallback = re.sub(r'[\x00-\x1f\x7f"\\;]', "_", fallback).strip()
+    stem, dot, ext = fallback.rpartition(".")
+    if not (stem if dot else ext).strip(" ._"):
+        fallback = f"download.{ext}" if dot else "download"
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def parse_data_url(file_url: str) -> Tuple[Optional[str], bytes]:
+    """
+    Split a legacy `data:<type>;base64,<payload>` report URL into its
+    content type and decoded bytes.
+    """
+    header, _, payload = file_url.partition(",")
+    content_type = header[len("data:"):].split(";")[0] or None
+    return content_type, base64.b64decode(payload)
@@ -0,0 +1,231 @@
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from beanie.operators import In
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models.appointment import Appointment, AppointmentStatus, SLOT_RELEASING_STATUSES
+from app.models.doctor_profile import (
+    DoctorProfile,
+    DoctorScheduleRef,
+    WeeklyAvailability,
+    slot_label,
+)
+
+
+SUGGESTED_SLOT_HEADER = "X-Suggested-Slot"
+
+# Left on appointments the slot backfill cancels for double-booking
+DOUBLE_BOOKING_NOTE = "Cancelled automatically: the slot was already booked"
+
+logger = logging.getLogger(__name__)
+
+
+def slot_start(when: datetime) -> datetime:
+    """
+    Normalise a requested appointment time to the form stored in Mongo
+    (naive UTC, whole minutes), so equal slots compare equal in the
+    unique slot index.
+    """
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when.replace(second=0, microsecond=0)
+
+
+def minute_of_day(when: datetime) -> int:
+    return when.hour * 60 + when.minute
+
+
+class OutsideSchedule(Exception):
+    """The requested time is not inside any of the doctor's slots"""
+
+
+def snap_to_slot(availability: WeeklyAvailability, when: datetime) -> datetime:
+    """
+    Move `when` back to the start of the scheduled slot it falls in, so
+    every booking of one slot has the same appointment_date and collides
+    in the unique slot index. Doctors without any availability have no
+    slots to align to and keep the requested minute.
+    """
+    if not availability.availability:
+        return when
+    schedule = availability.schedule_for(when.strftime("%A"))
+    if schedule is not None:
+        minute = minute_of_day(when)
+        for start, end in schedule.slots:
+            if start <= minute < end:
+                return when.replace(hour=start // 60, minute=start % 60)
+    raise OutsideSchedule()
+
+
+async def align_to_schedule(doctor_id: str, when: datetime) -> datetime:
+    """Normalise a requested appointment time and snap it to its slot"""
+    when = slot_start(when)
+    profile = await DoctorProfile.find_one(
+        DoctorProfile.user_id == doctor_id, projection_model=DoctorScheduleRef
+    )
+    return snap_to_slot(profile, when) if profile else when
+
+
+def split_booked(
+    slots: List[Tuple[int, int]], busy: Iterable[int]
+) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    """
+    Subtract booked appointment start times (minutes after midnight) from
+    sorted (start, end) slots: a slot is booked when an appointment starts
+    inside it. One merge-style sweep over both sorted lists, so the cost
+    is O(slots + bookings) rather than their product.
+    """
+    busy = sorted(busy)
+    free, booked = [], []
+    i = 0
+    for start, end in slots:
+        while i < len(busy) and busy[i] < start:
+            i += 1
+        if i < len(busy) and busy[i] < end:
+            booked.append((start, end))
+        else:
+            free.append((start, end))
+    return free, booked
+
+
+async def held_slot_starts(doctor_id: str, start: datetime, end: datetime) -> List[datetime]:
+    """Start times of the doctor's slot-holding appointments in [start, end)"""
+    docs = await Appointment.get_motor_collection().find(
+        {
+            "doctor_id": doctor_id,
+            "appointment_date": {"$gte": start, "$lt": end},
+            "holds_slot": True,
+        },
+        projection={"appointment_date": 1, "_id": 0},
+    ).to_list(length=None)
+    return [doc["appointment_date"] for doc in docs]
+
+
+async def availability_matrix(
+    doctor_ids: List[str], first_day: date, last_day: date
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Free slots per doctor per day for an inclusive date range, from one
+    query for the doctors' schedules and one for their appointments in
+    the range. Days on which a doctor does not work are left out.
+    """
+    profiles = await DoctorProfile.find(
+        In(DoctorProfile.user_id, doctor_ids), projection_model=DoctorScheduleRef
+    ).to_list()
+
+    start = datetime.combine(first_day, datetime.min.time())
+    end = datetime.combine(last_day, datetime.min.time()) + timedelta(days=1)
+    held = await Appointment.get_motor_collection().find(
+        {
+            "doctor_id": {"$in": [p.user_id for p in profiles]},
+            "appointment_date": {"$gte": start, "$lt": end},
+            "holds_slot": True,
+        },
+        projection={"doctor_id": 1, "appointment_date": 1, "_id": 0},
+    ).to_list(length=None)
+
+    busy: Dict[Tuple[str, date], List[int]] = {}
+    for doc in held:
+        when = doc["appointment_date"]
+        busy.setdefault((doc["doctor_id"], when.date()), []).append(minute_of_day(when))
+
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    matrix: Dict[str, Dict[str, List[str]]] = {}
+    for profile in profiles:
+        free_by_day = {}
+        for day in days:
+            schedule = profile.schedule_for(day.strftime("%A"))
+            if schedule is None:
+                continue
+            free, _ = split_booked(schedule.slots, busy.get((profile.user_id, day), []))
+            free_by_day[day.isoformat()] = [slot_label(s, e) for s, e in free]
+        matrix[profile.user_id] = free_by_day
+    return matrix
+
+
+async def suggest_next_slot(doctor_id: str, after: datetime) -> Optional[datetime]:
+    """
+    Earliest slot start in the doctor's weekly availability that is later
+    than `after` and not held by an appointment, looking at most
+    SLOT_SUGGESTION_DAYS ahead.
+    """
+    profile = await DoctorProfile.find_one(DoctorProfile.user_id == doctor_id)
+    if not profile or not profile.availability:
+        return None
+
+    first_day = after.replace(hour=0, minute=0, second=0, microsecond=0)
+    last_day = first_day + timedelta(days=settings.SLOT_SUGGESTION_DAYS)
+    busy_by_day = {}
+    for held in await held_slot_starts(doctor_id, first_day, last_day):
+        busy_by_day.setdefault(held.date(), []).append(minute_of_day(held))
+
+    day = first_day
+    while day < last_day:
+        schedule = profile.schedule_for(day.strftime("%A"))
+        if schedule is not None:
+            free, _ = split_booked(schedule.slots, busy_by_day.get(day.date(), []))
+            for start, _ in free:
+                candidate = day + timedelta(minutes=start)
+                if candidate > after:
+                    return candidate
+        day += timedelta(days=1)
+    return None
+
+
+async def backfill_slot_holds() -> None:
+    """
+    Set `holds_slot` on appointments stored before the field existed.
+    Where older data already double-books a slot, the earliest booking
+    keeps it and the others are cancelled (with an admin note) and logged.
+    Leaving them active would not do: holds_slot is recomputed from the
+    status on every save, so their next status change would collide.
+    """
+    collection = Appointment.get_motor_collection()
+    await collection.update_many(
+        {
+            "holds_slot": {"$exists": False},
+            "status": {"$in": [s.value for s in SLOT_RELEASING_STATUSES]},
+        },
+        {"$set": {"holds_slot": False}},
+    )
+    try:
+        await collection.update_many(
+            {"holds_slot": {"$exists": False}}, {"$set": {"holds_slot": True}}
+        )
+        return
+    except DuplicateKeyError:
+        pass
+
+    conflicts = 0
+    cursor = collection.find(
+        {"holds_slot": {"$exists": False}}, projection={"_id": 1}
+    ).sort("created_at", ASCENDING)
+    async for doc in cursor:
+        try:
+            await collection.update_one({"_id": doc["_id"]}, {"$set": {"holds_slot": True}})
+        except DuplicateKeyError:
+            conflicts += 1
+            # Pipeline update so an existing admin note is kept
+            await collection.update_one(
+                {"_id": doc["_id"]},
+                [
+                    {
+                        "$set": {
+                            "status": AppointmentStatus.CANCELLED.value,
+                            "holds_slot": False,
+                            "admin_notes": {"$ifNull": ["$admin_notes", DOUBLE_BOOKING_NOTE]},
+                            "updated_at": datetime.utcnow(),
+                        }
+                    }
+                ],
+            )
+            logger.warning(
+                "Cancelled appointment that double-books an existing slot",
+                extra={"appointment_id": str(doc["_id"])},
+            )
+    logger.warning("Slot backfill found double bookings", extra={"conflicts": conflicts})
@@ -0,0 +1,270 @@
+import asyncio
+import bisect
+import heapq
+import logging
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.models.appointment import Appointment
+from app.models.doctor_profile import DoctorProfile, DoctorScheduleRef, WeeklyAvailability
+from app.models.user import User, UserRole
+from app.services.scheduling import minute_of_day
+
+
+logger = logging.getLogger(__name__)
+
+Slot = Tuple[datetime, datetime]
+
+
+class _DoctorSlots:
+    """One doctor's free slots over the index horizon, sorted by start"""
+
+    __slots__ = (
+        "doctor_id", "full_name", "specialization", "schedule", "free", "held", "bookings"
+    )
+
+    def __init__(self, doctor_id: str, full_name: str, specialization: Optional[str]):
+        self.doctor_id = doctor_id
+        self.full_name = full_name
+        self.specialization = specialization
+        self.schedule = WeeklyAvailability()
+        self.free: List[Slot] = []
+        # Appointment id -> start, and slot start -> appointments in it
+        # (a count, since old data may double-book). Keying by appointment
+        # makes recording the same booking twice a no-op.
+        self.bookings: Dict[str, datetime] = {}
+        self.held: Dict[datetime, int] = {}
+
+    def slot_at(self, when: datetime) -> Optional[Slot]:
+        """The scheduled slot an appointment starting at `when` falls in"""
+        schedule = self.schedule.schedule_for(when.strftime("%A"))
+        if schedule is None:
+            return None
+        minute = minute_of_day(when)
+        day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+        for start, end in schedule.slots:
+            if start <= minute < end:
+                return day + timedelta(minutes=start), day + timedelta(minutes=end)
+        return None
+
+    def fill(self, first_day: datetime, last_day: datetime) -> None:
+        """Recompute held and free slots from the schedule and bookings"""
+        self.held = {}
+        for when in self.bookings.values():
+            slot = self.slot_at(when)
+            if slot is not None:
+                self.held[slot[0]] = self.held.get(slot[0], 0) + 1
+
+        free = []
+        day = first_day
+        while day < last_day:
+            schedule = self.schedule.schedule_for(day.strftime("%A"))
+            if schedule is not None:
+                for start, end in schedule.slots:
+                    slot = (day + timedelta(minutes=start), day + timedelta(minutes=end))
+                    if slot[0] not in self.held:
+                        free.append(slot)
+            day += timedelta(days=1)
+        self.free = free
+
+    def set_booking(
+        self,
+        appointment_id: str,
+        when: Optional[datetime],
+        horizon: Tuple[datetime, datetime],
+    ) -> None:
+        """Record that an appointment now holds the slot at `when`, or none"""
+        previous = self.bookings.pop(appointment_id, None)
+        if when is not None:
+            self.bookings[appointment_id] = when
+        if previous == when:
+            return
+        if previous is not None:
+            self._release(previous, horizon)
+        if when is not None:
+            self._hold(when)
+
+    def _hold(self, when: datetime) -> None:
+        slot = self.slot_at(when)
+        if slot is None:
+            return
+        self.held[slot[0]] = self.held.get(slot[0], 0) + 1
+        i = bisect.bisect_left(self.free, slot)
+        if i < len(self.free) and self.free[i] == slot:
+            del self.free[i]
+
+    def _release(self, when: datetime, horizon: Tuple[datetime, datetime]) -> None:
+        slot = self.slot_at(when)
+        if slot is None or slot[0] not in self.held:
+            return
+        self.held[slot[0]] -= 1
+        if self.held[slot[0]] > 0:
+            return
+        del self.held[slot[0]]
+        if horizon[0] <= slot[0] < horizon[1]:
+            bisect.insort(self.free, slot)
+
+
+class FreeSlotIndex:
+    """
+    In-memory index of every doctor's free slots for the next
+    NEXT_SLOT_HORIZON_DAYS days, so "earliest slot with any cardiologist"
+    is a k-way merge of presorted lists instead of a schedule scan.
+
+    Routes keep it current as appointments are booked, rejected,
+    cancelled, rescheduled or deleted and as doctors change availability.
+    Each worker holds its own copy, so a periodic rebuild picks up writes
+    made by other workers and rolls the horizon forward.
+    """
+
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self._doctors: Dict[str, _DoctorSlots] = {}
+        self._by_specialization: Dict[str, Set[str]] = {}
+        self._horizon: Tuple[datetime, datetime] = (datetime.min, datetime.min)
+        # Changes made while a rebuild is loading, replayed onto its result.
+        # Ones the reload already saw replay as no-ops, since bookings are
+        # keyed by appointment id.
+        self._pending: Optional[List[Callable[[], None]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def rebuild(self) -> None:
+        """Reload doctors, schedules and upcoming appointments"""
+        self._pending = []
+        try:
+            first_day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            last_day = first_day + timedelta(days=self.horizon_days)
+
+            users = await User.find(User.role == UserRole.DOCTOR).to_list()
+            doctors = {
+                str(u.id): _DoctorSlots(str(u.id), u.full_name, u.specialization)
+                for u in users
+            }
+            profiles = await DoctorProfile.find(
+                {"user_id": {"$in": list(doctors)}}, projection_model=DoctorScheduleRef
+            ).to_list()
+            for profile in profiles:
+                doctors[profile.user_id].schedule = profile
+
+            held = await Appointment.get_motor_collection().find(
+                {
+                    "doctor_id": {"$in": list(doctors)},
+                    "appointment_date": {"$gte": first_day, "$lt": last_day},
+                    "holds_slot": True,
+                },
+                projection={"doctor_id": 1, "appointment_date": 1},
+            ).to_list(length=None)
+            for doc in held:
+                doctors[doc["doctor_id"]].bookings[str(doc["_id"])] = doc["appointment_date"]
+
+            by_specialization: Dict[str, Set[str]] = {}
+            for doctor in doctors.values():
+                doctor.fill(first_day, last_day)
+                if doctor.specialization:
+                    by_specialization.setdefault(doctor.specialization.lower(), set()).add(
+                        doctor.doctor_id
+                    )
+
+            pending = self._pending
+            self._doctors = doctors
+            self._by_specialization = by_specialization
+            self._horizon = (first_day, last_day)
+        finally:
+            self._pending = None
+
+        for change in pending:
+            change()
+
+    def _record(self, change: Callable[[], None]) -> None:
+        if self._pending is not None:
+            self._pending.append(change)
+        change()
+
+    def apply(self, doctor_id: str, appointment_id: str, booked: Optional[datetime]) -> None:
+        """
+        Record the slot an appointment now holds: its start time, or None
+        once it no longer holds one (rejected, cancelled or deleted)
+        """
+
+        def change():
+            doctor = self._doctors.get(doctor_id)
+            if doctor is not None:
+                doctor.set_booking(appointment_id, booked, self._horizon)
+
+        self._record(change)
+
+    def remove_doctor(self, doctor_id: str) -> None:
+        """Forget a deleted doctor, their schedule and their bookings"""
+
+        def change():
+            doctor = self._doctors.pop(doctor_id, None)
+            if doctor is not None and doctor.specialization:
+                self._by_specialization.get(doctor.specialization.lower(), set()).discard(
+                    doctor_id
+                )
+
+        self._record(change)
+
+    def set_schedule(self, doctor_id: str, schedule: WeeklyAvailability) -> None:
+        """Swap in a doctor's new weekly availability"""
+        doctor = self._doctors.get(doctor_id)
+        if doctor is None:
+            return
+        doctor.schedule = schedule
+        doctor.fill(*self._horizon)
+
+    def next_available(
+        self, specialization: Optional[str], limit: int, after: Optional[datetime] = None
+    ) -> List[dict]:
+        """The `limit` earliest free slots starting after `after` (default: now)"""
+        after = after or datetime.utcnow()
+        if specialization:
+            doctor_ids = self._by_specialization.get(specialization.lower(), set())
+        else:
+            doctor_ids = self._doctors.keys()
+
+        streams = [self._free_after(self._doctors[d], after) for d in doctor_ids]
+        merged = heapq.merge(*streams, key=lambda item: (item[0], item[2].doctor_id))
+        return [
+            {
+                "doctor_id": doctor.doctor_id,
+                "doctor_name": doctor.full_name,
+                "specialization": doctor.specialization,
+                "start": start,
+                "end": end,
+            }
+            for start, end, doctor in islice(merged, limit)
+        ]
+
+    @staticmethod
+    def _free_after(doctor: _DoctorSlots, after: datetime):
+        free = doctor.free
+        for i in range(bisect.bisect_right(free, (after, datetime.max)), len(free)):
+            yield free[i][0], free[i][1], doctor
+
+    def start(self, interval: float) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception:
+                logger.exception("Free slot index rebuild failed")
+            await asyncio.sleep(interval)
+
+
+slot_index = FreeSlotIndex(horizon_days=settings.NEXT_SLOT_HORIZON_DAYS)
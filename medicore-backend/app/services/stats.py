@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from app.core.database import get_database
+from app.models.patient import Patient
+
+# Maintained counters live in a small `stats` collection, one document per
+# dashboard, updated with $inc wherever the counted data changes
+STATS_COLLECTION = "stats"
+LAB_STATS_ID = "lab"
+
+
+def _stats_collection():
+    return get_database()[STATS_COLLECTION]
+
+
+async def increment_lab_stats(patients: int = 0, reports: int = 0) -> None:
+    """Atomically adjust the lab counters"""
+    delta = {}
+    if patients:
+        delta["total_patients"] = patients
+    if reports:
+        delta["reports_uploaded"] = reports
+    if not delta:
+        return
+
+    await _stats_collection().update_one(
+        {"_id": LAB_STATS_ID},
+        {"$inc": delta},
+        upsert=True,
+    )
+
+
+async def reconcile_lab_stats() -> dict:
+    """Recount the lab counters from the source collections and store them"""
+    total_patients = await Patient.find().count()
+
+    rows = await Patient.aggregate(
+        [
+            {
+                "$group": {
+                    "_id": None,
+                    "reports": {"$sum": {"$size": {"$ifNull": ["$diagnostic_reports", []]}}},
+                }
+            }
+        ]
+    ).to_list()
+    reports_uploaded = rows[0]["reports"] if rows else 0
+
+    stats = {
+        "total_patients": total_patients,
+        "reports_uploaded": reports_uploaded,
+    }
+    await _stats_collection().update_one(
+        {"_id": LAB_STATS_ID},
+        {"$set": {**stats, "reconciled_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    return stats
+
+
+async def get_lab_stats() -> dict:
+    """
+    Read the lab counters. Increments before the first reconcile have no
+    baseline, so a document that was never reconciled is rebuilt first.
+    """
+    doc = await _stats_collection().find_one({"_id": LAB_STATS_ID})
+    if not doc or "reconciled_at" not in doc:
+        return await reconcile_lab_stats()
+
+    return {
+        "total_patients": doc["total_patients"],
+        "reports_uploaded": doc["reports_uploaded"],
+    }
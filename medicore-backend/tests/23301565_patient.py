@@ -1,3 +1,7 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 
@@ -119,3 +123,161 @@ async def test_get_my_patient_profile(client: AsyncClient):
     data = res.json()
     assert data["patient_id"]
     assert data["user_id"]
+
+
+# The slot test doctor works Mondays 09:00-17:00 in 30 minute slots
+SLOT_TEST_AVAILABILITY = [
+    {
+        "day": "Monday",
+        "working_hours": [{"start": "09:00", "end": "17:00"}],
+        "slot_minutes": 30,
+    }
+]
+
+
+async def get_slot_test_doctor_id(client: AsyncClient) -> str:
+    reg_payload = {
+        "email": "slot_doctor@test.com",
+        "password": "doctor12345",
+        "full_name": "Slot Test Doctor",
+        "role": "doctor",
+        "phone": "0123456789",
+        "hospital_email": "slot.doctor@hospital.com",
+        "specialization": "Cardiology",
+        "license_number": "LIC-54321",
+    }
+    res = await client.post("/api/auth/register", json=reg_payload)
+    if res.status_code != 201:
+        assert res.status_code == 400
+        res = await client.post(
+            "/api/auth/login",
+            json={"email": reg_payload["email"], "password": reg_payload["password"]},
+        )
+        assert res.status_code == 200
+    doctor_headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+    res_avail = await client.put(
+        "/api/doctor-profile/availability",
+        json={"availability": SLOT_TEST_AVAILABILITY},
+        headers=doctor_headers,
+    )
+    assert res_avail.status_code == 200
+
+    me = await client.get("/api/auth/me", headers=doctor_headers)
+    assert me.status_code == 200
+    return me.json()["id"]
+
+
+async def setup_slot_booking(client: AsyncClient) -> tuple[dict, str, datetime]:
+    """
+    Log in the test patient (with a profile) and return their auth headers,
+    the slot test doctor's id and a random future Monday, so repeated runs
+    are unlikely to book a day an earlier run already filled
+    """
+    token = await register_and_login_patient(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    doctor_id = await get_slot_test_doctor_id(client)
+
+    profile_payload = {
+        "date_of_birth": "2000-01-01",
+        "gender": "male",
+        "blood_group": "A+",
+        "address": "Test Address",
+        "emergency_contact": "0123456789",
+        "emergency_contact_name": "Guardian",
+        "allergies": [],
+        "chronic_conditions": [],
+        "current_medications": [],
+    }
+    res = await client.post("/api/patients/", json=profile_payload, headers=headers)
+    assert res.status_code in (201, 400)
+
+    # 2031-01-06 is a Monday
+    monday = datetime(2031, 1, 6) + timedelta(weeks=random.randrange(100_000))
+    return headers, doctor_id, monday
+
+
+@pytest.mark.anyio
+async def test_concurrent_bookings_of_one_slot(client: AsyncClient):
+    headers, doctor_id, monday = await setup_slot_booking(client)
+    payload = {
+        "doctor_id": doctor_id,
+        "appointment_date": monday.replace(hour=9).isoformat(),
+        "reason": "Concurrency test",
+    }
+
+    responses = await asyncio.gather(
+        *[
+            client.post("/api/appointments/", json=payload, headers=headers)
+            for _ in range(200)
+        ]
+    )
+    codes = [r.status_code for r in responses]
+    print("CONCURRENT BOOKINGS:", {c: codes.count(c) for c in set(codes)})
+
+    assert codes.count(201) == 1
+    assert codes.count(409) == 199
+
+
+@pytest.mark.anyio
+async def test_booking_inside_a_taken_slot(client: AsyncClient):
+    headers, doctor_id, monday = await setup_slot_booking(client)
+    payload = {"doctor_id": doctor_id, "reason": "Slot alignment test"}
+
+    res_first = await client.post(
+        "/api/appointments/",
+        json={**payload, "appointment_date": monday.replace(hour=9).isoformat()},
+        headers=headers,
+    )
+    assert res_first.status_code == 201
+
+    # 09:10 falls in the same 09:00-09:30 slot
+    res_second = await client.post(
+        "/api/appointments/",
+        json={**payload, "appointment_date": monday.replace(hour=9, minute=10).isoformat()},
+        headers=headers,
+    )
+    print("SECOND BOOKING:", res_second.status_code, res_second.json())
+    assert res_second.status_code == 409
+    assert res_second.headers["X-Suggested-Slot"] == monday.replace(hour=9, minute=30).isoformat()
+
+    # 09:40 is snapped to the free 09:30 slot
+    res_third = await client.post(
+        "/api/appointments/",
+        json={**payload, "appointment_date": monday.replace(hour=9, minute=40).isoformat()},
+        headers=headers,
+    )
+    assert res_third.status_code == 201
+    assert res_third.json()["appointment_date"].startswith(
+        monday.replace(hour=9, minute=30).isoformat()
+    )
+
+    # Outside the doctor's hours
+    res_outside = await client.post(
+        "/api/appointments/",
+        json={**payload, "appointment_date": monday.replace(hour=18).isoformat()},
+        headers=headers,
+    )
+    assert res_outside.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_login_before_registering(client: AsyncClient):
+    # A failed login for an unknown email must not block the same
+    # credentials once the account exists
+    credentials = {
+        "email": f"late_patient_{random.randrange(10**9)}@test.com",
+        "password": "password123",
+    }
+
+    res = await client.post("/api/auth/login", json=credentials)
+    assert res.status_code == 401
+
+    res = await client.post(
+        "/api/auth/register",
+        json={**credentials, "full_name": "Late Patient", "role": "patient"},
+    )
+    assert res.status_code == 201
+
+    res = await client.post("/api/auth/login", json=credentials)
+    assert res.status_code == 200
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.core.config import settings
+from app.services import email as email_module
+from app.services.email import EmailService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+class LocalSmtpServer:
+    """
+    Minimal SMTP server on 127.0.0.1 standing in for the relay. It accepts
+    every message unless `reply_to_data` says otherwise, and records the
+    connections it saw and each DATA attempt.
+    """
+
+    def __init__(self, greeting_delay: float = 0):
+        self.greeting_delay = greeting_delay
+        self.connections = 0
+        self.received = []  # (subject line, time) of accepted messages
+        self.attempts = []  # time of every DATA attempt
+        # Called with the attempt number (1-based); returns the reply
+        self.reply_to_data = lambda attempt: "250 OK"
+        self._server = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._session, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _session(self, reader, writer):
+        self.connections += 1
+
+        def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+
+        await asyncio.sleep(self.greeting_delay)
+        reply("220 localhost test SMTP")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode().strip().upper()
+                if command.startswith("EHLO"):
+                    reply("250-localhost")
+                    reply("250 8BITMIME")
+                elif command.startswith("DATA"):
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    subject = None
+                    while (data := await reader.readline()) != b".\r\n":
+                        if data.startswith(b"Subject:"):
+                            subject = data.decode().strip()[len("Subject: "):]
+                    self.attempts.append(time.monotonic())
+                    answer = self.reply_to_data(len(self.attempts))
+                    if answer.startswith("250"):
+                        self.received.append((subject, time.monotonic()))
+                    reply(answer)
+                elif command.startswith("QUIT"):
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    # HELO, MAIL, RCPT, RSET, NOOP
+                    reply("250 OK")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def wait_until(predicate, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the SMTP stand-in")
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def smtp_server():
+    server = LocalSmtpServer()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Sizes of the batches handed to an SMTP connection, in order"""
+    sizes = []
+    send_batch = email_module._SmtpConnection.send_batch
+
+    def recording_send_batch(self, messages):
+        sizes.append(len(messages))
+        return send_batch(self, messages)
+
+    monkeypatch.setattr(email_module._SmtpConnection, "send_batch", recording_send_batch)
+    return sizes
+
+
+@pytest.fixture
+async def service(smtp_server, monkeypatch, tmp_path):
+    port = await smtp_server.start()
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", True)
+    monkeypatch.setattr(settings, "EMAIL_SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "EMAIL_SMTP_PORT", port)
+    monkeypatch.setattr(settings, "EMAIL_SMTP_STARTTLS", False)
+    monkeypatch.setattr(settings, "EMAIL_SMTP_USERNAME", None)
+    monkeypatch.setattr(settings, "EMAIL_SMTP_TIMEOUT_SECONDS", 5)
+    monkeypatch.setattr(settings, "EMAIL_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "EMAIL_BATCH_SIZE", 20)
+    monkeypatch.setattr(settings, "EMAIL_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "EMAIL_RETRY_BASE_SECONDS", 0.1)
+    monkeypatch.setattr(
+        settings, "EMAIL_DEAD_LETTER_PATH", str(tmp_path / "email-dead-letter.jsonl")
+    )
+
+    email_service = EmailService()
+    email_service.start()
+    yield email_service
+    await email_service.stop()
+
+
+def dead_letters() -> list:
+    if not os.path.exists(settings.EMAIL_DEAD_LETTER_PATH):
+        return []
+    with open(settings.EMAIL_DEAD_LETTER_PATH, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+async def test_queued_messages_are_sent_in_batches_over_one_connection(
+    service, smtp_server, batches
+):
+    for i in range(5):
+        assert service.enqueue("patient@test.com", f"First {i}", "Hello")
+    await wait_until(lambda: len(smtp_server.received) == 5)
+
+    for i in range(3):
+        assert service.enqueue("patient@test.com", f"Second {i}", "Hello")
+    await wait_until(lambda: len(smtp_server.received) == 8)
+
+    assert batches == [5, 3]
+    assert smtp_server.connections == 1
+    assert [subject for subject, _ in smtp_server.received][:2] == ["First 0", "First 1"]
+
+
+async def test_enqueue_never_waits_on_smtp(service, smtp_server):
+    # The relay takes half a second to even greet us
+    smtp_server.greeting_delay = 0.5
+
+    started = time.monotonic()
+    for i in range(50):
+        assert service.enqueue("patient@test.com", f"Message {i}", "Hello")
+    assert time.monotonic() - started < 0.1
+    assert smtp_server.received == []
+
+    await wait_until(lambda: len(smtp_server.received) == 50)
+
+
+async def test_failures_are_retried_with_backoff(service, smtp_server):
+    # Two temporary failures, then the relay accepts the message
+    smtp_server.reply_to_data = lambda attempt: (
+        "451 Try again later" if attempt <= 2 else "250 OK"
+    )
+
+    service.enqueue("patient@test.com", "Retried", "Hello")
+    await wait_until(lambda: smtp_server.received)
+
+    first, second, third = smtp_server.attempts
+    # EMAIL_RETRY_BASE_SECONDS doubles on each retry: 0.1s, then 0.2s
+    assert second - first >= 0.09
+    assert third - second >= 0.19
+    assert [subject for subject, _ in smtp_server.received] == ["Retried"]
+    assert dead_letters() == []
+
+
+async def test_exhausted_retries_go_to_the_dead_letter_file(service, smtp_server):
+    smtp_server.reply_to_data = lambda attempt: "451 Try again later"
+
+    service.enqueue("patient@test.com", "Never delivered", "Hello")
+    await wait_until(lambda: dead_letters())
+
+    assert len(smtp_server.attempts) == settings.EMAIL_MAX_ATTEMPTS
+    (letter,) = dead_letters()
+    assert letter["subject"] == "Never delivered"
+    assert letter["attempts"] == settings.EMAIL_MAX_ATTEMPTS
+    assert "451" in letter["error"]
+
+
+async def test_permanent_failures_are_not_retried(service, smtp_server):
+    smtp_server.reply_to_data = lambda attempt: "550 Mailbox unavailable"
+
+    service.enqueue("nobody@test.com", "Bounced", "Hello")
+    await wait_until(lambda: dead_letters())
+
+    assert len(smtp_server.attempts) == 1
+    assert dead_letters()[0]["attempts"] == 1
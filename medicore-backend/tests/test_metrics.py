@@ -0,0 +1,57 @@
+import os
+import sys
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", (0.1, 1.0))
+    labels = (("route", "/x"),)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(labels, value)
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 3.65',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_histogram_keeps_one_series_per_label_set():
+    histogram = Histogram("size_bytes", "Size", (100,))
+    histogram.observe((("route", "/b"),), 50)
+    histogram.observe((("route", "/a"),), 500)
+
+    counts = [line for line in histogram.render() if "_count" in line]
+    assert counts == ['size_bytes_count{route="/a"} 1', 'size_bytes_count{route="/b"} 1']
+
+
+def test_counter_and_gauge():
+    counter = Counter("requests_total", "Requests")
+    counter.inc((("status", "200"),))
+    counter.inc((("status", "200"),), 2)
+    assert counter.render()[-1] == 'requests_total{status="200"} 3'
+
+    gauge = Gauge("in_flight", "In flight")
+    gauge.inc(())
+    gauge.inc(())
+    gauge.dec(())
+    assert gauge.render()[1:] == ["# TYPE in_flight gauge", "in_flight 1"]
+    gauge.set((), 7)
+    assert gauge.render()[-1] == "in_flight 7"
+
+
+def test_label_values_are_escaped():
+    counter = Counter("c", "C")
+    counter.inc((("route", 'a"b\\c'),))
+    assert counter.render()[-1] == 'c{route="a\\"b\\\\c"} 1'
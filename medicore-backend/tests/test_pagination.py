@@ -0,0 +1,97 @@
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException, Response
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    finalize_page,
+    keyset_filter,
+    keyset_sort,
+)
+
+
+def test_cursor_round_trip():
+    created = datetime(2031, 1, 6, 9, 30, 15, 250000)
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor(created, oid)) == (created, str(oid))
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30=", "eyJ2IjogMX0="])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        PageParams(cursor=cursor, limit=10)
+    assert exc.value.status_code == 400
+
+
+def test_first_page_has_no_filter():
+    assert keyset_filter(PageParams(cursor=None, limit=10)) == {}
+
+
+def test_keyset_filter_continues_after_the_cursor():
+    created = datetime(2031, 1, 6, 9, 30)
+    oid = ObjectId()
+    page = PageParams(cursor=encode_cursor(created, oid), limit=10)
+
+    assert keyset_filter(page) == {
+        "$or": [
+            {"created_at": {"$lt": created}},
+            {"created_at": created, "_id": {"$lt": oid}},
+        ]
+    }
+    assert keyset_sort() == [("created_at", -1), ("_id", -1)]
+
+
+def test_keyset_filter_on_another_field_keeps_string_ties():
+    created = datetime(2031, 1, 6, 9, 30)
+    page = PageParams(cursor=encode_cursor(created, "MED2031000001"), limit=10)
+    assert keyset_filter(page, "appointment_date", "patient_id") == {
+        "$or": [
+            {"appointment_date": {"$lt": created}},
+            {"appointment_date": created, "patient_id": {"$lt": "MED2031000001"}},
+        ]
+    }
+
+
+def rows(count: int) -> list:
+    return [
+        SimpleNamespace(created_at=datetime(2031, 1, 6 + i), id=ObjectId())
+        for i in range(count)
+    ]
+
+
+def test_full_page_sets_the_next_cursor():
+    page = PageParams(cursor=None, limit=2)
+    response = Response()
+    fetched = rows(3)
+
+    result = finalize_page(fetched, page, response, lambda r: (r.created_at, r.id))
+
+    assert result == fetched[:2]
+    last = fetched[1]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == (
+        last.created_at,
+        str(last.id),
+    )
+
+
+def test_last_page_has_no_cursor():
+    page = PageParams(cursor=None, limit=2)
+    response = Response()
+    fetched = rows(2)
+
+    assert finalize_page(fetched, page, response, lambda r: (r.created_at, r.id)) == fetched
+    assert NEXT_CURSOR_HEADER not in response.headers
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.services.pdf_cache import PdfCache, etag_matches, snapshot_digest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+# ---------- ETags ----------
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ('"xyz"', False),
+        ('"ABC"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_snapshot_digest_follows_printed_content():
+    snapshot = {"patient_id": "MED1", "reports": [1, 2], "updated_at": "monday"}
+    assert snapshot_digest(snapshot) == snapshot_digest(dict(snapshot))
+    assert snapshot_digest(snapshot) != snapshot_digest({**snapshot, "reports": [1]})
+    assert snapshot_digest(snapshot) != snapshot_digest({**snapshot, "updated_at": "tuesday"})
+
+
+# ---------- PDF cache ----------
+
+
+async def test_pdf_cache_evicts_oldest_beyond_its_size(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    await cache.put("a", b"x" * 10)
+    await cache.put("b", b"x" * 10)
+    assert await cache.get("a") == b"x" * 10
+
+    # "b" is now the least recently used
+    await cache.put("c", b"x" * 10)
+    assert await cache.get("b") is None
+    assert sorted(os.listdir(tmp_path)) == ["a.pdf", "c.pdf"]
+
+
+async def test_pdf_cache_reloads_its_directory_once(tmp_path):
+    for i, key in enumerate(["old", "mid", "new"]):
+        path = tmp_path / f"{key}.pdf"
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (i, i))
+
+    cache = PdfCache(str(tmp_path), max_bytes=25)
+    results = await asyncio.gather(*(cache.get("new") for _ in range(10)))
+
+    assert results == [b"x" * 10] * 10
+    # Loaded (and counted) once, then trimmed back under the cap
+    assert cache._size == 20
+    assert sorted(os.listdir(tmp_path)) == ["mid.pdf", "new.pdf"]
+
+
+async def test_concurrent_misses_share_one_render(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=1000)
+    renders = 0
+
+    async def render():
+        nonlocal renders
+        renders += 1
+        await asyncio.sleep(0.01)
+        return b"%PDF"
+
+    results = await asyncio.gather(*(cache.get_or_render("k", render) for _ in range(5)))
+
+    assert results == [b"%PDF"] * 5
+    assert renders == 1
+    assert await cache.get("k") == b"%PDF"
@@ -0,0 +1,140 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import (
+    FailedLoginCache,
+    InMemoryRateLimitBackend,
+    client_ip,
+    enforce_login_rate_limit,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic for the rate limit module"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now.value)
+    return now
+
+
+async def test_bucket_allows_a_burst_then_refills(clock):
+    backend = InMemoryRateLimitBackend()
+
+    for _ in range(3):
+        assert await backend.take("k", capacity=3, refill_per_second=0.5) == 0
+    assert await backend.take("k", capacity=3, refill_per_second=0.5) == pytest.approx(2.0)
+
+    clock.value += 2
+    assert await backend.take("k", capacity=3, refill_per_second=0.5) == 0
+    assert await backend.take("k", capacity=3, refill_per_second=0.5) > 0
+
+
+async def test_bucket_never_refills_past_capacity(clock):
+    backend = InMemoryRateLimitBackend()
+    await backend.take("k", capacity=2, refill_per_second=1)
+
+    clock.value += 3600
+    assert await backend.take("k", capacity=2, refill_per_second=1) == 0
+    assert await backend.take("k", capacity=2, refill_per_second=1) == 0
+    assert await backend.take("k", capacity=2, refill_per_second=1) > 0
+
+
+async def test_buckets_are_bounded(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        await backend.take(key, capacity=1, refill_per_second=0.001)
+
+    # "a" was evicted, so it starts from a full bucket again
+    assert await backend.take("a", capacity=1, refill_per_second=0.001) == 0
+    assert await backend.take("c", capacity=1, refill_per_second=0.001) > 0
+
+
+def test_failed_login_cache_expires(clock):
+    cache = FailedLoginCache(ttl=60)
+    cache.add("Someone@Test.com", "wrong-password")
+
+    assert cache.contains("someone@test.com", "wrong-password")
+    assert not cache.contains("someone@test.com", "other-password")
+
+    clock.value += 61
+    assert not cache.contains("someone@test.com", "wrong-password")
+
+
+def test_failed_login_cache_is_bounded(clock):
+    cache = FailedLoginCache(ttl=60, max_size=2)
+    for password in ("one", "two", "three"):
+        cache.add("someone@test.com", password)
+
+    assert not cache.contains("someone@test.com", "one")
+    assert cache.contains("someone@test.com", "three")
+
+
+async def test_login_limit_raises_429_with_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "rate_limit_backend", InMemoryRateLimitBackend())
+    monkeypatch.setattr(settings, "LOGIN_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "LOGIN_EMAIL_BURST", 2)
+    monkeypatch.setattr(settings, "LOGIN_EMAIL_PER_MINUTE", 6)
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+
+    await enforce_login_rate_limit(request, "someone@test.com")
+    await enforce_login_rate_limit(request, "SOMEONE@test.com")
+    with pytest.raises(HTTPException) as exc:
+        await enforce_login_rate_limit(request, "someone@test.com")
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "10"
+
+    # Another email from the same address still has its own bucket
+    await enforce_login_rate_limit(request, "other@test.com")
+
+
+# ---------- Client address ----------
+
+
+def request_from(host: str, forwarded_for: str = None):
+    headers = {"x-forwarded-for": forwarded_for} if forwarded_for else {}
+    return SimpleNamespace(client=SimpleNamespace(host=host), headers=headers)
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "")
+    assert client_ip(request_from("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.0/8")
+    assert client_ip(request_from("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+
+def test_trusted_proxy_forwards_the_client_address(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.0/8, 127.0.0.1")
+    assert client_ip(request_from("10.1.2.3", "198.51.100.1")) == "198.51.100.1"
+    assert client_ip(request_from("127.0.0.1", "198.51.100.1")) == "198.51.100.1"
+    # No header: the proxy itself is all we know
+    assert client_ip(request_from("10.1.2.3")) == "10.1.2.3"
+
+
+def test_spoofed_forwarded_for_entries_are_skipped(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", "10.0.0.0/8")
+    # The client sent "1.1.1.1" itself; our proxies appended the rest
+    request = request_from("10.0.0.2", "1.1.1.1, 198.51.100.1, 10.0.0.1")
+    assert client_ip(request) == "198.51.100.1"
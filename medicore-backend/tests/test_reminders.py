@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.core.config import settings
+from app.services import reminders
+from app.services.reminders import LogNotifier, claim_due_reminders, run_reminder_batch
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2031, 1, 6, 8, 0)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    """The subset of Mongo query semantics the reminder queries use"""
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, q) for q in condition):
+                return False
+            continue
+        value = doc.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for op, arg in condition.items():
+            if op == "$in" and value not in arg:
+                return False
+            if op in ("$gte", "$lte", "$lt") and value is None:
+                return False
+            if op == "$gte" and not value >= arg:
+                return False
+            if op == "$lte" and not value <= arg:
+                return False
+            if op == "$lt" and not value < arg:
+                return False
+    return True
+
+
+class FakePrescriptions:
+    """In-memory stand-in for the prescriptions collection"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_one_and_update(self, query, update, sort, projection, return_document):
+        (field, _), = sort
+        matching = sorted((d for d in self.docs if _matches(d, query)), key=lambda d: d[field])
+        if not matching:
+            return None
+        doc = matching[0]
+        doc.update(update["$set"])
+        return {k: doc[k] for k in ["_id", *projection]}
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+
+    def get(self, doc_id):
+        return next(d for d in self.docs if d["_id"] == doc_id)
+
+
+def prescription(doc_id: str, follow_up: datetime, sent: bool = False) -> dict:
+    return {
+        "_id": doc_id,
+        "prescription_id": f"RX-{doc_id}",
+        "patient_id": "patient-1",
+        "doctor_id": "doctor-1",
+        "diagnosis": "Hypertension",
+        "follow_up_date": follow_up,
+        "follow_up_reminder_sent": sent,
+    }
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable datetime.utcnow for the reminder module"""
+    now = SimpleNamespace(value=NOW)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return now.value
+
+    monkeypatch.setattr(reminders, "datetime", FrozenDatetime)
+    return now
+
+
+@pytest.fixture
+def prescriptions(monkeypatch, clock):
+    collection = FakePrescriptions(
+        [
+            prescription("due-2", NOW + timedelta(hours=5)),
+            prescription("due-1", NOW + timedelta(hours=2)),
+            prescription("due-3", NOW + timedelta(hours=20)),
+            prescription("later", NOW + timedelta(days=3)),
+            prescription("sent", NOW + timedelta(hours=1), sent=True),
+        ]
+    )
+    monkeypatch.setattr(
+        reminders, "Prescription", SimpleNamespace(get_motor_collection=lambda: collection)
+    )
+
+    patient = SimpleNamespace(user_id="user-1")
+    user = SimpleNamespace(full_name="Test Patient", email="patient@test.com")
+    doctor = SimpleNamespace(full_name="Dr Test")
+
+    async def fetch_patients_with_users(ids):
+        return {i: patient for i in ids}, {"user-1": user}
+
+    async def fetch_users(ids):
+        return {i: doctor for i in ids}
+
+    monkeypatch.setattr(reminders, "fetch_patients_with_users", fetch_patients_with_users)
+    monkeypatch.setattr(reminders, "fetch_users", fetch_users)
+    monkeypatch.setattr(settings, "REMINDER_LEAD_HOURS", 24)
+    monkeypatch.setattr(settings, "REMINDER_CLAIM_SECONDS", 300)
+    monkeypatch.setattr(settings, "REMINDER_BATCH_SIZE", 2)
+    return collection
+
+
+def sent_lines(path) -> list:
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+async def test_due_reminders_are_sent_once_in_batches(prescriptions, tmp_path):
+    log = tmp_path / "notifications.log"
+    notifier = LogNotifier(str(log))
+
+    assert await run_reminder_batch(notifier) == 2
+    assert await run_reminder_batch(notifier) == 1
+    assert await run_reminder_batch(notifier) == 0
+
+    # Sends within a batch run concurrently, so lines can land in any order
+    lines = sent_lines(log)
+    assert sorted(line["prescription_id"] for line in lines) == [
+        "RX-due-1", "RX-due-2", "RX-due-3"
+    ]
+    assert lines[0]["patient_email"] == "patient@test.com"
+    assert lines[0]["doctor_name"] == "Dr Test"
+
+    for doc_id in ("due-1", "due-2", "due-3"):
+        doc = prescriptions.get(doc_id)
+        assert doc["follow_up_reminder_sent"] is True
+        assert doc["follow_up_reminder_sent_at"] == NOW
+        assert "follow_up_reminder_claimed_until" not in doc
+    assert prescriptions.get("later")["follow_up_reminder_sent"] is False
+
+
+async def test_concurrent_claims_never_overlap(prescriptions):
+    first, second = await asyncio.gather(
+        claim_due_reminders(NOW, 2), claim_due_reminders(NOW, 2)
+    )
+    ids = [doc["_id"] for doc in first + second]
+    assert sorted(ids) == ["due-1", "due-2", "due-3"]
+
+
+async def test_failed_send_is_claimed_again_after_its_claim_expires(
+    prescriptions, clock, tmp_path
+):
+    # Writing to a directory fails, like an unreachable notification target
+    broken = LogNotifier(str(tmp_path))
+    prescriptions.docs = [prescription("due-1", NOW + timedelta(hours=2))]
+
+    assert await run_reminder_batch(broken) == 1
+    doc = prescriptions.get("due-1")
+    assert doc["follow_up_reminder_sent"] is False
+    assert doc["follow_up_reminder_claimed_until"] == NOW + timedelta(seconds=300)
+
+    # Still claimed: nobody retries it yet
+    log = tmp_path / "notifications.log"
+    assert await run_reminder_batch(LogNotifier(str(log))) == 0
+
+    clock.value = NOW + timedelta(seconds=301)
+    assert await run_reminder_batch(LogNotifier(str(log))) == 1
+    assert doc["follow_up_reminder_sent"] is True
+    assert [line["prescription_id"] for line in sent_lines(log)] == ["RX-due-1"]
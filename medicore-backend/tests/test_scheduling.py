@@ -0,0 +1,189 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.models.doctor_profile import (
+    DaySchedule,
+    DoctorProfile,
+    TimeRange,
+    WeeklyAvailability,
+    format_hhmm,
+    parse_hhmm,
+)
+from app.services.scheduling import (
+    OutsideSchedule,
+    slot_start,
+    snap_to_slot,
+    split_booked,
+)
+
+# 2031-01-06 is a Monday
+MONDAY = datetime(2031, 1, 6)
+
+
+def hhmm(*labels: str) -> list:
+    return [
+        (parse_hhmm(start), parse_hhmm(end))
+        for start, end in (label.split("-") for label in labels)
+    ]
+
+
+def monday_schedule(**fields) -> WeeklyAvailability:
+    return WeeklyAvailability(availability=[DaySchedule(day="Monday", **fields)])
+
+
+# ---------- HH:MM parsing ----------
+
+
+@pytest.mark.parametrize(
+    "value, minutes",
+    [("00:00", 0), ("09:30", 570), (" 9:05 ", 545), ("23:59", 1439), ("24:00", 1440)],
+)
+def test_parse_hhmm(value, minutes):
+    assert parse_hhmm(value) == minutes
+
+
+@pytest.mark.parametrize("value", ["", "9", "09:5", "09:60", "24:01", "ab:cd", "-1:00", "9am"])
+def test_parse_hhmm_rejects_bad_times(value):
+    with pytest.raises(ValueError):
+        parse_hhmm(value)
+
+
+def test_time_range_is_canonicalised():
+    hours = TimeRange(start="9:00", end="13:30")
+    assert (hours.start, hours.end) == ("09:00", "13:30")
+    assert format_hhmm(parse_hhmm(hours.end)) == "13:30"
+
+
+def test_time_range_must_end_after_it_starts():
+    with pytest.raises(ValueError):
+        TimeRange(start="10:00", end="10:00")
+    with pytest.raises(ValueError):
+        TimeRange.from_label("10:00")
+
+
+# ---------- Slot building ----------
+
+
+def test_working_hours_are_cut_into_slots():
+    day = DaySchedule(
+        day="Monday", working_hours=[{"start": "09:00", "end": "10:30"}], slot_minutes=30
+    )
+    assert day.slots == hhmm("09:00-09:30", "09:30-10:00", "10:00-10:30")
+    assert day.time_slots == ["09:00-09:30", "09:30-10:00", "10:00-10:30"]
+
+
+def test_slot_length_that_does_not_divide_the_range():
+    # The 20 minutes left after the last whole slot are not bookable
+    day = DaySchedule(
+        day="Monday", working_hours=[{"start": "09:00", "end": "10:00"}], slot_minutes=40
+    )
+    assert day.slots == hhmm("09:00-09:40")
+
+
+def test_overlapping_ranges_give_unique_sorted_slots():
+    day = DaySchedule(
+        day="Monday",
+        working_hours=[
+            {"start": "14:00", "end": "15:00"},
+            {"start": "09:00", "end": "10:00"},
+            {"start": "09:30", "end": "10:30"},
+        ],
+        slot_minutes=30,
+    )
+    assert day.slots == hhmm(
+        "09:00-09:30", "09:30-10:00", "10:00-10:30", "14:00-14:30", "14:30-15:00"
+    )
+
+
+def test_time_slots_only_is_one_slot_per_label():
+    day = DaySchedule(day="Monday", time_slots=["14:00-15:00", "09:00-10:00"])
+    assert day.slots == hhmm("09:00-10:00", "14:00-15:00")
+    assert day.slot_minutes is None
+
+
+def test_edited_time_slots_override_working_hours():
+    day = DaySchedule(
+        day="Monday",
+        working_hours=[{"start": "09:00", "end": "10:00"}],
+        slot_minutes=30,
+        time_slots=["09:00-09:30"],
+    )
+    assert day.slots == hhmm("09:00-09:30")
+
+
+def test_unreadable_saved_schedule_is_skipped():
+    saved = [
+        {"day": "Monday", "time_slots": ["9 to 5", "09:00-10:00"]},
+        {"day": "Someday", "time_slots": ["09:00-10:00"]},
+    ]
+    assert DoctorProfile.drop_unreadable_schedule(saved) == [
+        {"day": "Monday", "time_slots": ["09:00-10:00"]}
+    ]
+
+
+# ---------- Booked slots ----------
+
+
+def test_split_booked():
+    slots = hhmm("09:00-09:30", "09:30-10:00", "10:00-10:30", "10:30-11:00")
+    # Bookings inside a slot (09:40), at a slot start (10:30) and outside
+    # every slot (08:00, 12:00)
+    busy = [parse_hhmm(t) for t in ("12:00", "10:30", "09:40", "08:00")]
+    free, booked = split_booked(slots, busy)
+    assert free == hhmm("09:00-09:30", "10:00-10:30")
+    assert booked == hhmm("09:30-10:00", "10:30-11:00")
+
+
+def test_split_booked_with_several_bookings_in_one_slot():
+    slots = hhmm("09:00-10:00", "10:00-11:00")
+    free, booked = split_booked(slots, [540, 550, 560])
+    assert free == hhmm("10:00-11:00")
+    assert booked == hhmm("09:00-10:00")
+
+
+def test_split_booked_with_nothing_booked():
+    slots = hhmm("09:00-10:00")
+    assert split_booked(slots, []) == (slots, [])
+
+
+# ---------- Booking times ----------
+
+
+def test_slot_start_is_naive_utc_whole_minutes():
+    dhaka = timezone(timedelta(hours=6))
+    when = datetime(2031, 1, 6, 15, 10, 42, 5000, tzinfo=dhaka)
+    assert slot_start(when) == datetime(2031, 1, 6, 9, 10)
+
+
+def test_snap_to_slot_moves_to_the_slot_start():
+    schedule = monday_schedule(
+        working_hours=[{"start": "09:00", "end": "12:00"}], slot_minutes=30
+    )
+    assert snap_to_slot(schedule, MONDAY.replace(hour=9, minute=10)) == MONDAY.replace(hour=9)
+    assert snap_to_slot(schedule, MONDAY.replace(hour=11, minute=30)) == MONDAY.replace(
+        hour=11, minute=30
+    )
+
+
+def test_snap_to_slot_outside_the_schedule():
+    schedule = monday_schedule(
+        working_hours=[{"start": "09:00", "end": "12:00"}], slot_minutes=30
+    )
+    with pytest.raises(OutsideSchedule):
+        snap_to_slot(schedule, MONDAY.replace(hour=12))
+    with pytest.raises(OutsideSchedule):
+        snap_to_slot(schedule, (MONDAY + timedelta(days=1)).replace(hour=9))
+
+
+def test_snap_to_slot_without_availability_keeps_the_time():
+    when = MONDAY.replace(hour=18, minute=17)
+    assert snap_to_slot(WeeklyAvailability(), when) == when
@@ -0,0 +1,167 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.models.doctor_profile import DaySchedule, DoctorScheduleRef, Weekday
+from app.services import slot_index as slot_index_module
+from app.services.slot_index import FreeSlotIndex
+
+pytestmark = pytest.mark.anyio
+
+DOCTOR_ID = "doctor-1"
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+def every_day_schedule() -> DoctorScheduleRef:
+    # 09:00-10:00 in two 30 minute slots, every day of the week
+    return DoctorScheduleRef(
+        user_id=DOCTOR_ID,
+        availability=[
+            DaySchedule(
+                day=day,
+                working_hours=[{"start": "09:00", "end": "10:00"}],
+                slot_minutes=30,
+            )
+            for day in Weekday
+        ],
+    )
+
+
+class _Result:
+    """Stands in for a Beanie query or Motor cursor"""
+
+    def __init__(self, docs, before=None):
+        self.docs = docs
+        self.before = before
+
+    async def to_list(self, length=None):
+        if self.before:
+            self.before()
+        return self.docs
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """
+    Replace the models the rebuild reads with in-memory data. `appointments`
+    is what the appointment query returns; `during_query` runs just before
+    it returns, like a request landing while the rebuild is loading.
+    """
+    state = SimpleNamespace(appointments=[], during_query=None)
+
+    user = SimpleNamespace(id=DOCTOR_ID, full_name="Dr Test", specialization="Cardiology")
+    monkeypatch.setattr(
+        slot_index_module,
+        "User",
+        SimpleNamespace(role=None, find=lambda *a, **kw: _Result([user])),
+    )
+    monkeypatch.setattr(
+        slot_index_module,
+        "DoctorProfile",
+        SimpleNamespace(find=lambda *a, **kw: _Result([every_day_schedule()])),
+    )
+    collection = SimpleNamespace(
+        find=lambda *a, **kw: _Result(state.appointments, before=state.during_query)
+    )
+    monkeypatch.setattr(
+        slot_index_module,
+        "Appointment",
+        SimpleNamespace(get_motor_collection=lambda: collection),
+    )
+    return state
+
+
+def tomorrow_at(hour: int, minute: int = 0) -> datetime:
+    day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return day + timedelta(days=1, hours=hour, minutes=minute)
+
+
+def free_starts(index: FreeSlotIndex, day: datetime) -> list:
+    slots = index.next_available("cardiology", 100)
+    return [s["start"] for s in slots if s["start"].date() == day.date()]
+
+
+async def test_booking_during_rebuild_is_counted_once(fake_db):
+    index = FreeSlotIndex(horizon_days=7)
+    nine = tomorrow_at(9)
+
+    def book_while_loading():
+        # The booking is saved (so the query sees it) and reported to the
+        # index while the rebuild is still loading
+        fake_db.appointments.append(
+            {"_id": "appt-1", "doctor_id": DOCTOR_ID, "appointment_date": nine}
+        )
+        index.apply(DOCTOR_ID, "appt-1", nine)
+
+    fake_db.during_query = book_while_loading
+    await index.rebuild()
+    assert free_starts(index, nine) == [tomorrow_at(9, 30)]
+
+    # One cancellation must free the slot again
+    index.apply(DOCTOR_ID, "appt-1", None)
+    assert free_starts(index, nine) == [nine, tomorrow_at(9, 30)]
+
+
+async def test_reschedule_moves_the_held_slot(fake_db):
+    index = FreeSlotIndex(horizon_days=7)
+    nine = tomorrow_at(9)
+    fake_db.appointments = [
+        {"_id": "appt-1", "doctor_id": DOCTOR_ID, "appointment_date": nine}
+    ]
+    await index.rebuild()
+    assert free_starts(index, nine) == [tomorrow_at(9, 30)]
+
+    index.apply(DOCTOR_ID, "appt-1", tomorrow_at(9, 40))
+    assert free_starts(index, nine) == [nine]
+
+    # Reporting the same state again changes nothing
+    index.apply(DOCTOR_ID, "appt-1", tomorrow_at(9, 40))
+    index.apply(DOCTOR_ID, "appt-1", None)
+    assert free_starts(index, nine) == [nine, tomorrow_at(9, 30)]
+
+
+async def test_double_booked_slot_frees_after_both_leave(fake_db):
+    index = FreeSlotIndex(horizon_days=7)
+    nine = tomorrow_at(9)
+    # Data from before the unique slot index can hold two bookings per slot
+    fake_db.appointments = [
+        {"_id": "appt-1", "doctor_id": DOCTOR_ID, "appointment_date": nine},
+        {"_id": "appt-2", "doctor_id": DOCTOR_ID, "appointment_date": nine},
+    ]
+    await index.rebuild()
+
+    index.apply(DOCTOR_ID, "appt-1", None)
+    assert free_starts(index, nine) == [tomorrow_at(9, 30)]
+    index.apply(DOCTOR_ID, "appt-2", None)
+    assert free_starts(index, nine) == [nine, tomorrow_at(9, 30)]
+
+
+async def test_removed_doctor_has_no_free_slots(fake_db):
+    index = FreeSlotIndex(horizon_days=7)
+    await index.rebuild()
+    assert index.next_available("cardiology", 1)
+
+    index.remove_doctor(DOCTOR_ID)
+    assert index.next_available("cardiology", 10) == []
+    assert index.next_available(None, 10) == []
+
+
+async def test_doctor_removed_during_rebuild_stays_removed(fake_db):
+    index = FreeSlotIndex(horizon_days=7)
+    # The doctor is deleted after the rebuild has already loaded them
+    fake_db.during_query = lambda: index.remove_doctor(DOCTOR_ID)
+    await index.rebuild()
+    assert index.next_available(None, 10) == []
@@ -0,0 +1,60 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+# Ensure backend root is on sys.path so `app` package is importable
+CURRENT_DIR = os.path.dirname(__file__)
+BACKEND_ROOT = os.path.dirname(CURRENT_DIR)
+if BACKEND_ROOT not in sys.path:
+    sys.path.insert(0, BACKEND_ROOT)
+
+from app.core import user_cache as user_cache_module
+from app.core.user_cache import UserCache
+
+
+class CachedUser(BaseModel):
+    id: str
+    role: str
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(user_cache_module.time, "monotonic", lambda: now.value)
+    return now
+
+
+def test_user_cache_hands_out_copies(clock):
+    cache = UserCache(max_size=10, ttl=30)
+    cache.set(CachedUser(id="u1", role="patient"))
+
+    user = cache.get("u1")
+    user.role = "admin"
+    assert cache.get("u1").role == "patient"
+
+
+def test_user_cache_expires_and_invalidates(clock):
+    cache = UserCache(max_size=10, ttl=30)
+    cache.set(CachedUser(id="u1", role="patient"))
+    cache.set(CachedUser(id="u2", role="doctor"))
+
+    cache.invalidate("u2")
+    assert cache.get("u2") is None
+
+    clock.value += 31
+    assert cache.get("u1") is None
+
+
+def test_user_cache_evicts_least_recently_used(clock):
+    cache = UserCache(max_size=2, ttl=30)
+    cache.set(CachedUser(id="u1", role="patient"))
+    cache.set(CachedUser(id="u2", role="patient"))
+    cache.get("u1")
+    cache.set(CachedUser(id="u3", role="patient"))
+
+    assert cache.get("u2") is None
+    assert cache.get("u1") is not None
+    assert cache.get("u3") is not None
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import api from '../services/api';
+import api, { getAllPages } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import AvailabilityScheduler from '../components/AvailabilityScheduler';
 import PrescriptionForm from '../components/PrescriptionForm';
@@ -75,7 +75,7 @@ export default function DoctorDashboard() {
   const fetchAppointments = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/appointments/doctor-appointments');
+      const response = await getAllPages('/appointments/doctor-appointments');
       setAppointments(response.data);
       setError('');
     } catch (err) {
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import api, {
   fetchLabPatientDetails,
   downloadLabPatientPdf,
+  getAllPages,
 } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import './LabAssistantDashboard.css';
@@ -220,7 +221,7 @@ export default function LabAssistantDashboard() {
       setLoading(true);
       const [statsRes, patientsRes] = await Promise.all([
         api.get('/lab/statistics'),
-        api.get('/lab/patients'),
+        getAllPages('/lab/patients'),
       ]);
 
       setStatistics(statsRes.data);
@@ -237,7 +238,7 @@ export default function LabAssistantDashboard() {
     try {
       setReportsLoading(true);
       setReportsError('');
-      const res = await api.get('/lab/reports');
+      const res = await getAllPages('/lab/reports');
       console.log('Reports from backend:', res.data);
       setReports(res.data || []);
       setPreviewUrl('');
@@ -21,6 +21,30 @@ api.interceptors.request.use(
 
 export default api;
 
+/**
+ * List endpoints return one page per request (100 rows by default) and put
+ * the cursor for the next page in the X-Next-Cursor header, which is absent
+ * on the last page. getAllPages follows the cursor and resolves to the first
+ * response with `data` replaced by every row, so callers can keep reading
+ * `res.data` as before.
+ */
+const NEXT_CURSOR_HEADER = 'x-next-cursor';
+const PAGE_SIZE = 500; // MAX_PAGE_SIZE on the backend
+
+export const getAllPages = async (url, config = {}) => {
+  const params = { ...config.params, limit: PAGE_SIZE };
+  const first = await api.get(url, { ...config, params });
+
+  const rows = [...first.data];
+  let cursor = first.headers[NEXT_CURSOR_HEADER];
+  while (cursor) {
+    const res = await api.get(url, { ...config, params: { ...params, cursor } });
+    rows.push(...res.data);
+    cursor = res.headers[NEXT_CURSOR_HEADER];
+  }
+  return { ...first, data: rows };
+};
+
 /**
  * Admin helpers used in AdminDashboard.jsx
  * These map to the admin router mounted with prefix="/api"
@@ -29,13 +53,13 @@ export default api;
 // Dashboard & lists
 export const fetchAdminStatistics = () => api.get('/admin/statistics');
 
-export const fetchAdminUsers = () => api.get('/admin/users');
+export const fetchAdminUsers = () => getAllPages('/admin/users');
 
-export const fetchAdminPatients = () => api.get('/admin/patients');
+export const fetchAdminPatients = () => getAllPages('/admin/patients');
 
-export const fetchAdminDoctors = () => api.get('/admin/doctors');
+export const fetchAdminDoctors = () => getAllPages('/admin/doctors');
 
-export const fetchAdminAppointments = () => api.get('/admin/appointments');
+export const fetchAdminAppointments = () => getAllPages('/admin/appointments');
 
 // User management
 export const updateUserRole = (userId, role) =>